@@ -41,6 +41,12 @@ setup(
         "requests>=2.25",
     ],
     extras_require={
+        "speedups": [
+            "orjson>=3.0",
+        ],
+        "sftp": [
+            "paramiko>=2.7",
+        ],
         "dev": [
             "pytest>=6.0",
             "pytest-cov>=2.10",
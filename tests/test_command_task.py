@@ -0,0 +1,50 @@
+"""
+命令任务测试
+"""
+
+import logging
+import os
+import signal
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from workflow_engine.core.workflow import WorkflowEngine
+
+
+def _make_engine(command: str) -> WorkflowEngine:
+    """创建只包含一个本地命令任务的工作流引擎"""
+    workflow_config = {
+        'tasks': [{
+            'name': 'long_local',
+            'type': 'command',
+            'executor': 'local',
+            'command': command,
+        }]
+    }
+    context = {
+        'logger': logging.getLogger('test_command_task'),
+        'config': SimpleNamespace(command_timeout=60, local_shell='/bin/sh'),
+    }
+    return WorkflowEngine(workflow_config, context)
+
+
+def test_interrupt_kills_running_local_command(tmp_path):
+    """工作流被Ctrl-C中断时终止正在执行的本地命令，并将任务记录为失败"""
+    marker = tmp_path / 'finished'
+    engine = _make_engine(f"sleep 15; touch {marker}")
+
+    timer = threading.Timer(1, os.kill, (os.getpid(), signal.SIGINT))
+    timer.start()
+    start = time.monotonic()
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            engine.run()
+    finally:
+        timer.cancel()
+
+    assert time.monotonic() - start < 5
+    assert [name for name, _ in engine.failed_tasks] == ['long_local']
+    assert not marker.exists()
@@ -32,15 +32,34 @@ Workflow Engine - 配置驱动的通用任务编排框架
 __version__ = "1.0.0"
 __author__ = "Tom James"
 
-from workflow_engine.core.config import Config
-from workflow_engine.core.logger import Logger
-from workflow_engine.core.workflow import WorkflowEngine
-from workflow_engine.core.state_manager import WorkflowStateManager
-from workflow_engine.tasks.base import Task
-from workflow_engine.tasks.factory import TaskFactory
-from workflow_engine.utils.executor import SSHExecutor
-from workflow_engine.utils.transfer import FileTransfer
-from workflow_engine.utils.notifier import Notifier
+from typing import TYPE_CHECKING
+
+from workflow_engine._lazy import install_lazy_imports
+
+# 公开名称在首次访问时才导入，
+# 避免 `from workflow_engine import Config` 之类的导入连带加载jinja2/requests等依赖
+install_lazy_imports(globals(), {
+    'Config': 'workflow_engine.core.config',
+    'Logger': 'workflow_engine.core.logger',
+    'WorkflowEngine': 'workflow_engine.core.workflow',
+    'WorkflowStateManager': 'workflow_engine.core.state_manager',
+    'Task': 'workflow_engine.tasks.base',
+    'TaskFactory': 'workflow_engine.tasks.factory',
+    'SSHExecutor': 'workflow_engine.utils.executor',
+    'FileTransfer': 'workflow_engine.utils.transfer',
+    'Notifier': 'workflow_engine.utils.notifier',
+})
+
+if TYPE_CHECKING:
+    from workflow_engine.core.config import Config
+    from workflow_engine.core.logger import Logger
+    from workflow_engine.core.workflow import WorkflowEngine
+    from workflow_engine.core.state_manager import WorkflowStateManager
+    from workflow_engine.tasks.base import Task
+    from workflow_engine.tasks.factory import TaskFactory
+    from workflow_engine.utils.executor import SSHExecutor
+    from workflow_engine.utils.transfer import FileTransfer
+    from workflow_engine.utils.notifier import Notifier
 
 __all__ = [
     'Config',
@@ -0,0 +1,43 @@
+"""
+延迟导入工具
+
+包的 __init__ 通过模块级 __getattr__ (PEP 562) 在首次访问时才导入公开名称，
+避免导入包时连带加载jinja2/requests等较重的依赖
+"""
+
+import importlib
+import sys
+from typing import Any, Dict
+
+
+def install_lazy_imports(module_globals: Dict[str, Any], lazy_imports: Dict[str, str]):
+    """
+    为模块安装延迟导入
+
+    Args:
+        module_globals: 目标模块的 globals()
+        lazy_imports: 公开名称 -> 所在模块的映射
+    """
+    module_name = module_globals['__name__']
+
+    def _load(name: str) -> Any:
+        value = getattr(importlib.import_module(lazy_imports[name]), name)
+        module_globals[name] = value
+        return value
+
+    if sys.version_info < (3, 7):
+        # Python 3.6 不支持模块级 __getattr__，直接导入
+        for name in lazy_imports:
+            _load(name)
+        return
+
+    def __getattr__(name: str) -> Any:
+        if name in lazy_imports:
+            return _load(name)
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    def __dir__():
+        return sorted(set(module_globals) | set(lazy_imports))
+
+    module_globals['__getattr__'] = __getattr__
+    module_globals['__dir__'] = __dir__
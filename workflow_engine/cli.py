@@ -5,10 +5,11 @@ YAWE (Yet Another Workflow Engine) 命令行接口
 """
 
 import sys
-import argparse
 from pathlib import Path
+from types import SimpleNamespace
+from typing import List
 
-from workflow_engine import Config, Logger, WorkflowEngine, WorkflowStateManager
+from workflow_engine import Config, Logger, WorkflowStateManager
 
 
 def main():
@@ -21,51 +22,7 @@ def main():
         workflow-run --from-task "任务名"  # 从指定任务开始
     """
     # 解析命令行参数
-    parser = argparse.ArgumentParser(
-        description='YAWE 工作流引擎 - 执行配置驱动的工作流任务',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-示例:
-  workflow-run --config workflow.yaml          执行指定配置文件
-  workflow-run -r                              从上次失败的任务恢复
-  workflow-run --from-task "数据处理"          从指定任务开始执行
-  workflow-run --clean-state                   清理旧的状态文件
-        """
-    )
-
-    parser.add_argument(
-        '--config',
-        default='config.yaml',
-        help='工作流配置文件路径 (默认: config.yaml)'
-    )
-    parser.add_argument(
-        '-r', '--resume',
-        action='store_true',
-        help='从上次失败的任务恢复执行'
-    )
-    parser.add_argument(
-        '--force',
-        action='store_true',
-        help='强制恢复(忽略配置变更检查)'
-    )
-    parser.add_argument(
-        '--clean-state',
-        action='store_true',
-        help='清理旧的状态文件(默认保留30天)'
-    )
-    parser.add_argument(
-        '--from-task',
-        metavar='TASK_NAME',
-        help='从指定任务名称开始执行(跳过之前的任务)'
-    )
-    parser.add_argument(
-        '--log-level',
-        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
-        default='INFO',
-        help='日志级别 (默认: INFO)'
-    )
-
-    args = parser.parse_args()
+    args = _parse_args(sys.argv[1:])
 
     # 检查配置文件是否存在
     config_path = Path(args.config)
@@ -90,14 +47,14 @@ def main():
         print(f"初始化配置或日志失败: {str(e)}")
         sys.exit(1)
 
-    logger.info(f"从配置文件加载工作流: {args.config}")
+    logger.info("从配置文件加载工作流: %s", args.config)
 
     # 处理状态清理
     if args.clean_state:
         state_manager = WorkflowStateManager(config, logger)
         logger.info("清理旧状态文件...")
         removed = state_manager.cleanup_old_states(older_than_days=30)
-        logger.info(f"清理了 {removed} 个旧状态文件")
+        logger.info("清理了 %s 个旧状态文件", removed)
         sys.exit(0)
 
     # 初始化状态管理器
@@ -106,7 +63,7 @@ def main():
     # 获取文件锁
     if not state_manager.acquire_lock():
         logger.error("检测到另一个工作流正在运行,无法启动")
-        logger.error(f"如果确认没有其他实例运行,请删除锁文件: {config.get('log_dir', 'logs')}/.workflow_state/.lock")
+        logger.error("持有锁的进程PID记录在: %s (进程退出后锁自动释放)", state_manager.LOCK_FILE)
         sys.exit(1)
 
     # 恢复模式
@@ -122,14 +79,14 @@ def main():
             logger.error("3. 这是第一次运行")
             logger.error("")
             logger.error("解决方案:")
-            logger.error(f"直接运行工作流: workflow-run --config {args.config}")
+            logger.error("直接运行工作流: workflow-run --config %s", args.config)
             state_manager.release_lock()
             sys.exit(1)
 
         # 验证状态
         valid, message = state_manager.validate_state(resume_state, args.force)
         if not valid:
-            logger.error(f"状态验证失败:")
+            logger.error("状态验证失败:")
             logger.error(message)
             state_manager.release_lock()
             sys.exit(1)
@@ -149,7 +106,9 @@ def main():
         state_manager.release_lock()
         sys.exit(1)
 
-    # 创建并运行工作流引擎
+    # 创建并运行工作流引擎(延迟导入，--clean-state 等路径无需加载任务模块)
+    from workflow_engine import WorkflowEngine
+
     try:
         workflow_engine = WorkflowEngine(
             workflow_config,
@@ -168,7 +127,7 @@ def main():
         if exit_code == 0:
             logger.info("工作流执行成功完成")
         else:
-            logger.error(f"工作流执行失败 (失败任务数: {exit_code})")
+            logger.error("工作流执行失败 (失败任务数: %s)", exit_code)
 
         sys.exit(exit_code)
 
@@ -177,11 +136,105 @@ def main():
         state_manager.release_lock()
         sys.exit(130)
     except Exception as e:
-        logger.error(f"执行过程中出现异常: {str(e)}")
+        logger.error("执行过程中出现异常: %s", str(e))
         logger.exception("详细异常信息")
         state_manager.release_lock()
         sys.exit(1)
 
 
+# 无需argparse即可解析的常用参数
+_FAST_PATH_FLAGS = {'-r', '--resume'}
+
+
+def _parse_args(argv: List[str]):
+    """
+    解析命令行参数
+
+    仅包含 --config / -r / --resume 的常见调用直接手动解析，
+    其他情况(含 --help)才构建argparse解析器
+
+    Args:
+        argv: 命令行参数列表(不含程序名)
+
+    Returns:
+        参数命名空间
+    """
+    args = SimpleNamespace(
+        config='config.yaml',
+        resume=False,
+        force=False,
+        clean_state=False,
+        from_task=None,
+        log_level='INFO'
+    )
+
+    idx = 0
+    while idx < len(argv):
+        arg = argv[idx]
+        if arg in _FAST_PATH_FLAGS:
+            args.resume = True
+        elif arg == '--config' and idx + 1 < len(argv) and not argv[idx + 1].startswith('-'):
+            args.config = argv[idx + 1]
+            idx += 1
+        elif arg.startswith('--config='):
+            args.config = arg[len('--config='):]
+        else:
+            return _build_parser().parse_args(argv)
+        idx += 1
+
+    return args
+
+
+def _build_parser():
+    """构建完整的argparse命令行解析器"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='YAWE 工作流引擎 - 执行配置驱动的工作流任务',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例:
+  workflow-run --config workflow.yaml          执行指定配置文件
+  workflow-run -r                              从上次失败的任务恢复
+  workflow-run --from-task "数据处理"          从指定任务开始执行
+  workflow-run --clean-state                   清理旧的状态文件
+        """
+    )
+
+    parser.add_argument(
+        '--config',
+        default='config.yaml',
+        help='工作流配置文件路径 (默认: config.yaml)'
+    )
+    parser.add_argument(
+        '-r', '--resume',
+        action='store_true',
+        help='从上次失败的任务恢复执行'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='强制恢复(忽略配置变更检查)'
+    )
+    parser.add_argument(
+        '--clean-state',
+        action='store_true',
+        help='清理旧的状态文件(默认保留30天)'
+    )
+    parser.add_argument(
+        '--from-task',
+        metavar='TASK_NAME',
+        help='从指定任务名称开始执行(跳过之前的任务)'
+    )
+    parser.add_argument(
+        '--log-level',
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+        default='INFO',
+        help='日志级别 (默认: INFO)'
+    )
+
+    return parser
+
+
 if __name__ == "__main__":
     main()
@@ -2,10 +2,22 @@
 核心引擎模块
 """
 
-from workflow_engine.core.config import Config
-from workflow_engine.core.logger import Logger
-from workflow_engine.core.workflow import WorkflowEngine
-from workflow_engine.core.state_manager import WorkflowStateManager
+from typing import TYPE_CHECKING
+
+from workflow_engine._lazy import install_lazy_imports
+
+install_lazy_imports(globals(), {
+    'Config': 'workflow_engine.core.config',
+    'Logger': 'workflow_engine.core.logger',
+    'WorkflowEngine': 'workflow_engine.core.workflow',
+    'WorkflowStateManager': 'workflow_engine.core.state_manager',
+})
+
+if TYPE_CHECKING:
+    from workflow_engine.core.config import Config
+    from workflow_engine.core.logger import Logger
+    from workflow_engine.core.workflow import WorkflowEngine
+    from workflow_engine.core.state_manager import WorkflowStateManager
 
 __all__ = [
     'Config',
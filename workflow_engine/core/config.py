@@ -4,9 +4,15 @@
 从YAML文件加载配置信息
 """
 
+import json
+import os
+import tempfile
 import yaml
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+# 优先使用libyaml的C实现加载器（未安装libyaml时回退到纯Python实现）
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
 
 class Config:
@@ -21,21 +27,116 @@ class Config:
         """
         self.config_path = Path(config_path)
         self._config: Dict[str, Any] = {}
+        # get() 的键路径拆分缓存与解析结果缓存（load() 时失效）
+        self._split_cache: Dict[str, Tuple[str, ...]] = {}
+        self._get_cache: Dict[str, Any] = {}
         self.load()
 
     def load(self) -> None:
-        """加载配置文件"""
+        """加载配置文件（优先使用JSON缓存，缓存过期时重新解析YAML）"""
         if not self.config_path.exists():
             raise FileNotFoundError(f"配置文件不存在: {self.config_path}")
 
+        self._get_cache.clear()
+
+        cache_path = self._get_cache_path()
+        # 在读取YAML之前获取文件签名，读取期间文件被修改时下次加载会重新解析
+        signature = self._source_signature()
+        cached = self._load_cache(cache_path, signature)
+        if cached is not None:
+            self._config = cached
+            return
+
         try:
             with open(self.config_path, 'r', encoding='utf-8') as f:
-                self._config = yaml.safe_load(f) or {}
+                self._config = yaml.load(f, Loader=_YAML_LOADER) or {}
         except yaml.YAMLError as e:
             raise ValueError(f"配置文件格式错误: {e}")
         except Exception as e:
             raise Exception(f"加载配置文件失败: {e}")
 
+        self._save_cache(cache_path, signature)
+
+    def _source_signature(self) -> Optional[List[int]]:
+        """
+        获取配置文件的签名(大小和纳秒修改时间)
+
+        Returns:
+            [大小, 修改时间]，无法获取时返回None
+        """
+        try:
+            st = self.config_path.stat()
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def _get_cache_path(self) -> Path:
+        """获取JSON缓存文件路径（与配置文件同目录）"""
+        return self.config_path.with_suffix(self.config_path.suffix + '.cache.json')
+
+    def _load_cache(self, cache_path: Path, signature: Optional[List[int]]) -> Optional[Dict[str, Any]]:
+        """
+        读取JSON缓存
+
+        只有缓存中记录的配置文件签名与当前签名完全相同时才使用缓存
+        (配置文件以较旧的修改时间恢复时，如 cp -p / git checkout，同样视为过期)
+
+        Args:
+            cache_path: 缓存文件路径
+            signature: 当前配置文件签名
+
+        Returns:
+            缓存的配置字典，缓存不存在或已过期时返回None
+        """
+        if signature is None:
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict) or cached.get('source') != signature:
+            return None
+        config = cached.get('config')
+        return config if isinstance(config, dict) else None
+
+    def _save_cache(self, cache_path: Path, signature: Optional[List[int]]) -> None:
+        """
+        写入JSON缓存(使用原子写入)
+
+        配置中包含JSON无法原样表示的值(如日期、非字符串键)时不写缓存
+
+        Args:
+            cache_path: 缓存文件路径
+            signature: 解析前获取的配置文件签名
+        """
+        if signature is None:
+            return
+        temp_file = None
+        try:
+            content = json.dumps(self._config, ensure_ascii=False)
+            if json.loads(content) != self._config:
+                return
+            content = json.dumps({'source': signature, 'config': self._config}, ensure_ascii=False)
+
+            # 使用唯一的临时文件，同一配置的并发运行不会互相覆盖
+            fd, temp_file = tempfile.mkstemp(
+                dir=str(cache_path.parent), prefix=f".{cache_path.name}.", suffix=".tmp"
+            )
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_file, cache_path)
+            temp_file = None
+        except (TypeError, ValueError, OSError):
+            # 缓存仅用于加速，写入失败不影响配置加载
+            pass
+        finally:
+            if temp_file is not None:
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+
     def get(self, key: str, default: Any = None) -> Any:
         """
         获取配置值（支持点号分隔的嵌套键）
@@ -47,7 +148,14 @@ class Config:
         Returns:
             配置值
         """
-        keys = key.split('.')
+        try:
+            return self._get_cache[key]
+        except KeyError:
+            pass
+
+        keys = self._split_cache.get(key)
+        if keys is None:
+            keys = self._split_cache.setdefault(key, tuple(key.split('.')))
         value = self._config
 
         for k in keys:
@@ -58,6 +166,7 @@ class Config:
             else:
                 return default
 
+        self._get_cache[key] = value
         return value
 
     def get_section(self, section: str) -> Dict[str, Any]:
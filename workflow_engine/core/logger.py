@@ -13,6 +13,15 @@ from typing import Optional
 class Logger:
     """日志管理器"""
     
+    # 日志级别名称到logging.Logger方法名的映射
+    _METHODS = {
+        'DEBUG': 'debug',
+        'INFO': 'info',
+        'WARNING': 'warning',
+        'ERROR': 'error',
+        'CRITICAL': 'critical',
+    }
+    
     def __init__(
         self, 
         log_dir: str = "logs", 
@@ -36,19 +45,29 @@ class Logger:
         
         self.log_file = self.log_dir / log_name
         self.level = level.upper()
+        self._level_no = getattr(logging, self.level)
         
         # 配置logging
         self._setup_logger()
     
     def _setup_logger(self):
         """配置日志记录器"""
-        # 创建logger
-        self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(getattr(logging, self.level))
+        # 每个日志文件对应一个独立的logger，不向root logger传播
+        self.logger = logging.getLogger(f"{__name__}:{self.log_file.resolve()}")
+        self.logger.setLevel(self._level_no)
+        self.logger.propagate = False
+        
+        # 预先绑定各级别的日志方法，避免每次调用时查找
+        self._log_dispatch = {
+            name: getattr(self.logger, method)
+            for name, method in self._METHODS.items()
+        }
         
-        # 避免重复添加handler
+        # 同一日志文件的logger已配置过handler时直接复用，避免重复打开文件
         if self.logger.handlers:
-            self.logger.handlers.clear()
+            for handler in self.logger.handlers:
+                handler.setLevel(self._level_no)
+            return
         
         # 创建formatter
         formatter = logging.Formatter(
@@ -62,58 +81,69 @@ class Logger:
             encoding='utf-8',
             mode='a'
         )
-        file_handler.setLevel(getattr(logging, self.level))
+        file_handler.setLevel(self._level_no)
         file_handler.setFormatter(formatter)
         
         # 控制台handler
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(getattr(logging, self.level))
+        console_handler.setLevel(self._level_no)
         console_handler.setFormatter(formatter)
         
         # 添加handlers
         self.logger.addHandler(file_handler)
         self.logger.addHandler(console_handler)
     
-    def log(self, message: str, level: str = "INFO"):
+    def log(self, message: str, level: str = "INFO", *args, **kwargs):
         """
         记录日志
         
         Args:
-            message: 日志消息
+            message: 日志消息(支持logging的%格式化参数)
             level: 日志级别 (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         """
-        level = level.upper()
-        log_method = getattr(self.logger, level.lower(), self.logger.info)
-        log_method(message)
+        log_method = self._log_dispatch.get(level) or self._log_dispatch.get(level.upper(), self.logger.info)
+        log_method(message, *args, **kwargs)
     
-    def debug(self, message: str):
+    def debug(self, message: str, *args, **kwargs):
         """记录DEBUG级别日志"""
-        self.logger.debug(message)
+        self.logger.debug(message, *args, **kwargs)
     
-    def info(self, message: str):
+    def info(self, message: str, *args, **kwargs):
         """记录INFO级别日志"""
-        self.logger.info(message)
+        self.logger.info(message, *args, **kwargs)
     
-    def warning(self, message: str):
+    def warning(self, message: str, *args, **kwargs):
         """记录WARNING级别日志"""
-        self.logger.warning(message)
+        self.logger.warning(message, *args, **kwargs)
     
-    def error(self, message: str):
+    def error(self, message: str, *args, **kwargs):
         """记录ERROR级别日志"""
-        self.logger.error(message)
+        self.logger.error(message, *args, **kwargs)
     
-    def critical(self, message: str):
+    def critical(self, message: str, *args, **kwargs):
         """记录CRITICAL级别日志"""
-        self.logger.critical(message)
+        self.logger.critical(message, *args, **kwargs)
     
-    def exception(self, message: str):
+    def exception(self, message: str, *args, **kwargs):
         """
         记录异常信息，包含堆栈跟踪
         
         Args:
             message: 异常描述信息
         """
-        self.logger.exception(message)
+        self.logger.exception(message, *args, **kwargs)
+    
+    def isEnabledFor(self, level: int) -> bool:
+        """
+        判断指定级别的日志是否会被记录(与logging.Logger接口一致)
+        
+        Args:
+            level: logging模块的数值日志级别(如 logging.DEBUG)
+            
+        Returns:
+            是否会记录
+        """
+        return self.logger.isEnabledFor(level)
     
     def get_log_file(self) -> Path:
         """
@@ -133,9 +163,10 @@ class Logger:
         """
         level = level.upper()
         self.level = level
-        self.logger.setLevel(getattr(logging, level))
+        self._level_no = getattr(logging, level)
+        self.logger.setLevel(self._level_no)
         for handler in self.logger.handlers:
-            handler.setLevel(getattr(logging, level))
+            handler.setLevel(self._level_no)
 
 
 # 使用示例
@@ -0,0 +1,119 @@
+"""
+任务结果缓存
+
+按 任务名+任务配置+输入变量 计算缓存键，缓存任务成功后的消息和导出变量；
+再次执行相同配置和输入的任务时可直接复用结果，跳过实际执行
+"""
+
+import os
+import json
+import time
+import hashlib
+from typing import Dict, Any, Optional
+
+
+class TaskResultCache:
+    """任务结果缓存"""
+
+    CACHE_DIR = "logs/.task_cache"
+
+    def __init__(self, logger, cache_dir: Optional[str] = None):
+        """
+        初始化任务结果缓存
+
+        Args:
+            logger: 日志记录器
+            cache_dir: 缓存目录，默认为 logs/.task_cache
+        """
+        self.logger = logger
+        self.cache_dir = cache_dir or self.CACHE_DIR
+
+    def make_key(self, task_name: str, task_config: Dict[str, Any], inputs: Dict[str, Any]) -> str:
+        """
+        计算缓存键
+
+        Args:
+            task_name: 任务名称
+            task_config: 任务配置
+            inputs: 影响任务结果的输入变量
+
+        Returns:
+            缓存键(32位十六进制)
+        """
+        payload = json.dumps(
+            {'name': task_name, 'config': task_config, 'inputs': inputs},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+    def load(self, key: str, ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存结果
+
+        Args:
+            key: 缓存键
+            ttl: 缓存有效期（秒），None表示不过期
+
+        Returns:
+            缓存结果 {'message', 'exported_vars', 'timestamp'}，不存在或已过期时返回None
+        """
+        cache_file = self._get_cache_file(key)
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning("读取任务缓存失败: %s", e)
+            return None
+
+        if ttl is not None and time.time() - entry.get('timestamp', 0) > ttl:
+            self.logger.debug("任务缓存已过期: %s", cache_file)
+            return None
+
+        return entry
+
+    def save(self, key: str, message: str, exported_vars: Dict[str, Any]):
+        """
+        保存任务结果
+
+        Args:
+            key: 缓存键
+            message: 任务结果消息
+            exported_vars: 任务导出的变量
+        """
+        entry = {
+            'message': message,
+            'exported_vars': exported_vars,
+            'timestamp': time.time()
+        }
+        try:
+            data = json.dumps(entry, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            # 导出变量无法序列化时不缓存
+            self.logger.debug("任务结果无法缓存: %s", e)
+            return
+
+        cache_file = self._get_cache_file(key)
+        temp_file = f"{cache_file}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            self.logger.warning("保存任务缓存失败: %s", e)
+
+    def _get_cache_file(self, key: str) -> str:
+        """
+        获取缓存文件路径
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存文件路径
+        """
+        return os.path.join(self.cache_dir, f"{key}.json")
@@ -7,13 +7,98 @@
 import os
 import json
 import hashlib
-import glob
 import fcntl
 import time
-from datetime import datetime
+import atexit
+import threading
 from typing import Dict, Any, Optional, Tuple, List
 from pathlib import Path
 
+# 状态文件中时间字段的格式
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# O_TMPFILE仅Linux提供
+_O_TMPFILE = getattr(os, 'O_TMPFILE', 0)
+
+# 任务状态字段模板(按固定顺序一次性构建字典，避免逐个插入键时的扩容)
+_TASK_STATE_TEMPLATE = {
+    'name': None,
+    'type': 'unknown',
+    'status': 'pending',
+    'start_time': None,
+    'end_time': None,
+    'message': '',
+    'exported_context': None,
+}
+
+# orjson为可选依赖，未安装时回退到标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json(obj: Any) -> bytes:
+    """将对象序列化为UTF-8编码的JSON字节串"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _load_state(state_file: str) -> Dict[str, Any]:
+    """从文件读取并反序列化状态"""
+    with open(state_file, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _write_all(fd: int, data: bytes):
+    """将数据完整写入文件描述符(处理部分写入)"""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _write_atomic(path: str, data: bytes):
+    """
+    原子写入文件
+
+    Linux下优先使用 O_TMPFILE 创建匿名文件，写完后通过 linkat 一次性出现在目录中；
+    目标已存在或文件系统不支持时，回退为临时文件+os.replace。
+
+    Args:
+        path: 目标文件路径
+        data: 文件内容
+    """
+    if _O_TMPFILE and not os.path.exists(path):
+        try:
+            fd = os.open(os.path.dirname(path) or '.', _O_TMPFILE | os.O_WRONLY, 0o644)
+        except OSError:
+            # 文件系统不支持 O_TMPFILE
+            fd = None
+        if fd is not None:
+            try:
+                _write_all(fd, data)
+                os.link(f'/proc/self/fd/{fd}', path)
+                return
+            except OSError:
+                # 目标已被创建或/proc不可用，回退到临时文件方式
+                pass
+            finally:
+                os.close(fd)
+
+    temp_file = f"{path}.tmp"
+    fd = os.open(temp_file, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o644)
+    try:
+        _write_all(fd, data)
+    finally:
+        os.close(fd)
+    # os.replace 在目标已存在时也能原子覆盖
+    os.replace(temp_file, path)
+
 
 class WorkflowStateManager:
     """工作流状态管理器"""
@@ -21,6 +106,10 @@ class WorkflowStateManager:
     STATE_VERSION = "1.0"
     STATE_DIR = "logs/.workflow_state"
     LOCK_FILE = "logs/.workflow_state/.lock"
+    # 状态文件名中可出现的工作流状态(用于从文件名解析状态)
+    WORKFLOW_STATUSES = ('running', 'success', 'failed', 'interrupted')
+    # 运行中状态的默认最小保存间隔(秒)，间隔内的保存请求会合并为一次写入
+    SAVE_INTERVAL = 0.5
 
     def __init__(self, config, logger):
         """
@@ -34,23 +123,60 @@ class WorkflowStateManager:
         self.logger = logger
         self.config_file = getattr(config, 'config_file', 'config.yaml')
         self.lock_fd = None
+        # 配置哈希缓存: (配置文件mtime, 哈希值)
+        self._hash_cache: Optional[Tuple[float, str]] = None
+        # 每次运行当前对应的状态文件: "{config_hash}_{run_id}" -> 文件路径
+        self._state_files: Dict[str, str] = {}
+
+        # 状态保存合并(debounce)，合并间隔可通过 workflow.settings.state_save_interval 配置
+        self.save_interval = self.SAVE_INTERVAL
+        if hasattr(config, 'get'):
+            self.save_interval = float(
+                config.get('workflow.settings.state_save_interval', self.SAVE_INTERVAL)
+            )
+        self._save_lock = threading.RLock()
+        self._last_save_ts = 0.0
+        # 被合并的待保存状态(已在调用线程中序列化): (运行标识, 状态文件路径, 序列化数据, 工作流状态)
+        self._pending_write: Optional[Tuple[str, str, bytes, Optional[str]]] = None
+        self._flush_timer: Optional[threading.Timer] = None
+
+        # 后台写入线程: 运行中状态序列化后交给写入线程落盘，只保留最新一份待写数据
+        self._write_cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._queued_write: Optional[Tuple[str, str, bytes]] = None
+        self._writer: Optional[threading.Thread] = None
+
+        # 任务状态的JSON片段缓存，保存时只重新序列化变更过的任务
+        self._task_fragments: List[Optional[bytes]] = []
+        self._fragments_tasks_id: Optional[int] = None
+        # 进程退出前写入尚未落盘的状态
+        atexit.register(self.flush)
 
         # 确保状态目录存在
         os.makedirs(self.STATE_DIR, exist_ok=True)
 
     def calculate_config_hash(self) -> str:
         """
-        计算配置文件的MD5哈希值
+        计算配置文件的BLAKE2b哈希值
 
         Returns:
-            配置文件哈希值(前8位)
+            配置文件哈希值(8位十六进制)
         """
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            return hashlib.md5(content.encode()).hexdigest()[:8]
+            mtime = os.path.getmtime(self.config_file)
+            if self._hash_cache and self._hash_cache[0] == mtime:
+                return self._hash_cache[1]
+
+            hasher = hashlib.blake2b(digest_size=4)
+            with open(self.config_file, 'rb') as f:
+                # 分块读取，避免大配置文件整体载入内存
+                for chunk in iter(lambda: f.read(65536), b''):
+                    hasher.update(chunk)
+            digest = hasher.hexdigest()
+            self._hash_cache = (mtime, digest)
+            return digest
         except Exception as e:
-            self.logger.warning(f"计算配置哈希失败: {e}, 使用默认值")
+            self.logger.warning("计算配置哈希失败: %s, 使用默认值", e)
             return "00000000"
 
     def create_state(self, workflow_config: Dict[str, Any], run_id: str) -> Dict[str, Any]:
@@ -66,20 +192,18 @@ class WorkflowStateManager:
         """
         tasks_config = workflow_config.get('tasks', [])
         settings = workflow_config.get('settings', {})
+        now = time.strftime(TIME_FORMAT)
 
         # 创建任务状态列表
-        tasks = []
-        for idx, task_config in enumerate(tasks_config, 1):
-            task_state = {
-                'name': task_config.get('name', f'task_{idx}'),
-                'type': task_config.get('type', 'unknown'),
-                'status': 'pending',
-                'start_time': None,
-                'end_time': None,
-                'message': '',
-                'exported_context': {}
-            }
-            tasks.append(task_state)
+        tasks = [
+            dict(
+                _TASK_STATE_TEMPLATE,
+                name=task_config.get('name', f'task_{idx}'),
+                type=task_config.get('type', 'unknown'),
+                exported_context={}
+            )
+            for idx, task_config in enumerate(tasks_config, 1)
+        ]
 
         # 创建状态结构
         state = {
@@ -88,8 +212,9 @@ class WorkflowStateManager:
                 'config_file': self.config_file,
                 'config_hash': self.calculate_config_hash(),
                 'run_id': run_id,
-                'start_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'start_time': now,
+                'last_update': now,
+                'last_update_epoch': int(time.time()),
                 'workflow_status': 'running',
                 'stop_on_first_error': settings.get('stop_on_first_error', True),
                 'total_tasks': len(tasks)
@@ -100,33 +225,229 @@ class WorkflowStateManager:
 
         return state
 
-    def save_state(self, state: Dict[str, Any]):
+    def save_state(self, state: Dict[str, Any], force: bool = False):
         """
         保存状态到文件(使用原子写入)
 
+        工作流运行中时，距上次写入不足 save_interval 的保存请求会被合并，
+        由定时器在间隔到期后写入最新状态；终态(success/failed/interrupted)总是立即写入。
+        状态总是在调用线程中序列化，定时器线程只写入已序列化的数据(引擎线程随后修改状态字典不影响写入)
+
+        Args:
+            state: 状态字典
+            force: 是否立即写入(忽略合并)
+        """
+        with self._save_lock:
+            workflow_status = state.get('metadata', {}).get('workflow_status')
+            elapsed = time.monotonic() - self._last_save_ts
+
+            if not force and workflow_status == 'running' and elapsed < self.save_interval:
+                try:
+                    self._pending_write = self._prepare_write(state)
+                except Exception as e:
+                    self.logger.error("保存状态文件失败: %s", e)
+                    return
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.save_interval - elapsed, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+
+            self._write_state(state)
+
+    def flush(self):
+        """立即写入被合并的待保存状态，并等待后台写入线程中的数据落盘"""
+        with self._save_lock:
+            if self._pending_write is not None:
+                self._commit_prepared(self._pending_write)
+            self._drain_writes()
+
+    def _write_state(self, state: Dict[str, Any]) -> bool:
+        """
+        将状态写入文件(调用方需持有 _save_lock)
+
+        状态在调用线程中序列化(之后引擎可继续修改状态字典)；运行中状态的文件写入
+        交给后台写入线程，终态在当前线程同步写入
+
         Args:
             state: 状态字典
+
+        Returns:
+            是否写入成功(后台写入时表示已提交写入)
         """
         try:
-            # 更新最后修改时间
-            state['metadata']['last_update'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            prepared = self._prepare_write(state)
+        except Exception as e:
+            self.logger.error("保存状态文件失败: %s", e)
+            return False
+        return self._commit_prepared(prepared)
 
-            # 生成状态文件路径
-            state_file = self._get_state_file_path(state['metadata'])
+    def _prepare_write(self, state: Dict[str, Any]) -> Tuple[str, str, bytes, Optional[str]]:
+        """
+        更新最后修改时间并序列化状态(在修改状态字典的线程中调用)
 
-            # 使用临时文件+原子rename确保写入完整性
-            temp_file = f"{state_file}.tmp"
+        Args:
+            state: 状态字典
 
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f, indent=2, ensure_ascii=False)
+        Returns:
+            (运行标识, 状态文件路径, 序列化数据, 工作流状态)
+        """
+        # 更新最后修改时间
+        now = time.time()
+        metadata = state['metadata']
+        metadata['last_update'] = time.strftime(TIME_FORMAT, time.localtime(now))
+        metadata['last_update_epoch'] = int(now)
+
+        # 生成状态文件路径(文件名包含工作流状态和更新时间)
+        state_file = self._get_state_file_path(metadata)
 
-            # 原子操作
-            os.rename(temp_file, state_file)
+        data = self._serialize_state(state)
+        return self._get_run_key(metadata), state_file, data, metadata.get('workflow_status')
 
-            self.logger.debug(f"状态已保存: {state_file}")
+    def _commit_prepared(self, prepared: Tuple[str, str, bytes, Optional[str]]) -> bool:
+        """
+        写入已序列化的状态(调用方需持有 _save_lock)
+
+        Args:
+            prepared: _prepare_write 的返回值
+
+        Returns:
+            是否写入成功(后台写入时表示已提交写入)
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        run_key, state_file, data, workflow_status = prepared
+        self._pending_write = None
+        self._last_save_ts = time.monotonic()
+
+        if workflow_status == 'running':
+            self._enqueue_write(run_key, state_file, data)
+            return True
+
+        self._drain_writes()
+        with self._io_lock:
+            return self._commit_write(run_key, state_file, data)
+
+    def _commit_write(self, run_key: str, state_file: str, data: bytes) -> bool:
+        """
+        原子写入状态文件并删除本次运行的上一个状态文件(调用方需持有 _io_lock)
+
+        Args:
+            run_key: 运行标识
+            state_file: 状态文件路径
+            data: 序列化后的状态
+
+        Returns:
+            是否写入成功
+        """
+        try:
+            # 原子写入确保写入完整性
+            _write_atomic(state_file, data)
+
+            # 删除本次运行的上一个状态文件(文件名随状态/时间变化)
+            previous_file = self._state_files.get(run_key)
+            if previous_file and previous_file != state_file:
+                try:
+                    os.remove(previous_file)
+                except FileNotFoundError:
+                    pass
+            self._state_files[run_key] = state_file
+
+            self.logger.debug("状态已保存: %s", state_file)
+            return True
 
         except Exception as e:
-            self.logger.error(f"保存状态文件失败: {e}")
+            self.logger.error("保存状态文件失败: %s", e)
+            return False
+
+    def _enqueue_write(self, run_key: str, state_file: str, data: bytes):
+        """
+        提交到后台写入线程，尚未写入的旧数据直接被新数据覆盖
+
+        Args:
+            run_key: 运行标识
+            state_file: 状态文件路径
+            data: 序列化后的状态
+        """
+        with self._write_cond:
+            self._queued_write = (run_key, state_file, data)
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name='workflow-state-writer', daemon=True
+                )
+                self._writer.start()
+            self._write_cond.notify()
+
+    def _writer_loop(self):
+        """后台写入线程主循环"""
+        while True:
+            with self._write_cond:
+                while self._queued_write is None:
+                    self._write_cond.wait()
+                item, self._queued_write = self._queued_write, None
+                # 持有写入锁后再释放条件锁，保证 _drain_writes 能等到本次写入完成
+                self._io_lock.acquire()
+            try:
+                self._commit_write(*item)
+            finally:
+                self._io_lock.release()
+
+    def _drain_writes(self):
+        """同步写入后台线程中尚未落盘的数据，并等待正在进行的写入完成"""
+        with self._write_cond:
+            item, self._queued_write = self._queued_write, None
+        with self._io_lock:
+            if item is not None:
+                self._commit_write(*item)
+
+    def mark_task_dirty(self, task_index: int):
+        """
+        标记任务状态已变更(下次保存时重新序列化该任务)
+
+        修改 state['tasks'] 中的任务后必须调用，否则保存的仍是缓存的旧片段
+
+        Args:
+            task_index: 任务索引(0-based)
+        """
+        with self._save_lock:
+            if task_index < len(self._task_fragments):
+                self._task_fragments[task_index] = None
+
+    def _serialize_state(self, state: Dict[str, Any]) -> bytes:
+        """
+        序列化状态，复用未变更任务的JSON片段
+
+        Args:
+            state: 状态字典
+
+        Returns:
+            JSON字节串
+        """
+        tasks = state.get('tasks')
+        if not isinstance(tasks, list):
+            return _dump_json(state)
+
+        # 任务列表被替换(如恢复模式)时重建全部片段
+        if self._fragments_tasks_id != id(tasks) or len(self._task_fragments) != len(tasks):
+            self._fragments_tasks_id = id(tasks)
+            self._task_fragments = [None] * len(tasks)
+
+        fragments = self._task_fragments
+        for idx, fragment in enumerate(fragments):
+            if fragment is None:
+                fragments[idx] = _dump_json(tasks[idx])
+
+        head = _dump_json({k: v for k, v in state.items() if k != 'tasks'}).rstrip()
+        separator = b',\n  ' if head != b'{}' else b'\n  '
+        return b''.join((
+            head[:-1].rstrip(),
+            separator,
+            b'"tasks": [\n',
+            b',\n'.join(fragments),
+            b'\n  ]\n}',
+        ))
 
     def load_latest_failed_state(self) -> Optional[Dict[str, Any]]:
         """
@@ -137,45 +458,47 @@ class WorkflowStateManager:
         """
         try:
             # 查找所有状态文件
-            pattern = os.path.join(self.STATE_DIR, "workflow_state_*.json")
-            state_files = glob.glob(pattern)
+            state_files = self._scan_state_files()
 
             if not state_files:
                 self.logger.debug("未找到任何状态文件")
                 return None
 
-            # 查找失败或中断的状态文件
+            # 根据文件名中的状态和更新时间筛选失败或中断的状态文件,
+            # 只有旧格式文件名才需要解析文件内容
             failed_states = []
 
-            for state_file in state_files:
+            for entry in state_files:
                 try:
-                    with open(state_file, 'r', encoding='utf-8') as f:
-                        state = json.load(f)
+                    parsed = self._parse_state_file_name(entry.name)
+                    if parsed is None:
+                        parsed = self._read_state_summary(entry.path)
 
-                    workflow_status = state.get('metadata', {}).get('workflow_status', '')
+                    workflow_status, last_update_epoch = parsed
 
                     # 只考虑失败或中断的状态
                     if workflow_status in ('failed', 'interrupted'):
-                        last_update = state['metadata'].get('last_update', '')
-                        failed_states.append((state_file, last_update, state))
+                        failed_states.append((entry.path, last_update_epoch))
 
                 except Exception as e:
-                    self.logger.warning(f"读取状态文件失败 {state_file}: {e}")
+                    self.logger.warning("读取状态文件失败 %s: %s", entry.path, e)
                     continue
 
             if not failed_states:
                 self.logger.debug("未找到失败或中断的状态文件")
                 return None
 
-            # 按最后更新时间排序,返回最新的
+            # 按最后更新时间排序,只加载最新的
             failed_states.sort(key=lambda x: x[1], reverse=True)
-            latest_file, _, latest_state = failed_states[0]
+            latest_file = failed_states[0][0]
+            latest_state = _load_state(latest_file)
+            self._state_files[self._get_run_key(latest_state.get('metadata', {}))] = latest_file
 
-            self.logger.info(f"找到最近的失败状态: {os.path.basename(latest_file)}")
+            self.logger.info("找到最近的失败状态: %s", os.path.basename(latest_file))
             return latest_state
 
         except Exception as e:
-            self.logger.error(f"加载失败状态时出错: {e}")
+            self.logger.error("加载失败状态时出错: %s", e)
             return None
 
     def validate_state(self, state: Dict[str, Any], force: bool = False) -> Tuple[bool, str]:
@@ -238,41 +561,40 @@ class WorkflowStateManager:
             清理的文件数量
         """
         try:
-            pattern = os.path.join(self.STATE_DIR, "workflow_state_*.json")
-            state_files = glob.glob(pattern)
+            state_files = self._scan_state_files()
 
             removed_count = 0
             current_time = time.time()
             cutoff_time = current_time - (older_than_days * 24 * 3600)
 
-            for state_file in state_files:
+            for entry in state_files:
                 try:
-                    # 读取状态文件
-                    with open(state_file, 'r', encoding='utf-8') as f:
-                        state = json.load(f)
-
-                    workflow_status = state.get('metadata', {}).get('workflow_status', '')
+                    # 优先从文件名获取状态和更新时间
+                    parsed = self._parse_state_file_name(entry.name)
+                    if parsed is None:
+                        workflow_status = self._read_state_summary(entry.path)[0]
+                        last_update_epoch = entry.stat().st_mtime
+                    else:
+                        workflow_status, last_update_epoch = parsed
 
                     # 只清理成功的状态文件
                     if workflow_status == 'success':
-                        file_mtime = os.path.getmtime(state_file)
-
-                        if file_mtime < cutoff_time:
-                            os.remove(state_file)
+                        if last_update_epoch < cutoff_time:
+                            os.remove(entry.path)
                             removed_count += 1
-                            self.logger.debug(f"清理旧状态文件: {os.path.basename(state_file)}")
+                            self.logger.debug("清理旧状态文件: %s", entry.name)
 
                 except Exception as e:
-                    self.logger.warning(f"清理状态文件失败 {state_file}: {e}")
+                    self.logger.warning("清理状态文件失败 %s: %s", entry.path, e)
                     continue
 
             if removed_count > 0:
-                self.logger.info(f"清理了 {removed_count} 个超过 {older_than_days} 天的成功状态文件")
+                self.logger.info("清理了 %s 个超过 %s 天的成功状态文件", removed_count, older_than_days)
 
             return removed_count
 
         except Exception as e:
-            self.logger.error(f"清理状态文件时出错: {e}")
+            self.logger.error("清理状态文件时出错: %s", e)
             return 0
 
     def acquire_lock(self) -> bool:
@@ -286,58 +608,133 @@ class WorkflowStateManager:
             # 确保锁文件目录存在
             os.makedirs(os.path.dirname(self.LOCK_FILE), exist_ok=True)
 
-            # 打开锁文件
-            self.lock_fd = open(self.LOCK_FILE, 'w')
+            # 打开锁文件(不截断，避免在加锁前清掉持有者写入的PID)
+            fd = os.open(self.LOCK_FILE, os.O_CREAT | os.O_RDWR, 0o644)
 
             # 尝试获取排他锁(非阻塞)
-            fcntl.flock(self.lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                # 锁已被其他进程持有
+                self.logger.debug("工作流锁已被其他进程持有")
+                return False
+            except Exception:
+                os.close(fd)
+                raise
+
+            self.lock_fd = fd
 
             # 写入当前进程PID
-            self.lock_fd.write(str(os.getpid()))
-            self.lock_fd.flush()
+            os.ftruncate(fd, 0)
+            os.write(fd, str(os.getpid()).encode())
 
-            self.logger.debug(f"成功获取工作流锁: {self.LOCK_FILE}")
+            self.logger.debug("成功获取工作流锁: %s", self.LOCK_FILE)
             return True
 
-        except IOError:
-            # 锁已被其他进程持有
-            self.logger.debug("工作流锁已被其他进程持有")
-            return False
         except Exception as e:
-            self.logger.error(f"获取工作流锁失败: {e}")
+            self.logger.error("获取工作流锁失败: %s", e)
             return False
 
     def release_lock(self):
         """释放工作流执行锁"""
+        # 释放锁前确保待保存状态已落盘
+        self.flush()
+
         try:
-            if self.lock_fd:
+            if self.lock_fd is not None:
+                # 不删除锁文件: 删除后其他进程可能对新旧两个文件分别加锁
                 fcntl.flock(self.lock_fd, fcntl.LOCK_UN)
-                self.lock_fd.close()
+                os.close(self.lock_fd)
                 self.lock_fd = None
 
-                # 删除锁文件
-                if os.path.exists(self.LOCK_FILE):
-                    os.remove(self.LOCK_FILE)
-
                 self.logger.debug("已释放工作流锁")
 
         except Exception as e:
-            self.logger.warning(f"释放工作流锁失败: {e}")
+            self.logger.warning("释放工作流锁失败: %s", e)
 
     def _get_state_file_path(self, metadata: Dict[str, Any]) -> str:
         """
         获取状态文件路径
 
+        文件名格式: workflow_state_{config_hash}_{run_id}_{workflow_status}_{last_update_epoch}.json
+
         Args:
             metadata: 元数据字典
 
         Returns:
             状态文件路径
         """
+        workflow_status = metadata.get('workflow_status', 'running')
+        last_update_epoch = metadata.get('last_update_epoch', 0)
+        filename = f"workflow_state_{self._get_run_key(metadata)}_{workflow_status}_{last_update_epoch}.json"
+        return os.path.join(self.STATE_DIR, filename)
+
+    def _get_run_key(self, metadata: Dict[str, Any]) -> str:
+        """
+        获取一次运行的唯一标识(配置哈希+运行ID)
+
+        Args:
+            metadata: 元数据字典
+
+        Returns:
+            运行标识
+        """
         config_hash = metadata.get('config_hash', '00000000')
         run_id = metadata.get('run_id', 'unknown')
-        filename = f"workflow_state_{config_hash}_{run_id}.json"
-        return os.path.join(self.STATE_DIR, filename)
+        return f"{config_hash}_{run_id}"
+
+    def _scan_state_files(self) -> List[os.DirEntry]:
+        """
+        列出状态目录中的所有状态文件
+
+        Returns:
+            状态文件的目录项列表
+        """
+        with os.scandir(self.STATE_DIR) as it:
+            return [
+                entry for entry in it
+                if entry.name.startswith('workflow_state_') and entry.name.endswith('.json')
+            ]
+
+    def _parse_state_file_name(self, file_name: str) -> Optional[Tuple[str, int]]:
+        """
+        从状态文件名解析工作流状态和最后更新时间
+
+        Args:
+            file_name: 状态文件名
+
+        Returns:
+            (工作流状态, 最后更新时间戳),旧格式文件名返回None
+        """
+        stem = file_name[:-len('.json')]
+        parts = stem.rsplit('_', 2)
+        if len(parts) != 3 or parts[1] not in self.WORKFLOW_STATUSES or not parts[2].isdigit():
+            return None
+        return parts[1], int(parts[2])
+
+    def _read_state_summary(self, state_file: str) -> Tuple[str, float]:
+        """
+        读取旧格式状态文件的工作流状态和最后更新时间
+
+        Args:
+            state_file: 状态文件路径
+
+        Returns:
+            (工作流状态, 最后更新时间戳)
+        """
+        metadata = _load_state(state_file).get('metadata', {})
+        workflow_status = metadata.get('workflow_status', '')
+        if 'last_update_epoch' in metadata:
+            return workflow_status, metadata['last_update_epoch']
+
+        # 更早版本的状态只有格式化的时间字符串
+        last_update = metadata.get('last_update', '')
+        try:
+            last_update_epoch = time.mktime(time.strptime(last_update, TIME_FORMAT))
+        except ValueError:
+            last_update_epoch = 0
+        return workflow_status, last_update_epoch
 
 
 # 模块测试
@@ -347,10 +744,11 @@ if __name__ == "__main__":
         config_file = "config.yaml"
 
     class MockLogger:
-        def debug(self, msg): print(f"[DEBUG] {msg}")
-        def info(self, msg): print(f"[INFO] {msg}")
-        def warning(self, msg): print(f"[WARNING] {msg}")
-        def error(self, msg): print(f"[ERROR] {msg}")
+        def isEnabledFor(self, level): return True
+        def debug(self, msg, *args): print(f"[DEBUG] {msg % args}")
+        def info(self, msg, *args): print(f"[INFO] {msg % args}")
+        def warning(self, msg, *args): print(f"[WARNING] {msg % args}")
+        def error(self, msg, *args): print(f"[ERROR] {msg % args}")
 
     config = MockConfig()
     logger = MockLogger()
@@ -4,10 +4,77 @@
 负责按照配置编排和执行任务
 """
 
-from typing import Dict, Any, List, Tuple, Optional
-from datetime import datetime
+import heapq
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Tuple, Optional, NamedTuple
+from workflow_engine.core.result_cache import TaskResultCache
+from workflow_engine.core.state_manager import TIME_FORMAT
+from workflow_engine.tasks.base import Task
 from workflow_engine.tasks.factory import TaskFactory
 
+# 通知消息中支持的模板变量
+_NOTIFY_PATTERN = re.compile(r'\{\{\s*(task_name|message|error_message)\s*\}\}')
+
+
+class TaskSpec(NamedTuple):
+    """任务配置摘要(运行开始时从任务配置中一次性提取调度所需的字段)"""
+
+    index: int  # 任务索引(1-based)
+    name: str
+    type: Optional[str]
+    enabled: bool
+    depends_on: Optional[List[str]]  # 未声明 depends_on 时为None
+    fail_on_error: bool
+    notify_on_success: bool
+    notify_on_failure: bool
+    cache: Optional[Dict[str, Any]]  # 结果缓存配置，未启用时为None
+    label: str  # 日志前缀，如 "[1/5]"
+    config: Dict[str, Any]  # 原始任务配置
+
+    @classmethod
+    def from_config(cls, idx: int, total: int, name: str, task_config: Dict[str, Any]) -> 'TaskSpec':
+        """
+        从任务配置创建
+
+        Args:
+            idx: 任务索引(1-based)
+            total: 任务总数
+            name: 任务名称
+            task_config: 任务配置
+
+        Returns:
+            任务配置摘要
+        """
+        depends_on = None
+        if 'depends_on' in task_config:
+            depends_on = task_config['depends_on'] or []
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+
+        # cache: true 等价于使用默认设置的缓存配置
+        cache = task_config.get('cache')
+        if cache:
+            cache = cache if isinstance(cache, dict) else {}
+        else:
+            cache = None
+
+        return cls(
+            index=idx,
+            name=name,
+            type=task_config.get('type'),
+            enabled=task_config.get('enabled', True),
+            depends_on=depends_on,
+            fail_on_error=task_config.get('fail_on_error', True),
+            notify_on_success=task_config.get('notify_on_success', False),
+            notify_on_failure=task_config.get('notify_on_failure', False),
+            cache=cache,
+            label=f"[{idx}/{total}]",
+            config=task_config
+        )
+
 
 class WorkflowEngine:
     """工作流执行引擎"""
@@ -35,12 +102,23 @@ class WorkflowEngine:
         self.state_manager = state_manager
         self.resume_state = resume_state
         self.current_state = None
-        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.run_id = time.strftime('%Y%m%d_%H%M%S')
         self.from_task = from_task
 
         # 工作流上下文：存储任务间传递的变量
         self.workflow_context: Dict[str, Any] = {}
 
+        # 任务配置摘要及 名称 -> 索引(1-based) 的索引(在run中构建)
+        self._task_specs: List[TaskSpec] = []
+        self._name_to_idx: Dict[str, int] = {}
+
+        # 依赖图分析结果(在run中计算): 任务 -> 最早执行批次(0-based) / 关键路径长度
+        self.task_waves: Dict[str, int] = {}
+        self.critical_path: Dict[str, float] = {}
+
+        # 任务结果缓存(有任务启用cache时创建)
+        self.result_cache: Optional[TaskResultCache] = None
+
         # 执行统计
         self.executed_tasks: List[str] = []
         self.failed_tasks: List[Tuple[str, str]] = []
@@ -55,21 +133,33 @@ class WorkflowEngine:
         """
         tasks_config = self.workflow_config.get('tasks', [])
         settings = self.workflow_config.get('settings', {})
-        stop_on_error = settings.get('stop_on_first_error', True)
 
         if not tasks_config:
             self.logger.warning("工作流配置为空,没有任务需要执行")
             return 0
 
-        # 检查任务名称唯一性
-        task_names = set()
+        # 一次性提取任务配置(同时构建名称索引并检查名称唯一性)
+        total = len(tasks_config)
+        self._task_specs = []
+        self._name_to_idx = {}
         for idx, task_config in enumerate(tasks_config, 1):
             name = task_config.get('name', f'task_{idx}')
-            if name in task_names:
+            if name in self._name_to_idx:
                 self.logger.error(f"任务名称重复: {name}")
                 self.logger.error("请为每个任务配置唯一的名称，以便在日志和通知中区分")
                 return 1
-            task_names.add(name)
+            self._name_to_idx[name] = idx
+            self._task_specs.append(TaskSpec.from_config(idx, total, name, task_config))
+
+        if any(spec.cache is not None for spec in self._task_specs):
+            self.result_cache = TaskResultCache(self.logger, settings.get('cache_dir'))
+
+        # 构建任务依赖图
+        task_graph = self._build_task_graph()
+        if task_graph is None:
+            return 1
+        successors, in_degree = task_graph
+        self._analyze_task_graph(successors, in_degree)
 
         # 创建或恢复状态
         resume_from_index = 0
@@ -81,17 +171,16 @@ class WorkflowEngine:
             self._log_resume_info()
         elif self.from_task:
             # 从指定任务开始执行
-            resume_from_index = self._find_task_index(self.from_task, tasks_config)
+            resume_from_index = self._find_task_index(self.from_task)
             if resume_from_index == -1:
                 self.logger.error(f"未找到任务: {self.from_task}")
                 self.logger.error("可用的任务名称:")
-                for idx, task_config in enumerate(tasks_config, 1):
-                    name = task_config.get('name', f'task_{idx}')
-                    self.logger.error(f"  {idx}. {name}")
+                for spec in self._task_specs:
+                    self.logger.error(f"  {spec.index}. {spec.name}")
                 return 1
             self.logger.info(f"指定任务模式: 从任务 '{self.from_task}' 开始执行")
             self.logger.warning("注意: 跳过的任务不会提供导出变量,如果后续任务依赖这些变量将会失败")
-            self.logger.warning(f"跳过的任务: {', '.join([tc.get('name', f'task_{i}') for i, tc in enumerate(tasks_config[:resume_from_index-1], 1)])}")
+            self.logger.warning(f"跳过的任务: {', '.join(spec.name for spec in self._task_specs[:resume_from_index - 1])}")
             if self.state_manager:
                 self.current_state = self.state_manager.create_state(
                     self.workflow_config, self.run_id
@@ -105,134 +194,539 @@ class WorkflowEngine:
                 )
                 self.state_manager.save_state(self.current_state)
 
-        self.logger.info(f"开始执行工作流,共 {len(tasks_config)} 个任务")
+        self.logger.info(f"开始执行工作流,共 {total} 个任务")
+        self.logger.info(
+            f"依赖图: 预计 {max(self.task_waves.values()) + 1} 个执行批次, "
+            f"关键路径长度 {max(self.critical_path.values()):g}"
+        )
 
-        # 遍历任务配置
-        for idx, task_config in enumerate(tasks_config, 1):
-            name = task_config.get('name', f'task_{idx}')
-            task_type = task_config.get('type')
-            enabled = task_config.get('enabled', True)
-
-            # 恢复模式或指定任务模式: 跳过之前的任务
-            if (self.resume_state or self.from_task) and idx < resume_from_index:
-                skip_reason = "恢复模式跳过" if self.resume_state else "指定任务跳过"
-                self.logger.info(f"[{idx}/{len(tasks_config)}] 任务跳过({skip_reason}): {name}")
-                self.skipped_tasks.append(name)
-                continue
+        try:
+            # 按依赖关系调度执行任务
+            self._run_task_graph(successors, in_degree, resume_from_index, settings)
+
+            # 更新最终工作流状态
+            if self.state_manager and self.current_state:
+                final_status = 'success' if len(self.failed_tasks) == 0 else 'failed'
+                self.current_state['metadata']['workflow_status'] = final_status
+                self.state_manager.save_state(self.current_state)
+
+            # 工作流完成统计
+            self._log_summary()
+        finally:
+            # 等待后台发送的通知全部完成(工作流中断或异常时也发送已提交的通知)
+            flush = getattr(self.notifier, 'flush', None)
+            if flush is not None:
+                flush()
 
-            # 跳过禁用的任务
-            if not enabled:
-                self.logger.info(f"[{idx}/{len(tasks_config)}] 任务已禁用,跳过: {name}")
-                self.skipped_tasks.append(name)
+        # 返回失败任务数
+        return len(self.failed_tasks)
+
+    def _build_task_graph(self) -> Optional[Tuple[Dict[str, List[str]], Dict[str, int]]]:
+        """
+        构建任务依赖图
+
+        任务通过 depends_on 声明所依赖的任务名称;未声明 depends_on 的任务隐式依赖配置中的前一个任务,
+        因此不使用 depends_on 时仍按配置顺序串行执行
+
+        Returns:
+            (后继任务表, 入度表),依赖配置错误时返回None
+        """
+        specs = self._task_specs
+        successors: Dict[str, List[str]] = {spec.name: [] for spec in specs}
+        in_degree: Dict[str, int] = dict.fromkeys(successors, 0)
+
+        for pos, spec in enumerate(specs):
+            # 关键路径分析使用的预估耗时必须是非负数字(如 "10m" 等带单位的值无效)
+            duration = spec.config.get('estimated_duration', 1)
+            try:
+                valid_duration = float(duration) >= 0
+            except (TypeError, ValueError):
+                valid_duration = False
+            if not valid_duration:
+                self.logger.error(f"任务 {spec.name} 的 estimated_duration 无效: {duration!r}(应为非负数字)")
+                return None
+
+            if spec.depends_on is not None:
+                depends_on = spec.depends_on
+            else:
+                depends_on = [specs[pos - 1].name] if pos > 0 else []
+
+            for dep in depends_on:
+                if dep not in successors:
+                    self.logger.error(f"任务 {spec.name} 依赖的任务不存在: {dep}")
+                    return None
+                successors[dep].append(spec.name)
+                in_degree[spec.name] += 1
+
+        # 检查循环依赖
+        cycles = self._find_cycles(successors)
+        if cycles:
+            self.logger.error(f"检测到 {len(cycles)} 处循环依赖,工作流无法执行:")
+            for cycle in cycles:
+                dep, name = self._suggest_edge_to_break(cycle, successors)
+                self.logger.error(f"  循环: {' -> '.join(cycle)}")
+                self.logger.error(f"    建议: 移除任务 {name} 对 {dep} 的依赖")
+            return None
+
+        return successors, in_degree
+
+    def _find_cycles(self, successors: Dict[str, List[str]]) -> List[List[str]]:
+        """
+        使用Tarjan算法(迭代实现)查找依赖图中的循环
+
+        Args:
+            successors: 后继任务表
+
+        Returns:
+            每个循环包含的任务名称列表(强连通分量，含自依赖的单个任务)
+        """
+        index_of: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack = set()
+        stack: List[str] = []
+        cycles: List[List[str]] = []
+        counter = 0
+
+        for root in successors:
+            if root in index_of:
                 continue
 
-            if not task_type:
-                self.logger.error(f"[{idx}/{len(tasks_config)}] 任务配置错误: {name} - 缺少type字段")
-                self.failed_tasks.append((name, "缺少type字段"))
-                if stop_on_error:
+            # 显式栈模拟递归: (节点, 下一个待访问的后继下标)
+            work = [(root, 0)]
+            while work:
+                node, child_pos = work[-1]
+                if child_pos == 0:
+                    index_of[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+
+                children = successors[node]
+                if child_pos < len(children):
+                    work[-1] = (node, child_pos + 1)
+                    child = children[child_pos]
+                    if child not in index_of:
+                        work.append((child, 0))
+                    elif child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                    continue
+
+                # 节点的后继均已访问
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in successors[node]:
+                        component.reverse()
+                        cycles.append(component)
+
+        return cycles
+
+    def _suggest_edge_to_break(self, cycle: List[str],
+                               successors: Dict[str, List[str]]) -> Tuple[str, str]:
+        """
+        为循环选择建议移除的依赖边: 循环内被依赖最多的任务上的一条依赖
+
+        Args:
+            cycle: 循环包含的任务名称
+            successors: 后继任务表
+
+        Returns:
+            (被依赖的任务, 依赖它的任务)
+        """
+        members = set(cycle)
+        edges = [(dep, name) for dep in cycle for name in successors[dep] if name in members]
+        fan_in: Dict[str, int] = {}
+        for _, name in edges:
+            fan_in[name] = fan_in.get(name, 0) + 1
+        return max(edges, key=lambda edge: fan_in[edge[1]])
+
+    def _analyze_task_graph(self, successors: Dict[str, List[str]], in_degree: Dict[str, int]):
+        """
+        计算每个任务的最早执行批次和关键路径长度
+
+        关键路径长度为从该任务开始到工作流结束的最长链上 estimated_duration 之和
+        (未配置 estimated_duration 的任务计为1)，调度时优先执行关键路径更长的就绪任务
+
+        Args:
+            successors: 后继任务表
+            in_degree: 入度表
+        """
+        # 拓扑排序(依赖图已确认无环)
+        remaining = dict(in_degree)
+        order = [name for name, degree in remaining.items() if degree == 0]
+        waves = dict.fromkeys(order, 0)
+        for name in order:
+            for succ in successors[name]:
+                waves[succ] = max(waves.get(succ, 0), waves[name] + 1)
+                remaining[succ] -= 1
+                if remaining[succ] == 0:
+                    order.append(succ)
+
+        durations = {
+            spec.name: float(spec.config.get('estimated_duration', 1))
+            for spec in self._task_specs
+        }
+        critical_path: Dict[str, float] = {}
+        for name in reversed(order):
+            critical_path[name] = durations[name] + max(
+                (critical_path[succ] for succ in successors[name]), default=0
+            )
+
+        self.task_waves = waves
+        self.critical_path = critical_path
+
+    def _ready_entry(self, name: str) -> Tuple[float, int, str]:
+        """
+        生成就绪队列(最小堆)的排序项: 关键路径长的任务优先，其次按配置顺序
+
+        Args:
+            name: 任务名称
+
+        Returns:
+            堆排序项
+        """
+        return -self.critical_path[name], self._name_to_idx[name], name
+
+    def _run_task_graph(self, successors: Dict[str, List[str]], in_degree: Dict[str, int],
+                        resume_from_index: int, settings: Dict[str, Any]):
+        """
+        按拓扑顺序(Kahn算法)调度执行任务
+
+        入度为0的任务按关键路径长度优先并发提交到线程池执行,任务完成后将其后继任务的入度减1,
+        入度降为0的任务加入就绪队列。任务状态、上下文和通知均在调度线程中处理。
+
+        Args:
+            successors: 后继任务表
+            in_degree: 入度表
+            resume_from_index: 恢复/指定任务模式下的起始任务索引(1-based)
+            settings: 工作流设置
+        """
+        stop_on_error = settings.get('stop_on_first_error', True)
+        max_parallel = max(1, int(settings.get('max_parallel', 8)))
+        specs = {spec.name: spec for spec in self._task_specs}
+
+        in_degree = dict(in_degree)
+        ready = [self._ready_entry(name) for name, degree in in_degree.items() if degree == 0]
+        heapq.heapify(ready)
+        running: Dict[Future, TaskSpec] = {}
+        cache_keys: Dict[str, str] = {}
+        stopped = False
+
+        # 任务在线程池中执行(阻塞在子进程/SSH上时释放GIL)，状态保存等操作只在当前调度线程进行，无需额外同步
+        pool = ThreadPoolExecutor(
+            max_workers=min(max_parallel, len(specs)),
+            thread_name_prefix='workflow-task'
+        )
+        try:
+            while ready or running:
+                # 提交所有就绪任务
+                while ready and not stopped:
+                    spec = specs[heapq.heappop(ready)[2]]
+
+                    if not self._check_task_runnable(spec, resume_from_index):
+                        # 跳过的任务视为已完成,不阻塞后继任务
+                        self._release_successors(spec.name, successors, in_degree, ready)
+                        continue
+
+                    if not spec.type:
+                        self.logger.error(f"{spec.label} 任务配置错误: {spec.name} - 缺少type字段")
+                        self.failed_tasks.append((spec.name, "缺少type字段"))
+                        if stop_on_error:
+                            stopped = True
+                        else:
+                            self._release_successors(spec.name, successors, in_degree, ready)
+                        continue
+
+                    # 命中结果缓存时跳过执行,直接复用上次的结果
+                    if spec.cache is not None:
+                        cache_key = self._get_task_cache_key(spec)
+                        cached = self.result_cache.load(cache_key, spec.cache.get('ttl'))
+                        if cached is not None:
+                            self.logger.info("%s 命中任务缓存,跳过执行: %s", spec.label, spec.name)
+                            self.executed_tasks.append(spec.name)
+                            self._record_task_success(spec, cached.get('message', ''), cached.get('exported_vars') or {})
+                            self._release_successors(spec.name, successors, in_degree, ready)
+                            continue
+                        cache_keys[spec.name] = cache_key
+
+                    # 标记任务开始(恢复模式或指定任务模式下显示特殊提示)
+                    if (self.resume_state or self.from_task) and spec.index == resume_from_index:
+                        start_reason = "恢复" if self.resume_state else "指定任务"
+                        self.logger.info("%s 开始执行任务(%s): %s (类型: %s)",
+                                         spec.label, start_reason, spec.name, spec.type)
+                    else:
+                        self.logger.info("%s 开始执行任务: %s (类型: %s)", spec.label, spec.name, spec.type)
+
+                    # 更新任务状态为running
+                    if self.state_manager and self.current_state:
+                        self._update_task_state(spec.index - 1, 'running', '', {})
+                        self.state_manager.save_state(self.current_state)
+
+                    running[pool.submit(self._execute_task, spec)] = spec
+
+                if not running:
                     break
+
+                if stopped:
+                    # 工作流已中断: 唤醒正在等待重试的任务,使其尽快结束
+                    self._abort_executors()
+
+                # 等待任意任务完成
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    spec = running.pop(future)
+
+                    if self._handle_task_result(spec, future, stop_on_error, cache_keys.pop(spec.name, None)):
+                        self._release_successors(spec.name, successors, in_degree, ready)
+                    else:
+                        stopped = True
+        finally:
+            # 调度被异常中断(如KeyboardInterrupt)时: 取消尚未开始的任务,唤醒正在等待重试的任务,
+            # 终止正在执行的本地命令(命令在独立进程组中,收不到终端的Ctrl-C),
+            # 等待执行中的任务结束并记录结果,确保保存状态和释放锁时没有仍在执行的任务
+            if running:
+                self._abort_executors()
+                self._abort_local_commands()
+                for future in running:
+                    future.cancel()
+            pool.shutdown(wait=True)
+            if running:
+                self._record_interrupted_tasks(running)
+
+    def _record_interrupted_tasks(self, running: Dict[Future, TaskSpec]):
+        """
+        记录调度中断时已提交任务的结果,并将工作流状态保存为 interrupted
+
+        Args:
+            running: 中断时已提交的任务(线程池已关闭,Future均已完成或已取消)
+        """
+        for future, spec in running.items():
+            if future.cancelled():
+                # 未开始执行的任务恢复为pending,恢复运行时重新执行
+                if self.state_manager and self.current_state:
+                    self._update_task_state(spec.index - 1, 'pending', '工作流中断,任务未执行', {})
                 continue
+            try:
+                self._handle_task_result(spec, future, stop_on_error=False)
+            except Exception as e:
+                self.logger.warning(f"记录任务结果时出错: {spec.name} - {str(e)}")
 
-            # 标记任务开始(恢复模式或指定任务模式下显示特殊提示)
-            if (self.resume_state or self.from_task) and idx == resume_from_index:
-                start_reason = "恢复" if self.resume_state else "指定任务"
-                self.logger.info(f"[{idx}/{len(tasks_config)}] 开始执行任务({start_reason}): {name} (类型: {task_type})")
-            else:
-                self.logger.info(f"[{idx}/{len(tasks_config)}] 开始执行任务: {name} (类型: {task_type})")
+        if self.state_manager and self.current_state:
+            self.current_state['metadata']['workflow_status'] = 'interrupted'
+            self.state_manager.save_state(self.current_state, force=True)
+
+    def _abort_executors(self):
+        """中止SSH执行器(命令任务和文件传输共享的注册表)正在进行的重试等待"""
+        from workflow_engine.utils.ssh_pool import get_executors
+        for executor in get_executors():
+            executor.abort()
+
+    def _abort_local_commands(self):
+        """终止命令任务正在执行的本地命令(工作流被异常中断时调用)"""
+        from workflow_engine.tasks.command_task import abort_local_commands
+        abort_local_commands()
 
-            # 更新任务状态为running
+    def _check_task_runnable(self, spec: TaskSpec, resume_from_index: int) -> bool:
+        """
+        检查任务是否需要执行,跳过的任务记录到 skipped_tasks
+
+        Args:
+            spec: 任务配置摘要
+            resume_from_index: 恢复/指定任务模式下的起始任务索引(1-based)
+
+        Returns:
+            是否需要执行
+        """
+        # 恢复模式或指定任务模式: 跳过之前的任务
+        if (self.resume_state or self.from_task) and spec.index < resume_from_index:
+            skip_reason = "恢复模式跳过" if self.resume_state else "指定任务跳过"
+            self.logger.info("%s 任务跳过(%s): %s", spec.label, skip_reason, spec.name)
+            self.skipped_tasks.append(spec.name)
+            return False
+
+        # 跳过禁用的任务
+        if not spec.enabled:
+            self.logger.info("%s 任务已禁用,跳过: %s", spec.label, spec.name)
+            self.skipped_tasks.append(spec.name)
+            return False
+
+        return True
+
+    def _execute_task(self, spec: TaskSpec) -> Tuple[Task, bool, str]:
+        """
+        创建并执行任务(在线程池中运行)
+
+        Args:
+            spec: 任务配置摘要
+
+        Returns:
+            (任务实例, 成功标志, 消息)
+        """
+        # 创建并执行任务（传递 workflow_context）
+        task = TaskFactory.create(spec.type, spec.name, spec.config, self.context, self.workflow_context)
+        success, message = task.execute()
+        return task, success, message
+
+    def _handle_task_result(self, spec: TaskSpec, future: Future, stop_on_error: bool,
+                            cache_key: Optional[str] = None) -> bool:
+        """
+        处理已完成任务的结果: 收集导出变量、更新状态、发送通知
+
+        Args:
+            spec: 任务配置摘要
+            future: 任务执行的Future
+            stop_on_error: 是否在首个错误时停止
+            cache_key: 结果缓存键(任务启用cache时)
+
+        Returns:
+            是否继续调度后继任务(False表示工作流中断)
+        """
+        name = spec.name
+
+        try:
+            task, success, message = future.result()
+        except Exception as e:
+            self.logger.exception(f"{spec.label} 任务执行异常: {name}", exc_info=e)
+            error_msg = str(e)
+            self.failed_tasks.append((name, error_msg))
+
+            # 更新任务状态为failed
             if self.state_manager and self.current_state:
-                self._update_task_state(idx - 1, 'running', '', {})
+                self._update_task_state(spec.index - 1, 'failed', error_msg, {})
                 self.state_manager.save_state(self.current_state)
 
+            # 发送失败通知
+            if spec.notify_on_failure and self.notifier:
+                self._send_notification(spec.config, 'failure', name, error_msg)
+
+            # 检查是否需要中断流程
+            if spec.fail_on_error and stop_on_error:
+                self.logger.error("任务异常导致工作流中断")
+                return False
+            return True
+
+        self.executed_tasks.append(name)
+
+        if success:
+            self.logger.info("%s 任务成功: %s - %s", spec.label, name, message)
+
+            # 任务成功后，收集导出的变量
+            exported_vars = {}
             try:
-                # 创建并执行任务（传递 workflow_context）
-                task = TaskFactory.create(task_type, name, task_config, self.context, self.workflow_context)
-                success, message = task.execute()
-
-                self.executed_tasks.append(name)
-
-                if success:
-                    self.logger.info(f"[{idx}/{len(tasks_config)}] 任务成功: {name} - {message}")
-
-                    # 任务成功后，收集导出的变量
-                    exported_vars = {}
-                    try:
-                        exported_vars = task.export_context()
-                        if exported_vars:
-                            # 使用任务名作为命名空间，创建嵌套字典结构
-                            # 这样 Jinja2 可以通过 {{ task_name.var_name }} 访问
-                            if name not in self.workflow_context:
-                                self.workflow_context[name] = {}
-
-                            for key, value in exported_vars.items():
-                                self.workflow_context[name][key] = value
-                                self.logger.debug(f"导出变量: {name}.{key} = {value}")
-
-                            self.logger.info(f"任务 {name} 导出了 {len(exported_vars)} 个变量")
-                    except Exception as e:
-                        self.logger.warning(f"收集任务导出变量时出错: {str(e)}")
-
-                    # 更新任务状态为success
-                    if self.state_manager and self.current_state:
-                        self._update_task_state(idx - 1, 'success', message, exported_vars)
-                        # 更新workflow_context到状态文件
-                        self.current_state['workflow_context'] = self.workflow_context
-                        self.state_manager.save_state(self.current_state)
+                exported_vars = task.export_context() or {}
+            except Exception as e:
+                self.logger.warning(f"收集任务导出变量时出错: {str(e)}")
 
-                    # 发送成功通知
-                    if task_config.get('notify_on_success', False) and self.notifier:
-                        self._send_notification(task_config, 'success', name, message)
-                else:
-                    self.logger.error(f"[{idx}/{len(tasks_config)}] 任务失败: {name} - {message}")
-                    self.failed_tasks.append((name, message))
+            if cache_key is not None:
+                self.result_cache.save(cache_key, message, exported_vars)
 
-                    # 更新任务状态为failed
-                    if self.state_manager and self.current_state:
-                        self._update_task_state(idx - 1, 'failed', message, {})
-                        self.state_manager.save_state(self.current_state)
+            self._record_task_success(spec, message, exported_vars)
+            return True
 
-                    # 发送失败通知
-                    if task_config.get('notify_on_failure', False) and self.notifier:
-                        self._send_notification(task_config, 'failure', name, message)
+        self.logger.error(f"{spec.label} 任务失败: {name} - {message}")
+        self.failed_tasks.append((name, message))
 
-                    # 检查是否需要中断流程
-                    fail_on_error = task_config.get('fail_on_error', True)
-                    if fail_on_error and stop_on_error:
-                        self.logger.error("任务失败导致工作流中断")
-                        break
+        # 更新任务状态为failed
+        if self.state_manager and self.current_state:
+            self._update_task_state(spec.index - 1, 'failed', message, {})
+            self.state_manager.save_state(self.current_state)
 
-            except Exception as e:
-                self.logger.exception(f"[{idx}/{len(tasks_config)}] 任务执行异常: {name}")
-                error_msg = str(e)
-                self.failed_tasks.append((name, error_msg))
+        # 发送失败通知
+        if spec.notify_on_failure and self.notifier:
+            self._send_notification(spec.config, 'failure', name, message)
 
-                # 更新任务状态为failed
-                if self.state_manager and self.current_state:
-                    self._update_task_state(idx - 1, 'failed', error_msg, {})
-                    self.state_manager.save_state(self.current_state)
+        # 检查是否需要中断流程
+        if spec.fail_on_error and stop_on_error:
+            self.logger.error("任务失败导致工作流中断")
+            return False
+        return True
 
-                # 发送失败通知
-                if task_config.get('notify_on_failure', False) and self.notifier:
-                    self._send_notification(task_config, 'failure', name, error_msg)
+    def _record_task_success(self, spec: TaskSpec, message: str, exported_vars: Dict[str, Any]):
+        """
+        记录任务成功: 合并导出变量、更新状态、发送通知
 
-                # 检查是否需要中断流程
-                fail_on_error = task_config.get('fail_on_error', True)
-                if fail_on_error and stop_on_error:
-                    self.logger.error("任务异常导致工作流中断")
-                    break
+        Args:
+            spec: 任务配置摘要
+            message: 任务结果消息
+            exported_vars: 任务导出的变量
+        """
+        name = spec.name
+
+        if exported_vars:
+            # 使用任务名作为命名空间，创建嵌套字典结构
+            # 这样 Jinja2 可以通过 {{ task_name.var_name }} 访问
+            self.workflow_context.setdefault(name, {}).update(exported_vars)
 
-        # 更新最终工作流状态
+            # 逐个变量的调试日志仅在DEBUG级别开启时输出(变量值可能很大，避免无谓的格式化)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                for key, value in exported_vars.items():
+                    self.logger.debug("导出变量: %s.%s = %s", name, key, value)
+
+            self.logger.info("任务 %s 导出了 %d 个变量", name, len(exported_vars))
+
+        # 更新任务状态为success
         if self.state_manager and self.current_state:
-            final_status = 'success' if len(self.failed_tasks) == 0 else 'failed'
-            self.current_state['metadata']['workflow_status'] = final_status
+            self._update_task_state(spec.index - 1, 'success', message, exported_vars)
+            # 更新workflow_context到状态文件
+            self.current_state['workflow_context'] = self.workflow_context
             self.state_manager.save_state(self.current_state)
 
-        # 工作流完成统计
-        self._log_summary()
+        # 发送成功通知
+        if spec.notify_on_success and self.notifier:
+            self._send_notification(spec.config, 'success', name, message)
 
-        # 返回失败任务数
-        return len(self.failed_tasks)
+    def _get_task_cache_key(self, spec: TaskSpec) -> str:
+        """
+        计算任务结果缓存键
+
+        缓存配置的 key_inputs 指定参与计算的上下文变量(如 "upload_data" 或 "upload_data.archive_name")，
+        未指定时使用全部 workflow_context
+
+        Args:
+            spec: 任务配置摘要
+
+        Returns:
+            缓存键
+        """
+        key_inputs = spec.cache.get('key_inputs')
+        if key_inputs is None:
+            inputs = self.workflow_context
+        else:
+            inputs = {}
+            for key in key_inputs:
+                task_name, _, var_name = key.partition('.')
+                value = self.workflow_context.get(task_name)
+                if var_name:
+                    value = value.get(var_name) if isinstance(value, dict) else None
+                inputs[key] = value
+
+        return self.result_cache.make_key(spec.name, spec.config, inputs)
+
+    def _release_successors(self, name: str, successors: Dict[str, List[str]],
+                            in_degree: Dict[str, int], ready: List[Tuple[float, int, str]]):
+        """
+        任务完成后将后继任务的入度减1,入度为0的任务加入就绪队列
+
+        Args:
+            name: 已完成的任务名称
+            successors: 后继任务表
+            in_degree: 入度表
+            ready: 就绪队列(按关键路径排序的最小堆)
+        """
+        for succ in successors[name]:
+            in_degree[succ] -= 1
+            if in_degree[succ] == 0:
+                heapq.heappush(ready, self._ready_entry(succ))
 
     def _send_notification(self, task_config: Dict[str, Any], notify_type: str, task_name: str, message: str):
         """
@@ -253,16 +747,17 @@ class WorkflowEngine:
             title = type_config.get('title', f"任务{notify_type}: {task_name}")
             notify_message = type_config.get('message', message)
 
-            # 简单的模板变量替换
-            notify_message = notify_message.replace('{{ task_name }}', task_name)
-            notify_message = notify_message.replace('{{ message }}', message)
-            notify_message = notify_message.replace('{{ error_message }}', message)
+            # 简单的模板变量替换(单次扫描)
+            substitutions = {'task_name': task_name, 'message': message, 'error_message': message}
+            notify_message = _NOTIFY_PATTERN.sub(lambda m: substitutions[m.group(1)], notify_message)
 
-            # 发送通知
-            if notify_type == 'success':
-                self.notifier.send_success(title, notify_message)
+            # 发送通知(支持异步发送时在后台线程发送，不阻塞任务调度)
+            method = 'send_success' if notify_type == 'success' else 'send_failure'
+            submit = getattr(self.notifier, 'submit', None)
+            if submit is not None:
+                submit(method, title, notify_message)
             else:
-                self.notifier.send_failure(title, notify_message)
+                getattr(self.notifier, method)(title, notify_message)
 
             self.logger.info(f"已发送{notify_type}通知: {title}")
 
@@ -323,51 +818,54 @@ class WorkflowEngine:
             message: 消息
             exported_vars: 导出的变量
         """
-        if task_index >= len(self.current_state['tasks']):
+        state = self.current_state
+        task_states = state['tasks']
+        if task_index >= len(task_states):
             self.logger.warning(f"任务索引越界: {task_index}")
             return
 
-        task_state = self.current_state['tasks'][task_index]
+        now = time.strftime(TIME_FORMAT)
+        task_state = task_states[task_index]
         task_state['status'] = status
         task_state['message'] = message
-
-        if status == 'running':
-            task_state['start_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        else:
-            task_state['end_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        task_state['start_time' if status == 'running' else 'end_time'] = now
 
         if exported_vars:
             task_state['exported_context'] = exported_vars
 
+        if self.state_manager:
+            self.state_manager.mark_task_dirty(task_index)
+
         # 更新metadata
-        self.current_state['metadata']['last_update'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        state['metadata']['last_update'] = now
 
     def _log_resume_info(self):
         """记录恢复信息"""
         metadata = self.current_state['metadata']
-        completed = sum(1 for t in self.current_state['tasks'] if t['status'] == 'success')
-        failed_task = next((t for t in self.current_state['tasks']
-                           if t['status'] in ('failed', 'running')), None)
-
-        self.logger.info(f"加载状态文件: workflow_state_{metadata['config_hash']}_{metadata['run_id']}.json")
+        completed = 0
+        failed_task = None
+        # 单次遍历统计完成数并找到第一个失败任务
+        for task_state in self.current_state['tasks']:
+            status = task_state['status']
+            if status == 'success':
+                completed += 1
+            elif failed_task is None and status in ('failed', 'running'):
+                failed_task = task_state
+
+        self.logger.info(f"加载状态: 配置hash {metadata['config_hash']}, 运行ID {metadata['run_id']}")
         self.logger.info(f"原始运行时间: {metadata['start_time']}")
         self.logger.info(f"已完成任务: {completed} 个")
         if failed_task:
             self.logger.info(f"失败任务: {failed_task['name']}")
 
-    def _find_task_index(self, task_name: str, tasks_config: List[Dict[str, Any]]) -> int:
+    def _find_task_index(self, task_name: str) -> int:
         """
         查找任务在配置列表中的索引
 
         Args:
             task_name: 任务名称
-            tasks_config: 任务配置列表
 
         Returns:
             任务索引(1-based),未找到返回-1
         """
-        for idx, task_config in enumerate(tasks_config, 1):
-            name = task_config.get('name', f'task_{idx}')
-            if name == task_name:
-                return idx
-        return -1
+        return self._name_to_idx.get(task_name, -1)
@@ -2,14 +2,24 @@
 任务模块 - 自动注册所有任务类型
 """
 
+from typing import TYPE_CHECKING
+
+from workflow_engine._lazy import install_lazy_imports
 from workflow_engine.tasks.factory import TaskFactory
 from workflow_engine.tasks.base import Task
-from workflow_engine.tasks.command_task import CommandTask
-from workflow_engine.tasks.file_copy_task import FileCopyTask
 
-# 注册内置任务类型
-TaskFactory.register('command', CommandTask)
-TaskFactory.register('transfer', FileCopyTask)
+# 注册内置任务类型(首次创建该类型任务时才导入对应模块，避免提前加载jinja2等依赖)
+TaskFactory.register_lazy('command', 'workflow_engine.tasks.command_task', 'CommandTask')
+TaskFactory.register_lazy('transfer', 'workflow_engine.tasks.file_copy_task', 'FileCopyTask')
+
+install_lazy_imports(globals(), {
+    'CommandTask': 'workflow_engine.tasks.command_task',
+    'FileCopyTask': 'workflow_engine.tasks.file_copy_task',
+})
+
+if TYPE_CHECKING:
+    from workflow_engine.tasks.command_task import CommandTask
+    from workflow_engine.tasks.file_copy_task import FileCopyTask
 
 __all__ = [
     'TaskFactory',
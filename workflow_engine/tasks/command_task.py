@@ -4,11 +4,30 @@
 支持SSH远程命令和本地命令执行，完全由配置驱动
 """
 
+import os
 import re
-from typing import Tuple, List, Dict, Any
-from jinja2 import Template, TemplateError
+import signal
+import subprocess
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Tuple, List, Dict, Any, Optional, Pattern, Set
 from .base import Task
 
+if TYPE_CHECKING:
+    from jinja2 import Template
+
+# 正在执行本地命令的任务(命令在独立进程组中运行，终端的Ctrl-C不会传给命令，工作流中断时由 abort_local_commands 终止)
+_LOCAL_RUNNING: Set['CommandTask'] = set()
+_LOCAL_RUNNING_LOCK = threading.Lock()
+
+
+def abort_local_commands():
+    """终止所有正在执行的本地命令的进程组(工作流被中断时调用)"""
+    with _LOCAL_RUNNING_LOCK:
+        tasks = list(_LOCAL_RUNNING)
+    for task in tasks:
+        task._abort_local_command()
+
 
 class CommandTask(Task):
     """通用命令执行任务，支持SSH和本地命令"""
@@ -25,6 +44,15 @@ class CommandTask(Task):
         "失败",
     ]
 
+    # 本地命令输出只保留最后的行数(用于日志和结果检查)
+    OUTPUT_TAIL_LINES = 2000
+
+    # 已编译的命令模板缓存(模板字符串 -> Template)，避免重复解析和编译
+    _TEMPLATE_CACHE: Dict[str, 'Template'] = {}
+
+    # 关键词列表 -> 编译后的多关键词正则，一次扫描即可检查所有关键词
+    _KEYWORD_PATTERNS: Dict[Tuple[str, ...], Pattern] = {}
+
     def execute(self) -> Tuple[bool, str]:
         """
         执行命令
@@ -52,15 +80,10 @@ class CommandTask(Task):
         if not host:
             return False, "SSH命令必须指定 host 参数"
 
-        # 检查是否需要创建或切换host
+        # 从共享上下文的缓存中获取该host的SSH执行器
         if not self.ssh or self.ssh.host != host:
-            self.logger.info(f"创建/切换SSH连接到: {host}")
-            # 创建或重新初始化SSH执行器
-            from workflow_engine.utils.executor import SSHExecutor
-            self.ssh = SSHExecutor(
-                host=host,
-                logger=self.logger
-            )
+            self.ssh = self._get_ssh_executor(host)
+            # 兼容读取 context['ssh'] 的自定义任务
             self.context['ssh'] = self.ssh
 
         # 渲染命令
@@ -99,14 +122,43 @@ class CommandTask(Task):
             else:
                 return False, f"命令执行失败（已重试{max_retries}次）"
         else:
-            # 使用单次执行方法
+            # 使用单次执行方法，读取输出时在完整输出上增量检查关键词(返回的输出只包含最后的行)
+            error_pattern = self._error_keyword_pattern()
+            success_pattern = self._success_keyword_pattern()
+            keyword_scan = [None, False]
+
+            def scan_line(line: str):
+                if error_pattern is not None and keyword_scan[0] is None:
+                    match = error_pattern.search(line)
+                    if match:
+                        keyword_scan[0] = match.group(0)
+                if success_pattern is not None and not keyword_scan[1]:
+                    keyword_scan[1] = success_pattern.search(line) is not None
+
             success, output, exit_code = self.ssh.execute_command(
                 command,
-                timeout=timeout
+                timeout=timeout,
+                on_line=scan_line
             )
 
             # 判断命令是否成功
-            return self._check_command_result(success, output, exit_code)
+            return self._check_command_result(success, output, exit_code, tuple(keyword_scan))
+
+    def _get_ssh_executor(self, host: str) -> 'SSHExecutor':
+        """
+        获取指定host的SSH执行器
+
+        执行器使用进程级的按host共享注册表(与文件传输共用同一个执行器和复用主连接)；
+        执行器不在任务间淘汰关闭(其他并行任务可能仍在使用主连接)，主连接在进程退出时关闭
+
+        Args:
+            host: SSH配置中的主机名
+
+        Returns:
+            SSH执行器实例
+        """
+        from workflow_engine.utils.ssh_pool import get_executor
+        return get_executor(host, self.logger)
 
     def _execute_local_command(self) -> Tuple[bool, str]:
         """执行本地命令"""
@@ -118,8 +170,6 @@ class CommandTask(Task):
 
         self.logger.info(f"执行本地命令:\n{command}")
 
-        import subprocess
-
         try:
             # 获取超时时间
             timeout = self.get_param('timeout')
@@ -133,32 +183,130 @@ class CommandTask(Task):
 
             self.logger.info(f"使用shell: {shell}")
 
-            # 执行命令
-            result = subprocess.run(
-                command,
-                shell=True,
-                executable=shell,
-                capture_output=True,
-                text=True,
-                timeout=timeout
+            # 执行命令(流式读取输出)
+            exit_code, output, error_keyword, success_found = self._stream_local_command(
+                command, shell, timeout
             )
 
-            output = result.stdout + result.stderr
-            exit_code = result.returncode
-
             # 记录输出
             if output:
                 self.logger.info(f"命令输出:\n{output}")
 
+            if exit_code is None:
+                if self._local_aborted.is_set():
+                    return False, "工作流中断，命令已终止"
+                return False, f"命令执行超时 ({timeout}秒)"
+
+            # 发现错误关键词时命令已被提前终止
+            if error_keyword is not None:
+                return False, f"输出中发现错误关键词: {error_keyword}"
+
             # 判断命令是否成功
-            return self._check_command_result(True, output, exit_code)
+            return self._check_command_result(True, output, exit_code, (error_keyword, success_found))
 
-        except subprocess.TimeoutExpired:
-            return False, f"命令执行超时 ({timeout}秒)"
         except Exception as e:
             self.logger.exception("本地命令执行异常")
             return False, f"命令执行异常: {str(e)}"
 
+    def _stream_local_command(
+        self, command: str, shell: str, timeout: int
+    ) -> Tuple[Optional[int], str, Optional[str], bool]:
+        """
+        执行本地命令并逐行读取输出
+
+        读取过程中增量检查错误/成功关键词，发现错误关键词时立即终止命令；
+        只保留最后 OUTPUT_TAIL_LINES 行输出用于日志和结果检查。
+        命令在独立的进程组中运行，超时或发现错误关键词时终止整个进程组
+        (只终止shell时，仍持有输出管道的子进程会使读取一直阻塞)
+
+        Args:
+            command: 要执行的命令
+            shell: 执行命令的shell
+            timeout: 超时时间（秒）
+
+        Returns:
+            (退出码(超时或工作流中断为None), 输出内容, 发现的错误关键词, 是否发现成功关键词)
+        """
+        error_pattern = self._error_keyword_pattern()
+        success_pattern = self._success_keyword_pattern()
+
+        proc = subprocess.Popen(
+            command,
+            shell=True,
+            executable=shell,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors='replace',
+            bufsize=1,
+            start_new_session=True
+        )
+        self._local_proc = proc
+        self._local_aborted = threading.Event()
+        with _LOCAL_RUNNING_LOCK:
+            _LOCAL_RUNNING.add(self)
+
+        timed_out = threading.Event()
+
+        def kill_on_timeout():
+            timed_out.set()
+            self._kill_process_group(proc)
+
+        timer = threading.Timer(timeout, kill_on_timeout)
+        timer.daemon = True
+        timer.start()
+
+        tail = deque(maxlen=self.OUTPUT_TAIL_LINES)
+        error_keyword = None
+        success_found = False
+        try:
+            for line in proc.stdout:
+                tail.append(line)
+
+                if success_pattern is not None and not success_found:
+                    success_found = success_pattern.search(line) is not None
+
+                if error_pattern is not None:
+                    match = error_pattern.search(line)
+                    if match:
+                        error_keyword = match.group(0)
+                        self.logger.warning(f"输出中发现错误关键词，终止命令: {error_keyword}")
+                        self._kill_process_group(proc)
+                        break
+            exit_code = proc.wait()
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+            # 读取输出时出现异常，命令仍在运行: 终止整个进程组并回收进程
+            if proc.poll() is None:
+                self._kill_process_group(proc)
+                proc.wait()
+            with _LOCAL_RUNNING_LOCK:
+                _LOCAL_RUNNING.discard(self)
+
+        if timed_out.is_set() or self._local_aborted.is_set():
+            return None, ''.join(tail), error_keyword, success_found
+        return exit_code, ''.join(tail), error_keyword, success_found
+
+    def _abort_local_command(self):
+        """终止正在执行的本地命令(工作流中断时由 abort_local_commands 调用)"""
+        self._local_aborted.set()
+        self._kill_process_group(self._local_proc)
+
+    @staticmethod
+    def _kill_process_group(proc: subprocess.Popen):
+        """
+        终止命令所在的整个进程组(包括shell启动的子进程)
+
+        Args:
+            proc: 以 start_new_session=True 启动的进程
+        """
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            # 进程组已全部退出
+            pass
+
     def _render_command(self) -> str:
         """
         渲染命令模板
@@ -175,6 +323,10 @@ class CommandTask(Task):
             self.logger.error("未配置 command 或 command_template")
             return ""
 
+        # 不含模板标记时无需渲染，直接返回
+        if '{{' not in command_template and '{%' not in command_template and '{#' not in command_template:
+            return command_template.strip()
+
         # 获取模板参数
         # 支持两种格式: params 字典 或 直接在 config 中的参数
         params = self.config.get('params', {})
@@ -187,14 +339,14 @@ class CommandTask(Task):
         if params:
             render_vars.update(params)  # params 优先级更高
 
-        # 如果没有模板变量，直接返回
-        if not render_vars and '{{' not in command_template and '{%' not in command_template:
-            return command_template
+        # 使用 Jinja2 渲染模板(jinja2仅在需要渲染时导入)
+        from jinja2 import Template, TemplateError, StrictUndefined
 
-        # 使用 Jinja2 渲染模板
         try:
-            from jinja2 import StrictUndefined
-            template = Template(command_template, undefined=StrictUndefined)
+            template = self._TEMPLATE_CACHE.get(command_template)
+            if template is None:
+                template = Template(command_template, undefined=StrictUndefined)
+                self._TEMPLATE_CACHE[command_template] = template
             rendered = template.render(**render_vars)
             return rendered.strip()
         except TemplateError as e:
@@ -205,7 +357,10 @@ class CommandTask(Task):
             self.logger.exception("命令模板渲染异常")
             return ""
 
-    def _check_command_result(self, success: bool, output: str, exit_code: int) -> Tuple[bool, str]:
+    def _check_command_result(
+        self, success: bool, output: str, exit_code: int,
+        keyword_scan: Optional[Tuple[Optional[str], bool]] = None
+    ) -> Tuple[bool, str]:
         """
         检查命令执行结果
 
@@ -213,6 +368,7 @@ class CommandTask(Task):
             success: SSH执行器返回的成功标志
             output: 命令输出
             exit_code: 退出码
+            keyword_scan: 已在读取输出时完成的关键词检查结果 (错误关键词, 是否发现成功关键词)
 
         Returns:
             (成功标志, 消息)
@@ -227,19 +383,24 @@ class CommandTask(Task):
                 return False, f"命令退出码异常: {exit_code}"
 
         # 2. 检查错误关键词
-        if self.config.get('check_error_keywords', True):
-            error_keywords = self.config.get('error_keywords', self.DEFAULT_ERROR_KEYWORDS)
-            for keyword in error_keywords:
-                if keyword in output:
-                    return False, f"输出中发现错误关键词: {keyword}"
+        if keyword_scan is not None:
+            error_keyword = keyword_scan[0]
+        else:
+            error_pattern = self._error_keyword_pattern()
+            match = error_pattern.search(output) if error_pattern is not None else None
+            error_keyword = match.group(0) if match else None
+        if error_keyword is not None:
+            return False, f"输出中发现错误关键词: {error_keyword}"
 
         # 3. 检查成功关键词
-        if self.config.get('check_success_keywords', False):
-            success_keywords = self.config.get('success_keywords', [])
-            if success_keywords:
-                found = any(kw in output for kw in success_keywords)
-                if not found:
-                    return False, f"输出中未找到成功关键词: {success_keywords}"
+        success_pattern = self._success_keyword_pattern()
+        if success_pattern is not None:
+            if keyword_scan is not None:
+                success_found = keyword_scan[1]
+            else:
+                success_found = success_pattern.search(output) is not None
+            if not success_found:
+                return False, f"输出中未找到成功关键词: {self.config.get('success_keywords')}"
 
         # 4. 检查输出文件（SSH远程文件）
         if self.config.get('check_output_files', False):
@@ -249,6 +410,41 @@ class CommandTask(Task):
 
         return True, "命令执行成功"
 
+    def _error_keyword_pattern(self) -> Optional[Pattern]:
+        """获取错误关键词正则，未启用检查时返回None"""
+        if not self.config.get('check_error_keywords', True):
+            return None
+        error_keywords = self.config.get('error_keywords', self.DEFAULT_ERROR_KEYWORDS)
+        return self._keyword_pattern(error_keywords) if error_keywords else None
+
+    def _success_keyword_pattern(self) -> Optional[Pattern]:
+        """获取成功关键词正则，未启用检查时返回None"""
+        if not self.config.get('check_success_keywords', False):
+            return None
+        success_keywords = self.config.get('success_keywords', [])
+        return self._keyword_pattern(success_keywords) if success_keywords else None
+
+    @classmethod
+    def _keyword_pattern(cls, keywords: List[str]) -> Pattern:
+        """
+        获取匹配任一关键词的编译正则(按关键词列表缓存)
+
+        Args:
+            keywords: 关键词列表
+
+        Returns:
+            编译后的正则表达式
+        """
+        key = tuple(str(keyword) for keyword in keywords)
+        pattern = cls._KEYWORD_PATTERNS.get(key)
+        if pattern is None:
+            # 较长的关键词优先匹配，避免被其前缀关键词遮挡
+            pattern = re.compile('|'.join(
+                re.escape(keyword) for keyword in sorted(key, key=len, reverse=True)
+            ))
+            cls._KEYWORD_PATTERNS[key] = pattern
+        return pattern
+
     def _check_output_files(self) -> Tuple[bool, str]:
         """
         检查输出文件是否存在
@@ -262,46 +458,76 @@ class CommandTask(Task):
 
         executor = self.config.get('executor', 'ssh')
 
-        for file_config in expected_files:
-            file_path = file_config.get('path')
-            must_exist = file_config.get('must_exist', True)
-            min_size = file_config.get('min_size', 0)
+        checks = [
+            (file_config.get('path'), file_config.get('must_exist', True), file_config.get('min_size', 0))
+            for file_config in expected_files
+            if file_config.get('path')
+        ]
 
-            if not file_path:
-                continue
-
-            # 检查文件是否存在
-            if executor == 'ssh':
-                check_cmd = f"test -f {file_path} && echo 'EXISTS' || echo 'NOT_EXISTS'"
-                success, output, _ = self.ssh.execute_command(check_cmd, timeout=10)
-                file_exists = success and 'EXISTS' in output
-            else:
-                import os
+        # 获取文件状态: (是否存在, 文件大小)
+        if executor == 'ssh':
+            # 所有远程文件在一次SSH调用中检查
+            file_stats = self._stat_remote_files([file_path for file_path, _, _ in checks])
+        else:
+            file_stats = []
+            for file_path, _, min_size in checks:
                 file_exists = os.path.isfile(file_path)
+                file_size = os.path.getsize(file_path) if file_exists and min_size > 0 else None
+                file_stats.append((file_exists, file_size))
 
+        for (file_path, must_exist, min_size), (file_exists, file_size) in zip(checks, file_stats):
             if must_exist and not file_exists:
                 return False, f"输出文件不存在: {file_path}"
 
             # 检查文件大小
             if file_exists and min_size > 0:
-                if executor == 'ssh':
-                    size_cmd = f"stat -c %s {file_path}"
-                    success, output, _ = self.ssh.execute_command(size_cmd, timeout=10)
-                    if success:
-                        try:
-                            file_size = int(output.strip())
-                            if file_size < min_size:
-                                return False, f"输出文件大小不足: {file_path} (期望>={min_size}, 实际={file_size})"
-                        except ValueError:
-                            self.logger.warning(f"无法获取文件大小: {file_path}")
-                else:
-                    import os
-                    file_size = os.path.getsize(file_path)
-                    if file_size < min_size:
-                        return False, f"输出文件大小不足: {file_path} (期望>={min_size}, 实际={file_size})"
+                if file_size is None:
+                    self.logger.warning(f"无法获取文件大小: {file_path}")
+                elif file_size < min_size:
+                    return False, f"输出文件大小不足: {file_path} (期望>={min_size}, 实际={file_size})"
 
         return True, "输出文件检查通过"
 
+    def _stat_remote_files(self, file_paths: List[str]) -> List[Tuple[bool, Optional[int]]]:
+        """
+        通过一次SSH调用获取多个远程文件的存在性和大小
+
+        Args:
+            file_paths: 远程文件路径列表
+
+        Returns:
+            与 file_paths 一一对应的 (是否存在, 文件大小) 列表，无法获取大小时为None
+        """
+        if not file_paths:
+            return []
+
+        # 每个文件输出一行: "OK <序号> <大小>" 或 "MISS <序号>"
+        script = "\n".join(
+            f'if [ -f {file_path} ]; then echo "OK {idx} $(stat -c %s {file_path})"; '
+            f'else echo "MISS {idx}"; fi'
+            for idx, file_path in enumerate(file_paths)
+        )
+        success, output, _ = self.ssh.execute_command(
+            script, check_error_keywords=False, timeout=10, tail_lines=None
+        )
+
+        file_stats: List[Tuple[bool, Optional[int]]] = [(False, None)] * len(file_paths)
+        if not success:
+            return file_stats
+
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) < 2 or parts[0] not in ('OK', 'MISS') or not parts[1].isdigit():
+                continue
+            idx = int(parts[1])
+            if idx >= len(file_paths):
+                continue
+            if parts[0] == 'OK':
+                file_size = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else None
+                file_stats[idx] = (True, file_size)
+
+        return file_stats
+
 
 # 测试代码
 if __name__ == "__main__":
@@ -4,7 +4,8 @@
 根据任务类型创建任务实例
 """
 
-from typing import Dict, Type, Any
+import importlib
+from typing import Dict, Type, Any, Tuple
 from .base import Task
 
 
@@ -12,6 +13,8 @@ class TaskFactory:
     """任务工厂,根据类型创建任务实例"""
 
     _task_registry: Dict[str, Type[Task]] = {}
+    # 延迟注册的任务类型: 类型标识 -> (模块路径, 类名)，首次创建该类型任务时才导入
+    _lazy_registry: Dict[str, Tuple[str, str]] = {}
 
     @classmethod
     def register(cls, task_type: str, task_class: Type[Task]):
@@ -24,6 +27,18 @@ class TaskFactory:
         """
         cls._task_registry[task_type] = task_class
 
+    @classmethod
+    def register_lazy(cls, task_type: str, module_path: str, class_name: str):
+        """
+        延迟注册任务类型(首次创建该类型任务时才导入任务模块)
+
+        Args:
+            task_type: 任务类型标识
+            module_path: 任务类所在模块路径
+            class_name: 任务类名
+        """
+        cls._lazy_registry[task_type] = (module_path, class_name)
+
     @classmethod
     def create(cls, task_type: str, name: str, config: Dict[str, Any], context: Dict[str, Any], workflow_context: Dict[str, Any] = None) -> Task:
         """
@@ -42,10 +57,16 @@ class TaskFactory:
         Raises:
             ValueError: 未知的任务类型
         """
-        if task_type not in cls._task_registry:
-            raise ValueError(f"未知的任务类型: {task_type}")
+        task_class = cls._task_registry.get(task_type)
+        if task_class is None:
+            if task_type not in cls._lazy_registry:
+                raise ValueError(f"未知的任务类型: {task_type}")
+
+            # 导入延迟注册的任务类
+            module_path, class_name = cls._lazy_registry[task_type]
+            task_class = getattr(importlib.import_module(module_path), class_name)
+            cls._task_registry[task_type] = task_class
 
-        task_class = cls._task_registry[task_type]
         return task_class(name, config, context, workflow_context)
 
     @classmethod
@@ -56,4 +77,4 @@ class TaskFactory:
         Returns:
             任务类型列表
         """
-        return list(cls._task_registry.keys())
+        return list(dict.fromkeys(list(cls._task_registry) + list(cls._lazy_registry)))
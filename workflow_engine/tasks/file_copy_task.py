@@ -2,7 +2,12 @@
 文件复制任务
 """
 
-from typing import Tuple
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from workflow_engine.utils.ssh_pool import get_host_slots, get_pool
+from workflow_engine.utils.transfer import FileTransfer
 from .base import Task
 
 
@@ -39,59 +44,102 @@ class FileCopyTask(Task):
         if local_temp_dir is None:
             local_temp_dir = self.global_config.transfer_local_temp_dir
 
-        # 检查是否需要创建或切换host
-        if not self.transfer or self.transfer.host != host:
-            self.logger.info(f"创建/切换传输连接到: {host}")
-            # 创建或重新初始化Transfer
-            from workflow_engine.utils.transfer import FileTransfer
-            self.transfer = FileTransfer(
-                host=host,
-                logger=self.logger,
-                remote_temp_dir=remote_temp_dir,
-                local_temp_dir=local_temp_dir
-            )
-            self.context['transfer'] = self.transfer
+        # 从进程级连接池获取该host的传输器(同一host的并发连接数受连接池限制)
+        pool = get_pool()
+        pool_key = ('transfer', host, remote_temp_dir, local_temp_dir)
+        self.transfer = pool.acquire(
+            pool_key,
+            lambda: self._create_transfer(host, remote_temp_dir, local_temp_dir)
+        )
+        self.context['transfer'] = self.transfer
+        try:
+            return self._transfer_items(host)
+        finally:
+            pool.release(pool_key, self.transfer)
+
+    def _create_transfer(self, host: str, remote_temp_dir: str, local_temp_dir: str):
+        """
+        创建文件传输器(连接池中没有空闲传输器时调用)
+
+        Args:
+            host: SSH配置中的主机名
+            remote_temp_dir: 远程临时目录
+            local_temp_dir: 本地临时目录
+
+        Returns:
+            FileTransfer实例
+        """
+        self.logger.info(f"创建传输连接到: {host}")
+        return FileTransfer(
+            host=host,
+            logger=self.logger,
+            remote_temp_dir=remote_temp_dir,
+            local_temp_dir=local_temp_dir
+        )
+
+    def _transfer_items(self, host: str) -> Tuple[bool, str]:
+        """
+        使用 self.transfer 执行所有传输项
+
+        Args:
+            host: SSH配置中的主机名
+
+        Returns:
+            (成功标志, 消息)
+        """
+        # 任务级配置一次性解析为局部变量，传输项中只读取 options
+        config = self.config
+        params = config.get('params', {})
+        global_config = self.global_config
 
         # 获取传输方向
-        direction = self.config.get('direction', 'remote_to_local')
+        direction = config.get('direction', 'remote_to_local')
 
         # 获取文件复制项列表
-        items = self.get_param('items')
+        items = params.get('items')
         if not items:
             self.logger.warning("文件传输任务未配置 items 参数")
             return False, "未配置文件传输项"
 
+        # 去除重复的传输项(配置重复或模板生成的配置中常见)
+        items = self._dedupe_items(items)
+
         # 获取传输方法（任务级别配置，默认 rsync）
-        task_transfer_method = self.config.get('transfer_method', 'rsync')
+        task_transfer_method = config.get('transfer_method', 'rsync')
 
         # 获取传输配置
-        show_progress = self.get_param('show_progress')
+        show_progress = params.get('show_progress')
         if show_progress is None:
-            show_progress = self.global_config.transfer_show_progress
+            show_progress = global_config.transfer_show_progress
 
-        compress = self.get_param('compress')
+        compress = params.get('compress')
         if compress is None:
-            compress = self.global_config.transfer_compress
+            compress = global_config.transfer_compress
 
-        preserve_times = self.get_param('preserve_times')
+        preserve_times = params.get('preserve_times')
         if preserve_times is None:
-            preserve_times = self.global_config.transfer_preserve_times
+            preserve_times = global_config.transfer_preserve_times
 
-        timeout = self.get_param('timeout')
+        timeout = params.get('timeout')
         if not timeout:
-            timeout = self.global_config.transfer_timeout
+            timeout = global_config.transfer_timeout
 
         # 获取预压缩配置（任务级别，默认 False）
-        task_pre_compress = self.config.get('pre_compress', False)
+        task_pre_compress = config.get('pre_compress', False)
+
+        # 获取预压缩使用的压缩程序和压缩级别（任务级别，默认 auto: 优先pigz）
+        task_compressor = config.get('compressor', 'auto')
+        task_compress_level = config.get('compress_level')
+
+        # 获取是否生成rsync友好的压缩包（任务级别，默认 True，仅不解压时生效）
+        task_rsync_friendly = config.get('rsync_friendly', True)
 
         # 获取解压配置（任务级别 > 全局级别，默认 True）
-        task_decompress = self.config.get('decompress')
+        task_decompress = config.get('decompress')
         if task_decompress is None:
-            task_decompress = self.global_config.transfer_decompress
+            task_decompress = global_config.transfer_decompress
 
         # 初始化执行上下文
-        import time
-        import os
         self._execution_context = {
             'direction': direction,
             'host': host,
@@ -101,136 +149,444 @@ class FileCopyTask(Task):
             'items': []
         }
 
-        # 遍历复制项
-        failed_items = []
+        # 传输项之间相互独立，并行执行(并发数不超过连接池的单host连接数上限)
+        options = {
+            'direction': direction,
+            'transfer_method': task_transfer_method,
+            'pre_compress': task_pre_compress,
+            'decompress': task_decompress,
+            'compressor': task_compressor,
+            'compress_level': task_compress_level,
+            'rsync_friendly': task_rsync_friendly,
+            'attempts': config.get('attempts', 1),
+            'show_progress': show_progress,
+            'compress': compress,
+            'preserve_times': preserve_times,
+            'timeout': timeout,
+        }
+
+        # 远程→本地时先通过一次SSH调用检查所有远程源路径，不存在的传输项直接判定失败
+        missing_items = []
+        if direction == 'remote_to_local':
+            items, missing_items = self._check_remote_sources(items, options)
+
+        # 预压缩传输项的压缩包文件名(按传输项序号)，其他传输项为None
+        options['archive_names'] = self._archive_names(
+            items, direction, task_pre_compress, task_compressor, int(self._execution_context['start_time'])
+        )
+        options['local_temp_dir'] = self.transfer.local_temp_dir
+
+        # 本地→远程时先通过一次SSH调用创建所有需要的远程目录
+        if direction == 'local_to_remote':
+            self.transfer.prepare_remote_dirs(self._collect_remote_dirs(items, options))
+
+        # 目标和过滤规则相同的普通rsync传输项合并为一次rsync调用
+        batches = self._group_items(items, options)
+
+        # 每组传输占用一个host传输名额，并行任务对同一host的总并发数不超过连接池上限
+        slots = get_host_slots(host)
+
+        def transfer_batch(batch):
+            with slots:
+                return self._transfer_batch(batch, options)
+
+        results = [None] * len(items)
+        max_workers = min(int(self.config.get('parallel', 4)), get_pool().size, len(batches))
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                batch_results = list(executor.map(transfer_batch, batches))
+        else:
+            batch_results = [transfer_batch(batch) for batch in batches]
+        for batch_result in batch_results:
+            for idx, result in batch_result:
+                results[idx] = result
+
+        # 按配置顺序汇总结果
+        results = [result for result in results if result is not None]
+        failed_items = missing_items + [r['failed'] for r in results if not r['success']]
+        self._execution_context['items'] = [r['item_info'] for r in results if r['success']]
+
+        # 计算总耗时
+        total_time = time.time() - self._execution_context['start_time']
+        self._execution_context['total_time'] = round(total_time, 2)
+
+        # 检查是否有失败项
+        if failed_items:
+            error_msg = f"部分文件传输失败: {', '.join(failed_items)}"
+            return False, error_msg
+
+        self.logger.info("所有文件传输完成")
+        return True, "所有文件传输完成"
+
+    def _dedupe_items(self, items: List[dict]) -> List[dict]:
+        """
+        去除重复的传输项(源路径、目标路径及传输选项都相同)
+
+        Args:
+            items: 传输项配置列表
+
+        Returns:
+            去重后的传输项列表(保持配置顺序)
+        """
+        seen = set()
+        deduped = []
+        duplicates = []
         for item in items:
-            # 支持新旧两种配置格式
             remote_path = item.get('remote') or item.get('remote_path')
-            local_path = item.get('local') or item.get('local_path')
-            recursive = item.get('recursive', False)
-            exclude = item.get('exclude', [])
+            key = (
+                remote_path,
+                item.get('local') or item.get('local_path'),
+                item.get('recursive', False),
+                item.get('method'),
+                item.get('pre_compress'),
+                item.get('decompress'),
+                tuple(item.get('exclude') or ())
+            )
+            if key in seen:
+                duplicates.append(str(remote_path))
+                continue
+            seen.add(key)
+            deduped.append(item)
 
-            # 获取传输方法（项级别 > 任务级别 > 默认rsync）
-            transfer_method = item.get('method', task_transfer_method)
+        if duplicates:
+            self.logger.warning(f"跳过重复的传输项: {', '.join(duplicates)}")
+        return deduped
 
-            # 获取预压缩设置（项级别 > 任务级别 > 默认False）
-            pre_compress = item.get('pre_compress', task_pre_compress)
+    def _check_remote_sources(self, items: List[dict], options: dict) -> Tuple[List[dict], List[str]]:
+        """
+        批量检查远程源路径
 
-            # 获取解压设置（项级别 > 任务级别 > 全局级别 > 默认True）
-            decompress = item.get('decompress', task_decompress)
+        Args:
+            items: 传输项配置列表
+            options: 任务级传输配置
 
-            if not remote_path or not local_path:
-                self.logger.warning(f"跳过无效的传输配置项: {item}")
-                continue
+        Returns:
+            (远程路径存在或无法确认的传输项, 远程路径不存在的路径列表)
+        """
+        remote_paths = [item.get('remote') or item.get('remote_path') for item in items]
+        stats = self.transfer.prefetch_remote_stats(path for path in remote_paths if path)
+        if not stats:
+            return items, []
+
+        valid_items = []
+        missing = []
+        for item, remote_path in zip(items, remote_paths):
+            if remote_path and remote_path in stats:
+                kind = stats[remote_path]
+                if kind is None:
+                    self.logger.error(f"远程路径不存在: {remote_path}")
+                    missing.append(remote_path)
+                    continue
+                if (kind == 'dir' and not item.get('recursive', False)
+                        and not item.get('pre_compress', options['pre_compress'])):
+                    self.logger.warning(f"远程路径是目录但未设置 recursive，目录内容不会被复制: {remote_path}")
+            valid_items.append(item)
+
+        return valid_items, missing
+
+    def _collect_remote_dirs(self, items: List[dict], options: dict) -> List[str]:
+        """
+        收集本地→远程传输需要预先创建的远程目录
 
-            # 记录item开始时间
-            item_start_time = time.time()
+        预压缩传输需要目标目录(解压到目标目录，或不解压时压缩包直接放到目标目录)；
+        普通传输只创建目标路径的父目录(目标路径本身可能是文件)
 
-            # 根据方向执行传输
-            if direction == 'remote_to_local':
-                self.logger.info(f"从远程复制: {remote_path} -> {local_path}")
-                success = self.transfer.copy_from_remote(
-                    remote_path=remote_path,
-                    local_path=local_path,
-                    method=transfer_method,
-                    recursive=recursive,
-                    exclude=exclude if exclude else None,
-                    show_progress=show_progress,
-                    compress=compress,
-                    preserve_times=preserve_times,
-                    timeout=timeout,
-                    pre_compress=pre_compress,
-                    decompress=decompress
-                )
-            elif direction == 'local_to_remote':
-                self.logger.info(f"传输到远程: {local_path} -> {remote_path}")
-                success = self.transfer.copy_to_remote(
-                    local_path=local_path,
-                    remote_path=remote_path,
-                    method=transfer_method,
-                    recursive=recursive,
-                    exclude=exclude if exclude else None,
-                    show_progress=show_progress,
-                    compress=compress,
-                    preserve_times=preserve_times,
-                    timeout=timeout,
-                    pre_compress=pre_compress,
-                    decompress=decompress
-                )
+        Args:
+            items: 传输项配置列表
+            options: 任务级传输配置
+
+        Returns:
+            远程目录列表
+        """
+        remote_dirs = []
+        for item in items:
+            remote_path = item.get('remote') or item.get('remote_path')
+            if not remote_path:
+                continue
+            if item.get('pre_compress', options['pre_compress']):
+                remote_dirs.append(remote_path)
             else:
-                self.logger.error(f"未知的传输方向: {direction}")
-                failed_items.append(f"{remote_path} (未知方向)")
+                parent = os.path.dirname(remote_path.rstrip('/'))
+                if parent:
+                    remote_dirs.append(parent)
+        return remote_dirs
+
+    def _group_items(self, items: List[dict], options: dict) -> List[List[Tuple[int, dict]]]:
+        """
+        将传输项分组，可合并的rsync传输项(非预压缩、目标路径/递归/排除规则/尝试次数相同)归为一组
+
+        Args:
+            items: 传输项配置列表
+            options: 任务级传输配置
+
+        Returns:
+            分组列表，每组为 (传输项序号, 传输项配置) 列表
+        """
+        direction = options['direction']
+        batches = []
+        groups = {}
+        for idx, item in enumerate(items):
+            remote_path = item.get('remote') or item.get('remote_path')
+            local_path = item.get('local') or item.get('local_path')
+            method = item.get('method', options['transfer_method'])
+            pre_compress = item.get('pre_compress', options['pre_compress'])
+
+            if (not remote_path or not local_path or pre_compress
+                    or method.lower() != 'rsync'
+                    or direction not in ('remote_to_local', 'local_to_remote')):
+                batches.append([(idx, item)])
                 continue
 
-            # 计算传输耗时
-            item_transfer_time = time.time() - item_start_time
+            destination = local_path if direction == 'remote_to_local' else remote_path
+            key = (
+                destination,
+                bool(item.get('recursive', False)),
+                tuple(item.get('exclude') or ()),
+                item.get('attempts', options['attempts'])
+            )
+            batch = groups.get(key)
+            if batch is None:
+                batch = groups[key] = []
+                batches.append(batch)
+            batch.append((idx, item))
 
-            if not success:
-                self.logger.error(f"传输失败: {remote_path}")
-                failed_items.append(remote_path)
+        return batches
+
+    def _transfer_batch(self, batch: List[Tuple[int, dict]], options: dict) -> List[Tuple[int, Optional[dict]]]:
+        """
+        执行一组传输项，多个传输项时使用一次rsync调用
+
+        Args:
+            batch: (传输项序号, 传输项配置) 列表
+            options: 任务级传输配置
+
+        Returns:
+            (传输项序号, 传输结果) 列表，传输结果格式同 _transfer_one
+        """
+        if len(batch) == 1:
+            idx, item = batch[0]
+            return [(idx, self._transfer_one(idx, item, options))]
+
+        direction = options['direction']
+        first_item = batch[0][1]
+        path_pairs = [
+            (item.get('remote') or item.get('remote_path'), item.get('local') or item.get('local_path'))
+            for _, item in batch
+        ]
+        if direction == 'remote_to_local':
+            sources = [remote for remote, _ in path_pairs]
+            destination = path_pairs[0][1]
+        else:
+            sources = [local for _, local in path_pairs]
+            destination = path_pairs[0][0]
+
+        start_time = time.time()
+        success = self.transfer.copy_many(
+            sources=sources,
+            destination=destination,
+            direction=direction,
+            recursive=first_item.get('recursive', False),
+            exclude=first_item.get('exclude') or None,
+            show_progress=options['show_progress'],
+            compress=options['compress'],
+            preserve_times=options['preserve_times'],
+            timeout=options['timeout'],
+            attempts=first_item.get('attempts', options['attempts'])
+        )
+        transfer_time = round(time.time() - start_time, 2)
+
+        results = []
+        for (idx, _), (remote_path, local_path) in zip(batch, path_pairs):
+            if success:
+                results.append((idx, {
+                    'success': True,
+                    'failed': None,
+                    'item_info': (remote_path, local_path, False, None, None, None, transfer_time)
+                }))
             else:
-                self.logger.info(f"传输完成: {remote_path}")
-
-                # 收集item的传输信息（用于导出变量）
-                if pre_compress:
-                    # 预压缩模式：生成压缩文件名
-                    timestamp = int(item_start_time)
-                    basename = os.path.basename((remote_path if direction == 'remote_to_local' else local_path).rstrip('/'))
-                    if not basename:
-                        basename = "transfer"
-                    archive_name = f"{basename}_transfer_{timestamp}.tar.gz"
-
-                    # 根据方向和decompress确定压缩文件位置
-                    if direction == 'remote_to_local':
-                        if decompress:
-                            # 远程→本地，已解压
-                            archive_path = None  # 已删除
-                        else:
-                            # 远程→本地，未解压（保留在本地临时目录）
-                            archive_path = f"{self.transfer.local_temp_dir}/{archive_name}"
-                            # 注册本地临时文件用于清理
-                            if 'coordinator' in self.context:
-                                self.context['coordinator'].register_temp_file(archive_path)
-                    else:  # local_to_remote
-                        if decompress:
-                            # 本地→远程，已解压
-                            archive_path = None  # 已删除
-                        else:
-                            # 本地→远程，未解压（直接保存到目标路径）
-                            archive_path = f"{remote_path}/{archive_name}"
-                            # 远程文件不需要注册（只清理本地临时文件）
-
-                    item_info = {
-                        'remote_path': remote_path,
-                        'local_path': local_path,
-                        'pre_compress': True,
-                        'decompress': decompress,
-                        'archive_name': archive_name,
-                        'archive_path': archive_path,
-                        'transfer_time': round(item_transfer_time, 2)
-                    }
-                else:
-                    # 普通模式
-                    item_info = {
-                        'remote_path': remote_path,
-                        'local_path': local_path,
-                        'pre_compress': False,
-                        'transfer_time': round(item_transfer_time, 2)
-                    }
+                results.append((idx, {'success': False, 'failed': remote_path, 'item_info': None}))
 
-                self._execution_context['items'].append(item_info)
+        if success:
+            self.logger.info(f"批量传输完成: {', '.join(sources)}")
+        else:
+            self.logger.error(f"批量传输失败: {', '.join(sources)}")
+        return results
 
-        # 计算总耗时
-        total_time = time.time() - self._execution_context['start_time']
-        self._execution_context['total_time'] = round(total_time, 2)
+    @staticmethod
+    def _archive_names(items: List[dict], direction: str, task_pre_compress: bool,
+                       task_compressor: str, timestamp: int) -> List[Optional[str]]:
+        """
+        一次性计算预压缩传输项的压缩包文件名
 
-        # 检查是否有失败项
-        if failed_items:
-            error_msg = f"部分文件传输失败: {', '.join(failed_items)}"
-            return False, error_msg
+        文件名格式为 {源路径最后一级名称}_transfer_{时间戳}.tar.gz(zstd压缩时为 .tar.zst)，
+        同一任务中基础名重复时追加传输项序号，避免并行传输时压缩包相互覆盖
 
-        self.logger.info("所有文件传输完成")
-        return True, "所有文件传输完成"
+        Args:
+            items: 传输项配置列表
+            direction: 传输方向
+            task_pre_compress: 任务级预压缩配置
+            task_compressor: 任务级压缩程序配置
+            timestamp: 压缩包时间戳(任务开始时间)
+
+        Returns:
+            与 items 一一对应的压缩包文件名列表，非预压缩传输项为None
+        """
+        source_key = ('remote', 'remote_path') if direction == 'remote_to_local' else ('local', 'local_path')
+        suffix = ''.join(('_transfer_', str(timestamp)))
+        names = []
+        used = set()
+        for idx, item in enumerate(items):
+            source = item.get(source_key[0]) or item.get(source_key[1])
+            if not source or not item.get('pre_compress', task_pre_compress):
+                names.append(None)
+                continue
+            stem = ''.join((os.path.basename(source.rstrip('/')) or "transfer", suffix))
+            if stem in used:
+                stem = ''.join((stem, '_', str(idx)))
+            used.add(stem)
+            extension = FileTransfer.archive_extension(item.get('compressor', task_compressor))
+            names.append(''.join((stem, extension)))
+        return names
+
+    def _transfer_one(self, idx: int, item: dict, options: dict) -> Optional[dict]:
+        """
+        执行单个传输项(在工作线程中并行调用)
+
+        Args:
+            idx: 传输项序号
+            item: 传输项配置
+            options: 任务级传输配置
+
+        Returns:
+            {'success', 'failed', 'item_info'}，配置无效的传输项返回None；
+            item_info 为传输信息元组，导出变量时由 _item_info 转换为字典
+        """
+        direction = options['direction']
+
+        # 支持新旧两种配置格式
+        remote_path = item.get('remote') or item.get('remote_path')
+        local_path = item.get('local') or item.get('local_path')
+        recursive = item.get('recursive', False)
+        exclude = item.get('exclude', [])
+
+        # 获取传输方法（项级别 > 任务级别 > 默认rsync）
+        transfer_method = item.get('method', options['transfer_method'])
+
+        # 获取预压缩设置（项级别 > 任务级别 > 默认False）
+        pre_compress = item.get('pre_compress', options['pre_compress'])
+
+        # 获取解压设置（项级别 > 任务级别 > 全局级别 > 默认True）
+        decompress = item.get('decompress', options['decompress'])
+
+        if not remote_path or not local_path:
+            self.logger.warning(f"跳过无效的传输配置项: {item}")
+            return None
+
+        # 根据方向选择传输方法(两者参数名相同)
+        logger = self.logger
+        if direction == 'remote_to_local':
+            logger.info(f"从远程复制: {remote_path} -> {local_path}")
+            copy = self.transfer.copy_from_remote
+        elif direction == 'local_to_remote':
+            logger.info(f"传输到远程: {local_path} -> {remote_path}")
+            copy = self.transfer.copy_to_remote
+        else:
+            logger.error(f"未知的传输方向: {direction}")
+            return {'success': False, 'failed': f"{remote_path} (未知方向)", 'item_info': None}
+
+        # 记录item开始时间
+        item_start_time = time.time()
+
+        success = copy(
+            remote_path=remote_path,
+            local_path=local_path,
+            method=transfer_method,
+            recursive=recursive,
+            exclude=exclude if exclude else None,
+            show_progress=options['show_progress'],
+            compress=options['compress'],
+            preserve_times=options['preserve_times'],
+            timeout=options['timeout'],
+            pre_compress=pre_compress,
+            decompress=decompress,
+            archive_name=options['archive_names'][idx],
+            compressor=item.get('compressor', options['compressor']),
+            compress_level=item.get('compress_level', options['compress_level']),
+            rsync_friendly=item.get('rsync_friendly', options['rsync_friendly']),
+            attempts=item.get('attempts', options['attempts'])
+        )
+
+        # 计算传输耗时
+        item_transfer_time = time.time() - item_start_time
+
+        if not success:
+            logger.error(f"传输失败: {remote_path}")
+            return {'success': False, 'failed': remote_path, 'item_info': None}
+
+        logger.info(f"传输完成: {remote_path}")
+
+        # 收集item的传输信息（用于导出变量，导出时才转换为字典）
+        archive_name = archive_path = None
+        if pre_compress:
+            # 预压缩模式：压缩文件名已预先计算(与传输时使用的文件名一致)
+            archive_name = options['archive_names'][idx]
+
+            # 根据方向和decompress确定压缩文件位置
+            if direction == 'remote_to_local':
+                if decompress:
+                    # 远程→本地，已解压
+                    archive_path = None  # 已删除
+                else:
+                    # 远程→本地，未解压（保留在本地临时目录）
+                    archive_path = f"{options['local_temp_dir']}/{archive_name}"
+                    # 注册本地临时文件用于清理
+                    if 'coordinator' in self.context:
+                        self.context['coordinator'].register_temp_file(archive_path)
+            else:  # local_to_remote
+                if decompress:
+                    # 本地→远程，已解压
+                    archive_path = None  # 已删除
+                else:
+                    # 本地→远程，未解压（直接保存到目标路径）
+                    archive_path = f"{remote_path}/{archive_name}"
+                    # 远程文件不需要注册（只清理本地临时文件）
+
+        item_info = (
+            remote_path, local_path, bool(pre_compress), decompress,
+            archive_name, archive_path, round(item_transfer_time, 2)
+        )
+        return {'success': True, 'failed': None, 'item_info': item_info}
+
+    @staticmethod
+    def _item_info(record: tuple) -> dict:
+        """
+        将传输信息元组转换为导出变量中的传输项字典
+
+        Args:
+            record: (remote_path, local_path, pre_compress, decompress,
+                archive_name, archive_path, transfer_time)
+
+        Returns:
+            传输项信息字典
+        """
+        remote_path, local_path, pre_compress, decompress, archive_name, archive_path, transfer_time = record
+        if pre_compress:
+            return {
+                'remote_path': remote_path,
+                'local_path': local_path,
+                'pre_compress': True,
+                'decompress': decompress,
+                'archive_name': archive_name,
+                'archive_path': archive_path,
+                'transfer_time': transfer_time
+            }
+        # 普通模式
+        return {
+            'remote_path': remote_path,
+            'local_path': local_path,
+            'pre_compress': False,
+            'transfer_time': transfer_time
+        }
 
     def export_context(self) -> dict:
         """
@@ -254,6 +610,9 @@ class FileCopyTask(Task):
         if not self._execution_context or not self._execution_context.get('items'):
             return {}
 
+        # 传输信息在导出时才转换为字典
+        items = [self._item_info(record) for record in self._execution_context['items']]
+
         # 基础信息
         exported = {
             'direction': self._execution_context.get('direction'),
@@ -261,11 +620,11 @@ class FileCopyTask(Task):
             'compress': self._execution_context.get('compress', False),
             'decompress': self._execution_context.get('decompress', True),
             'total_time': self._execution_context.get('total_time', 0),
-            'items_count': len(self._execution_context.get('items', []))
+            'items_count': len(items)
         }
 
         # 获取第一个item的信息（作为快捷访问）
-        first_item = self._execution_context['items'][0]
+        first_item = items[0]
         exported['remote_path'] = first_item.get('remote_path')
         exported['local_path'] = first_item.get('local_path')
 
@@ -277,6 +636,6 @@ class FileCopyTask(Task):
                 exported['archive_path'] = first_item.get('archive_path')
 
         # 导出所有items的详细信息
-        exported['items'] = self._execution_context.get('items', [])
+        exported['items'] = items
 
         return exported
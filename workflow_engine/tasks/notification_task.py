@@ -13,6 +13,9 @@ class NotificationTask(Task):
         """
         发送通知
 
+        默认将通知提交到后台线程发送后立即返回，任务结果只表示通知已提交(发送失败只记录日志)；
+        参数 wait 为 true 时同步发送，任务结果反映通知是否发送成功
+
         Returns:
             (成功标志, 消息)
         """
@@ -25,29 +28,44 @@ class NotificationTask(Task):
         details = self.get_param('details', message)
         error_msg = self.get_param('error_msg', message)
         warning_msg = self.get_param('warning_msg', message)
+        wait = self.get_param('wait', False)
+
+        # 通知在后台线程发送，不阻塞工作流(wait 或通知器不支持异步发送时直接同步调用)
+        send = None if wait else getattr(self.notifier, 'submit', None)
+        if send is None:
+            wait = True
+            send = lambda method, **kwargs: getattr(self.notifier, method)(**kwargs)
 
         try:
             # 根据通知类型发送不同的通知
             if notification_type == 'success':
-                self.notifier.send_success(
+                sent = send(
+                    'send_success',
                     task_name=task_name,
                     details=details
                 )
             elif notification_type == 'failure':
-                self.notifier.send_failure(
+                sent = send(
+                    'send_failure',
                     task_name=task_name,
                     error_msg=error_msg
                 )
             elif notification_type == 'warning':
-                self.notifier.send_warning(
+                sent = send(
+                    'send_warning',
                     task_name=task_name,
                     warning_msg=warning_msg
                 )
             else:
                 return False, f"未知的通知类型: {notification_type}"
 
-            self.logger.info(f"通知发送成功: {task_name} ({notification_type})")
-            return True, f"通知发送成功 ({notification_type})"
+            if not wait:
+                self.logger.info(f"通知已提交: {task_name} ({notification_type})")
+                return True, f"通知已提交 ({notification_type})"
+            if sent is False:
+                return False, f"通知发送失败 ({notification_type})"
+            self.logger.info(f"通知已发送: {task_name} ({notification_type})")
+            return True, f"通知已发送 ({notification_type})"
 
         except Exception as e:
             error_msg = f"通知发送失败: {str(e)}"
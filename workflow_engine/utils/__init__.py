@@ -2,12 +2,26 @@
 工具模块
 """
 
-from workflow_engine.utils.executor import SSHExecutor
-from workflow_engine.utils.transfer import FileTransfer
-from workflow_engine.utils.notifier import Notifier
+from typing import TYPE_CHECKING
+
+from workflow_engine._lazy import install_lazy_imports
+
+install_lazy_imports(globals(), {
+    'SSHExecutor': 'workflow_engine.utils.executor',
+    'FileTransfer': 'workflow_engine.utils.transfer',
+    'Notifier': 'workflow_engine.utils.notifier',
+    'SSHPool': 'workflow_engine.utils.ssh_pool',
+})
+
+if TYPE_CHECKING:
+    from workflow_engine.utils.executor import SSHExecutor
+    from workflow_engine.utils.transfer import FileTransfer
+    from workflow_engine.utils.notifier import Notifier
+    from workflow_engine.utils.ssh_pool import SSHPool
 
 __all__ = [
     'SSHExecutor',
     'FileTransfer',
     'Notifier',
+    'SSHPool',
 ]
@@ -4,9 +4,17 @@ SSH执行器模块
 执行远程SSH命令，支持自动重试和错误检测。
 """
 
+import os
+import re
+import atexit
+import logging
+import hashlib
 import subprocess
-import time
-from typing import Optional, Tuple, List
+import tempfile
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Optional, Tuple, List, Pattern
 
 try:
     from logger import Logger
@@ -16,13 +24,40 @@ except ImportError:
     Notifier = None
 
 
+@lru_cache(maxsize=32)
+def _compile_keywords(keywords: Tuple[str, ...]) -> Optional[Pattern]:
+    """
+    将关键词列表编译为单个正则(一次扫描匹配所有关键词)
+
+    Args:
+        keywords: 关键词元组
+
+    Returns:
+        编译后的正则，关键词为空时返回None
+    """
+    if not keywords:
+        return None
+    return re.compile("|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+
 class SSHExecutor:
     """SSH命令执行器"""
 
+    # 复用连接(ControlMaster)在最后一次使用后保持的时间(秒)
+    CONTROL_PERSIST = 600
+    # 建立复用主连接的超时时间(秒)
+    MASTER_TIMEOUT = 15
+    # execute_command 返回的输出默认保留的行数
+    OUTPUT_TAIL_LINES = 2000
+    # 默认错误关键词
+    DEFAULT_ERROR_KEYWORDS = ["Error:", "Exception:", "Traceback", "FAILED"]
+
     def __init__(
         self,
         host: str,
-        logger: Optional['Logger'] = None
+        logger: Optional['Logger'] = None,
+        multiplex: bool = True,
+        error_keywords: Optional[List[str]] = None
     ):
         """
         初始化SSH执行器
@@ -30,6 +65,9 @@ class SSHExecutor:
         Args:
             host: SSH配置中的主机名(在~/.ssh/config中配置)
             logger: 日志记录器实例
+            multiplex: 是否复用SSH连接(OpenSSH ControlMaster)，
+                首次执行命令时建立主连接，后续命令无需重新握手和认证
+            error_keywords: 默认错误关键词列表，None时使用 DEFAULT_ERROR_KEYWORDS
 
         注意:
             SSH连接参数(user, port, IdentityFile等)应该在~/.ssh/config中预先配置
@@ -42,6 +80,157 @@ class SSHExecutor:
         """
         self.host = host
         self.logger = logger
+        self.multiplex = multiplex
+        self._error_re = _compile_keywords(tuple(
+            self.DEFAULT_ERROR_KEYWORDS if error_keywords is None else error_keywords
+        ))
+
+        # 控制套接字路径(Unix套接字路径长度有限，使用主机名哈希而非主机名本身)
+        host_hash = hashlib.blake2b(host.encode('utf-8'), digest_size=6).hexdigest()
+        self.control_path = os.path.join(
+            tempfile.gettempdir(), f"yawe-ssh-{os.getpid()}-{host_hash}.sock"
+        )
+        self._master_lock = threading.Lock()
+        # 中止信号: 设置后正在等待重试的 execute_with_retry 立即返回
+        self._abort = threading.Event()
+        # None: 尚未尝试建立主连接; True/False: 主连接是否可用
+        self._master_ready: Optional[bool] = None
+
+    def _ssh_argv(self, *args: str, options: Tuple[str, ...] = ()) -> List[str]:
+        """
+        构建ssh命令参数列表，启用复用时附加ControlPath选项
+
+        Args:
+            args: 主机名之后的参数(远程命令等)
+            options: 主机名之前的ssh选项
+
+        Returns:
+            ssh命令参数列表
+        """
+        argv = ["ssh", *options, *self.ssh_options(), self.host]
+        argv.extend(args)
+        return argv
+
+    def ssh_options(self) -> List[str]:
+        """
+        获取复用主连接的ssh选项(scp、rsync等其他ssh客户端也可使用)
+
+        Returns:
+            ssh选项列表，未启用复用或主连接不可用时为空列表
+        """
+        if self.multiplex and self._ensure_master():
+            return ["-o", f"ControlPath={self.control_path}", "-o", "ControlMaster=auto"]
+        return []
+
+    def _ensure_master(self) -> bool:
+        """
+        建立复用主连接(仅首次调用时执行)
+
+        主连接以 -N -f 在后台运行并断开标准输入输出，避免后续命令的输出管道被其持有
+
+        Returns:
+            主连接是否可用
+        """
+        if self._master_ready is not None:
+            return self._master_ready
+
+        with self._master_lock:
+            if self._master_ready is None and self._master_alive():
+                # 同一进程内已有该host的主连接(如其他执行器实例建立)，直接复用，
+                # 避免再启动一个 -N -f 主连接导致后者泄漏
+                self._master_ready = True
+            if self._master_ready is None:
+                cmd = [
+                    "ssh",
+                    "-o", "ControlMaster=yes",
+                    "-o", f"ControlPath={self.control_path}",
+                    "-o", f"ControlPersist={self.CONTROL_PERSIST}",
+                    "-N", "-f", self.host
+                ]
+                try:
+                    result = subprocess.run(
+                        cmd,
+                        stdin=subprocess.DEVNULL,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                        timeout=self.MASTER_TIMEOUT
+                    )
+                    self._master_ready = result.returncode == 0
+                except (subprocess.TimeoutExpired, OSError):
+                    self._master_ready = False
+
+                if self._master_ready:
+                    atexit.register(self.close)
+                elif self.logger:
+                    self.logger.debug("SSH复用连接建立失败，使用独立连接: %s", self.host)
+
+        return self._master_ready
+
+    def _master_alive(self) -> bool:
+        """
+        检查控制socket上是否已有可用的主连接
+
+        Returns:
+            主连接是否存在且可用
+        """
+        if not os.path.exists(self.control_path):
+            return False
+        try:
+            result = subprocess.run(
+                ["ssh", "-o", f"ControlPath={self.control_path}", "-O", "check", self.host],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=self.MASTER_TIMEOUT
+            )
+        except (subprocess.TimeoutExpired, OSError):
+            return False
+        return result.returncode == 0
+
+    def set_error_keywords(self, keywords: Optional[List[str]]):
+        """
+        设置默认错误关键词(预先编译，execute_command 不传 error_keywords 时使用)
+
+        Args:
+            keywords: 错误关键词列表，None时恢复 DEFAULT_ERROR_KEYWORDS，空列表表示不检查
+        """
+        self._error_re = _compile_keywords(tuple(
+            self.DEFAULT_ERROR_KEYWORDS if keywords is None else keywords
+        ))
+
+    def abort(self):
+        """中止正在等待重试的命令(execute_with_retry 立即返回失败)"""
+        self._abort.set()
+
+    def wait_abort(self, timeout: float) -> bool:
+        """
+        等待重试间隔(文件传输等共享本执行器的重试使用)，期间被中止时立即返回
+
+        Args:
+            timeout: 等待时间（秒）
+
+        Returns:
+            是否已被中止
+        """
+        return self._abort.wait(timeout)
+
+    def close(self):
+        """关闭复用主连接"""
+        with self._master_lock:
+            if not self._master_ready:
+                return
+            self._master_ready = None
+            try:
+                subprocess.run(
+                    ["ssh", "-O", "exit", "-o", f"ControlPath={self.control_path}", self.host],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=10
+                )
+            except (subprocess.TimeoutExpired, OSError):
+                pass
+        atexit.unregister(self.close)
     
     def check_connection(self, timeout: int = 10) -> bool:
         """
@@ -57,7 +246,7 @@ class SSHExecutor:
             self.logger.info("检查SSH连接...")
 
         try:
-            cmd = ["ssh", "-q", self.host, "exit"]
+            cmd = self._ssh_argv("exit", options=("-q",))
             result = subprocess.run(
                 cmd,
                 capture_output=True,
@@ -90,68 +279,88 @@ class SSHExecutor:
         command: str,
         check_error_keywords: bool = True,
         timeout: int = 3600,
-        error_keywords: Optional[List[str]] = None
+        error_keywords: Optional[List[str]] = None,
+        tail_lines: Optional[int] = OUTPUT_TAIL_LINES,
+        on_line: Optional[Callable[[str], None]] = None
     ) -> Tuple[bool, str, int]:
         """
         执行SSH命令
 
+        输出逐行读取并实时记录日志，返回的命令输出只包含最后 tail_lines 行
+
         Args:
             command: 要执行的远程命令
             check_error_keywords: 是否检查输出中的错误关键词
             timeout: 命令执行超时时间（秒），默认1小时
-            error_keywords: 自定义错误关键词列表
+            error_keywords: 自定义错误关键词列表，None时使用初始化时指定的关键词
+            tail_lines: 返回的输出最多保留的行数，None表示保留全部输出
+            on_line: 逐行回调(读取输出时对每一行调用，用于在完整输出上增量检查关键词)
 
         Returns:
             (是否成功, 命令输出, 退出码)
         """
         try:
-            # 构建完整的SSH命令，包含退出码捕获
-            full_command = (
-                f"{command}\n"
-                f"EXIT_CODE=$?\n"
-                f'echo "COMMAND_EXIT_CODE: $EXIT_CODE"\n'
-                f"exit $EXIT_CODE"
-            )
+            # ssh 的退出码即远程命令的退出码(连接失败时为255)，无需在远程额外输出退出码
+            # BatchMode: 需要交互输入密码时直接失败，避免工作流挂起
+            cmd = self._ssh_argv(command, options=("-o", "BatchMode=yes"))
 
-            cmd = ["ssh", self.host, full_command]
-            
-            result = subprocess.run(
+            error_re = None
+            if check_error_keywords:
+                error_re = self._error_re if error_keywords is None else _compile_keywords(tuple(error_keywords))
+
+            # 逐行读取输出并实时记录日志，只保留最后 tail_lines 行用于返回
+            proc = subprocess.Popen(
                 cmd,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
-                timeout=timeout
+                errors='replace',
+                bufsize=1
             )
-            
-            output = result.stdout
-            
-            # 提取远程命令的退出码
-            exit_code = result.returncode
-            for line in output.splitlines():
-                if line.startswith("COMMAND_EXIT_CODE:"):
-                    try:
-                        exit_code = int(line.split(":")[-1].strip())
-                    except ValueError:
-                        pass
-            
-            # 记录输出
-            if self.logger:
-                self.logger.info("远程命令执行输出:")
-                for line in output.splitlines():
-                    # 不记录退出码那一行
-                    if not line.startswith("COMMAND_EXIT_CODE:"):
-                        self.logger.info(line)
-            
-            # 检查是否有错误
+
+            timed_out = threading.Event()
+
+            def kill_on_timeout():
+                timed_out.set()
+                proc.kill()
+
+            timer = threading.Timer(timeout, kill_on_timeout)
+            timer.daemon = True
+            timer.start()
+
+            tail = deque(maxlen=tail_lines)
             has_error = False
-            if check_error_keywords:
-                if error_keywords is None:
-                    error_keywords = ["Error:", "Exception:", "Traceback", "FAILED"]
-                has_error = any(keyword in output for keyword in error_keywords)
-            
+            # INFO级别未开启时跳过逐行日志(避免为每行输出创建日志记录)
+            log_output = self.logger is not None and self.logger.isEnabledFor(logging.INFO)
+            try:
+                if log_output:
+                    self.logger.info("远程命令执行输出:")
+                for line in proc.stdout:
+                    tail.append(line)
+                    if on_line is not None:
+                        on_line(line)
+                    if log_output:
+                        self.logger.info(line.rstrip("\n"))
+
+                    # 检查是否有错误
+                    if error_re is not None and not has_error:
+                        has_error = error_re.search(line) is not None
+                exit_code = proc.wait()
+            finally:
+                timer.cancel()
+                proc.stdout.close()
+                # 读取输出时出现异常，ssh仍在运行: 终止并回收进程
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(cmd, timeout)
+
             success = (exit_code == 0) and (not has_error)
-            
-            return success, output, exit_code
-            
+
+            return success, ''.join(tail), exit_code
+
         except subprocess.TimeoutExpired:
             error_msg = f"SSH命令执行超时（{timeout}秒）"
             if self.logger:
@@ -190,6 +399,7 @@ class SSHExecutor:
             执行是否成功
         """
         retry_count = 0
+        self._abort.clear()
         
         while retry_count < max_retries:
             if retry_count > 0:
@@ -221,7 +431,11 @@ class SSHExecutor:
                             retry_info=f"将在{wait_minutes}分钟后重试"
                         )
                     
-                    time.sleep(retry_interval)
+                    # 可被 abort() 唤醒的等待
+                    if self._abort.wait(retry_interval):
+                        if self.logger:
+                            self.logger.warning("工作流已中止，取消重试")
+                        return False
                     retry_count += 1
                 else:
                     if self.logger:
@@ -286,23 +500,33 @@ class SSHExecutor:
         Returns:
             (是否成功, 文件内容)
         """
-        success, output, exit_code = self.execute_command(
-            f"cat {file_path}",
-            check_error_keywords=True,
-            timeout=timeout
-        )
-        
-        if success:
-            # 移除最后的退出码行
-            lines = output.splitlines()
-            content = "\n".join(
-                line for line in lines 
-                if not line.startswith("COMMAND_EXIT_CODE:")
+        # 直接执行cat并按字节读取输出，不经过退出码包装和逐行过滤
+        # (路径不加引号，与原实现一致，允许使用 ~ 等shell展开)
+        try:
+            result = subprocess.run(
+                self._ssh_argv(f"cat -- {file_path}"),
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                timeout=timeout
             )
-            return True, content
-        else:
+        except subprocess.TimeoutExpired:
+            if self.logger:
+                self.logger.error(f"读取远程文件超时（{timeout}秒）: {file_path}")
+            return False, ""
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"读取远程文件异常: {str(e)}")
+            return False, ""
+
+        if result.returncode != 0:
+            if self.logger:
+                self.logger.error(
+                    f"读取远程文件失败: {file_path} - {result.stderr.decode(errors='replace').strip()}"
+                )
             return False, ""
 
+        return True, result.stdout.decode('utf-8', errors='replace')
+
 
 # 使用示例
 if __name__ == "__main__":
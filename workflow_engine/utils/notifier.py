@@ -4,11 +4,22 @@
 通过HTTP API发送通知消息。
 """
 
+import atexit
 import json
+import queue
+import threading
 import requests
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional
 
+# orjson为可选依赖，未安装时回退到标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 为了避免循环导入，使用Optional类型
 try:
     from logger import Logger
@@ -16,8 +27,46 @@ except ImportError:
     Logger = None
 
 
+def _dump_payload(payload: dict) -> bytes:
+    """将通知payload序列化为UTF-8编码的JSON(优先使用orjson，直接输出字节)"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+def _build_retry(total: int, backoff_factor: float) -> Retry:
+    """
+    构建请求重试策略(网关错误时重试，包括POST请求)
+
+    Args:
+        total: 最大重试次数
+        backoff_factor: 重试退避系数
+
+    Returns:
+        Retry实例
+    """
+    kwargs = dict(
+        total=total,
+        backoff_factor=backoff_factor,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False
+    )
+    try:
+        return Retry(allowed_methods=frozenset(['POST']), **kwargs)
+    except TypeError:
+        # urllib3 < 1.26
+        return Retry(method_whitelist=frozenset(['POST']), **kwargs)
+
+
 class Notifier:
     """通知发送器"""
+
+    # 连接池大小
+    POOL_MAXSIZE = 10
+    # 网关错误时的最大重试次数
+    MAX_RETRIES = 2
+    # 请求头(所有请求共用)
+    HEADERS = {"Content-Type": "application/json; charset=utf-8"}
     
     def __init__(
         self, 
@@ -39,6 +88,71 @@ class Notifier:
         self.logger = logger
         self.timeout = timeout
         self.verify_ssl = verify_ssl
+
+        # 复用同一个会话，多次发送共享keep-alive连接(避免每次TCP+TLS握手)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_maxsize=self.POOL_MAXSIZE,
+            max_retries=_build_retry(self.MAX_RETRIES, 0.2)
+        )
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        # 异步发送队列及后台发送线程(首次submit时启动)
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    def submit(self, method: str, *args, **kwargs):
+        """
+        将通知加入后台发送队列后立即返回(不等待HTTP请求完成)
+
+        Args:
+            method: 发送方法名，如 "send_success" / "send_failure" / "send_notification"
+            *args: 发送方法的位置参数
+            **kwargs: 发送方法的关键字参数
+        """
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._worker_loop, name='notifier', daemon=True
+                    )
+                    self._worker.start()
+                    # 进程退出前发送完已提交的通知(工作流异常退出时也不丢失)
+                    atexit.register(self.flush)
+        self._queue.put((getattr(self, method), args, kwargs))
+
+    def flush(self):
+        """等待队列中的通知全部发送完成"""
+        if self._worker is not None:
+            self._queue.join()
+
+    def _worker_loop(self):
+        """后台发送线程主循环"""
+        while True:
+            send, args, kwargs = self._queue.get()
+            try:
+                send(*args, **kwargs)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"通知发送异常: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def close(self):
+        """发送完队列中的通知并关闭HTTP会话"""
+        self.flush()
+        atexit.unregister(self.flush)
+        self._session.close()
+
+    def __del__(self):
+        session = getattr(self, '_session', None)
+        if session is not None:
+            try:
+                session.close()
+            except Exception:
+                pass
     
     def send_notification(
         self, 
@@ -82,10 +196,10 @@ class Notifier:
             payload.update(extra_data)
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.api_url,
-                headers={"Content-Type": "application/json; charset=utf-8"},
-                data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+                headers=self.HEADERS,
+                data=_dump_payload(payload),
                 verify=self.verify_ssl,
                 timeout=self.timeout
             )
@@ -0,0 +1,478 @@
+"""
+SFTP文件传输模块
+
+基于 paramiko 的进程内SFTP传输: 每个host保持一个已认证的SSH连接，每次传输只打开新的SFTP通道，
+不再为每个文件启动 ssh/scp 子进程；读写请求流水线发送，适合大量小文件的传输
+"""
+
+import atexit
+import fnmatch
+import os
+import stat
+import threading
+import time
+from typing import Dict, List, Optional
+
+# paramiko为可选依赖，未安装时 sftp 传输回退到 rsync
+try:
+    import paramiko
+except ImportError:
+    paramiko = None
+
+# 为了避免循环导入，使用Optional类型
+try:
+    from logger import Logger
+except ImportError:
+    Logger = None
+
+
+# host -> 共享的SSH连接(底层 paramiko.Transport 线程安全，可同时打开多个通道)
+_clients: Dict[str, 'paramiko.SSHClient'] = {}
+_clients_lock = threading.Lock()
+
+
+def sftp_available() -> bool:
+    """
+    检查是否安装了 paramiko
+
+    Returns:
+        SFTP传输是否可用
+    """
+    return paramiko is not None
+
+
+def _connect(host: str, timeout: float) -> 'paramiko.SSHClient':
+    """
+    按 ~/.ssh/config 中的配置建立SSH连接
+
+    Args:
+        host: SSH配置中的主机名
+        timeout: 连接超时时间（秒）
+
+    Returns:
+        已认证的SSH连接
+    """
+    config = paramiko.SSHConfig()
+    config_path = os.path.expanduser("~/.ssh/config")
+    if os.path.exists(config_path):
+        with open(config_path) as f:
+            config.parse(f)
+    options = config.lookup(host)
+
+    sock = None
+    if options.get('proxycommand'):
+        sock = paramiko.ProxyCommand(options['proxycommand'])
+
+    hostname = options.get('hostname', host)
+    port = int(options.get('port', 22))
+    client = paramiko.SSHClient()
+    _load_host_keys(client, options, hostname, port)
+    client.connect(
+        hostname,
+        port=port,
+        username=options.get('user'),
+        key_filename=options.get('identityfile'),
+        sock=sock,
+        timeout=timeout
+    )
+    # 空闲连接保活，避免被防火墙断开
+    client.get_transport().set_keepalive(30)
+    return client
+
+
+def _load_host_keys(client: 'paramiko.SSHClient', options: dict, hostname: str, port: int):
+    """
+    按 ~/.ssh/config 的 UserKnownHostsFile / HostKeyAlias 加载已知主机密钥(与ssh命令的校验方式一致)
+
+    Args:
+        client: SSH客户端
+        options: ~/.ssh/config 中该host的配置
+        hostname: 实际连接的主机名
+        port: 实际连接的端口
+    """
+    files = options.get('userknownhostsfile', "~/.ssh/known_hosts")
+    if isinstance(files, str):
+        files = files.split()
+    paths = [path for path in (os.path.expanduser(f) for f in files) if os.path.exists(path)]
+
+    alias = options.get('hostkeyalias')
+    if not alias:
+        for path in paths:
+            client.load_system_host_keys(path)
+        return
+
+    # 使用别名查找密钥，再登记到 paramiko 校验时使用的名称下
+    known = paramiko.HostKeys()
+    for path in paths:
+        known.load(path)
+    keys = known.lookup(alias)
+    if keys:
+        lookup_name = hostname if port == 22 else f"[{hostname}]:{port}"
+        for key_type, key in keys.items():
+            client.get_host_keys().add(lookup_name, key_type, key)
+
+
+def get_transport(host: str, timeout: float = 30) -> 'paramiko.Transport':
+    """
+    获取指定host共享的SSH连接，连接断开时重新建立
+
+    Args:
+        host: SSH配置中的主机名
+        timeout: 连接超时时间（秒）
+
+    Returns:
+        已认证的SSH连接
+    """
+    with _clients_lock:
+        client = _clients.get(host)
+        transport = client.get_transport() if client is not None else None
+        if transport is None or not transport.is_active():
+            if client is not None:
+                client.close()
+            client = _clients[host] = _connect(host, timeout)
+            transport = client.get_transport()
+        return transport
+
+
+def close_all():
+    """关闭所有共享的SSH连接"""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_all)
+
+
+class SFTPTransfer:
+    """基于 paramiko 的SFTP文件传输器"""
+
+    # SFTP通道的窗口大小和最大包大小(大窗口减少等待确认的次数)
+    WINDOW_SIZE = 2 ** 24
+    MAX_PACKET_SIZE = 2 ** 15
+
+    def __init__(self, host: str, logger: Optional['Logger'] = None):
+        """
+        初始化SFTP传输器
+
+        Args:
+            host: SSH配置中的主机名(连接参数从~/.ssh/config读取)
+            logger: 日志记录器实例
+        """
+        self.host = host
+        self.logger = logger
+
+    def _open_sftp(self, timeout: float) -> 'paramiko.SFTPClient':
+        """
+        在共享的SSH连接上打开新的SFTP通道
+
+        Args:
+            timeout: 单次SFTP操作的超时时间（秒）
+
+        Returns:
+            SFTP客户端
+        """
+        sftp = paramiko.SFTPClient.from_transport(
+            get_transport(self.host),
+            window_size=self.WINDOW_SIZE,
+            max_packet_size=self.MAX_PACKET_SIZE
+        )
+        sftp.get_channel().settimeout(timeout)
+        return sftp
+
+    @staticmethod
+    def _remote_path(path: str) -> str:
+        """
+        转换远程路径(SFTP不做shell展开，~/ 开头的路径转换为相对于用户主目录的路径)
+
+        Args:
+            path: 远程路径
+
+        Returns:
+            SFTP使用的路径
+        """
+        if path == "~":
+            return "."
+        if path.startswith("~/"):
+            return path[2:]
+        return path
+
+    @staticmethod
+    def _excluded(rel_path: str, exclude: Optional[List[str]]) -> bool:
+        """
+        判断相对路径是否被排除规则匹配(不含 / 的规则匹配文件名，否则匹配相对路径)
+
+        Args:
+            rel_path: 相对于传输根目录的路径
+            exclude: 排除的文件/目录模式列表
+
+        Returns:
+            是否排除
+        """
+        if not exclude:
+            return False
+        name = rel_path.rsplit('/', 1)[-1]
+        for pattern in exclude:
+            if '/' in pattern.rstrip('/'):
+                if fnmatch.fnmatch(rel_path, pattern.strip('/')):
+                    return True
+            elif fnmatch.fnmatch(name, pattern.rstrip('/')):
+                return True
+        return False
+
+    def download(
+        self,
+        remote_path: str,
+        local_path: str,
+        recursive: bool = False,
+        preserve_times: bool = True,
+        exclude: Optional[List[str]] = None,
+        timeout: int = 600
+    ) -> bool:
+        """
+        从远程下载文件/目录到本地目录(路径语义与rsync相同: 源以 / 结尾时复制目录内容)
+
+        Args:
+            remote_path: 远程文件/目录路径
+            local_path: 本地目标目录
+            recursive: 是否递归复制目录
+            preserve_times: 是否保留文件时间戳
+            exclude: 排除的文件/目录模式列表
+            timeout: 超时时间（秒）
+
+        Returns:
+            下载是否成功
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            sftp = self._open_sftp(timeout)
+        except (paramiko.SSHException, OSError) as e:
+            if self.logger:
+                self.logger.error(f"SFTP连接失败: {str(e)}")
+            return False
+
+        try:
+            source = self._remote_path(remote_path)
+            attr = sftp.stat(source)
+            name = os.path.basename(source.rstrip('/'))
+            if stat.S_ISDIR(attr.st_mode):
+                if not recursive:
+                    if self.logger:
+                        self.logger.error(f"跳过目录(未启用递归复制): {remote_path}")
+                    return False
+                target = local_path if source.endswith('/') or not name else os.path.join(local_path, name)
+                count = self._download_dir(sftp, source.rstrip('/') or '/', target, '',
+                                           preserve_times, exclude, deadline)
+            else:
+                os.makedirs(local_path, exist_ok=True)
+                self._download_file(sftp, source, os.path.join(local_path, name), attr,
+                                    preserve_times, deadline)
+                count = 1
+        except (paramiko.SSHException, OSError) as e:
+            if self.logger:
+                self.logger.error(f"SFTP下载失败: {str(e)}")
+            return False
+        finally:
+            sftp.close()
+
+        if self.logger:
+            self.logger.info(f"SFTP下载完成，共 {count} 个文件")
+        return True
+
+    def _download_dir(
+        self,
+        sftp: 'paramiko.SFTPClient',
+        remote_dir: str,
+        local_dir: str,
+        rel_dir: str,
+        preserve_times: bool,
+        exclude: Optional[List[str]],
+        deadline: float
+    ) -> int:
+        """
+        递归下载远程目录
+
+        Returns:
+            下载的文件数
+        """
+        os.makedirs(local_dir, exist_ok=True)
+        count = 0
+        for entry in sftp.listdir_attr(remote_dir):
+            rel_path = f"{rel_dir}/{entry.filename}" if rel_dir else entry.filename
+            if self._excluded(rel_path, exclude):
+                continue
+            if time.monotonic() > deadline:
+                raise OSError("文件复制超时")
+            remote_child = f"{remote_dir.rstrip('/')}/{entry.filename}"
+            local_child = os.path.join(local_dir, entry.filename)
+            if stat.S_ISDIR(entry.st_mode):
+                count += self._download_dir(sftp, remote_child, local_child, rel_path,
+                                            preserve_times, exclude, deadline)
+            elif stat.S_ISREG(entry.st_mode):
+                self._download_file(sftp, remote_child, local_child, entry, preserve_times, deadline)
+                count += 1
+        return count
+
+    def _download_file(
+        self,
+        sftp: 'paramiko.SFTPClient',
+        remote_file: str,
+        local_file: str,
+        attr: 'paramiko.SFTPAttributes',
+        preserve_times: bool,
+        deadline: float
+    ):
+        """下载单个文件(getfo 默认预取，读请求流水线发送)"""
+        if self.logger:
+            self.logger.debug(f"下载: {remote_file}")
+        with open(local_file, 'wb') as f:
+            sftp.getfo(remote_file, f, callback=self._deadline_callback(deadline))
+        if preserve_times:
+            os.utime(local_file, (attr.st_atime, attr.st_mtime))
+
+    def upload(
+        self,
+        local_path: str,
+        remote_path: str,
+        recursive: bool = False,
+        preserve_times: bool = True,
+        exclude: Optional[List[str]] = None,
+        timeout: int = 600
+    ) -> bool:
+        """
+        上传本地文件/目录到远程目录(路径语义与rsync相同: 源以 / 结尾时复制目录内容)
+
+        Args:
+            local_path: 本地文件/目录路径
+            remote_path: 远程目标目录
+            recursive: 是否递归复制目录
+            preserve_times: 是否保留文件时间戳
+            exclude: 排除的文件/目录模式列表
+            timeout: 超时时间（秒）
+
+        Returns:
+            上传是否成功
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            sftp = self._open_sftp(timeout)
+        except (paramiko.SSHException, OSError) as e:
+            if self.logger:
+                self.logger.error(f"SFTP连接失败: {str(e)}")
+            return False
+
+        try:
+            target_dir = self._remote_path(remote_path)
+            self._makedirs(sftp, target_dir)
+            name = os.path.basename(local_path.rstrip('/'))
+            if os.path.isdir(local_path):
+                if not recursive:
+                    if self.logger:
+                        self.logger.error(f"跳过目录(未启用递归复制): {local_path}")
+                    return False
+                target = target_dir if local_path.endswith('/') or not name else f"{target_dir.rstrip('/')}/{name}"
+                count = self._upload_dir(sftp, local_path.rstrip('/') or '/', target, '',
+                                         preserve_times, exclude, deadline)
+            else:
+                self._upload_file(sftp, local_path, f"{target_dir.rstrip('/')}/{name}",
+                                  preserve_times, deadline)
+                count = 1
+        except (paramiko.SSHException, OSError) as e:
+            if self.logger:
+                self.logger.error(f"SFTP上传失败: {str(e)}")
+            return False
+        finally:
+            sftp.close()
+
+        if self.logger:
+            self.logger.info(f"SFTP上传完成，共 {count} 个文件")
+        return True
+
+    def _upload_dir(
+        self,
+        sftp: 'paramiko.SFTPClient',
+        local_dir: str,
+        remote_dir: str,
+        rel_dir: str,
+        preserve_times: bool,
+        exclude: Optional[List[str]],
+        deadline: float
+    ) -> int:
+        """
+        递归上传本地目录
+
+        Returns:
+            上传的文件数
+        """
+        self._makedirs(sftp, remote_dir)
+        count = 0
+        with os.scandir(local_dir) as entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if self._excluded(rel_path, exclude):
+                    continue
+                if time.monotonic() > deadline:
+                    raise OSError("文件复制超时")
+                remote_child = f"{remote_dir.rstrip('/')}/{entry.name}"
+                if entry.is_dir():
+                    count += self._upload_dir(sftp, entry.path, remote_child, rel_path,
+                                              preserve_times, exclude, deadline)
+                elif entry.is_file():
+                    self._upload_file(sftp, entry.path, remote_child, preserve_times, deadline)
+                    count += 1
+        return count
+
+    def _upload_file(
+        self,
+        sftp: 'paramiko.SFTPClient',
+        local_file: str,
+        remote_file: str,
+        preserve_times: bool,
+        deadline: float
+    ):
+        """上传单个文件(put 使用流水线写入，不逐块等待确认)"""
+        if self.logger:
+            self.logger.debug(f"上传: {local_file}")
+        sftp.put(local_file, remote_file, callback=self._deadline_callback(deadline))
+        if preserve_times:
+            st = os.stat(local_file)
+            sftp.utime(remote_file, (st.st_atime, st.st_mtime))
+
+    @staticmethod
+    def _deadline_callback(deadline: float):
+        """
+        创建传输进度回调，超过截止时间时中断传输(大文件传输过程中也能超时)
+
+        Args:
+            deadline: 截止时间(time.monotonic)
+
+        Returns:
+            getfo / put 使用的进度回调
+        """
+        def callback(transferred: int, total: int):
+            if time.monotonic() > deadline:
+                raise OSError("文件复制超时")
+        return callback
+
+    @staticmethod
+    def _makedirs(sftp: 'paramiko.SFTPClient', path: str):
+        """
+        逐级创建远程目录(已存在时忽略)
+
+        Args:
+            sftp: SFTP客户端
+            path: 远程目录路径
+        """
+        current = '/' if path.startswith('/') else ''
+        for part in path.strip('/').split('/'):
+            if not part or part == '.':
+                continue
+            current = f"{current}{part}" if current in ('', '/') else f"{current}/{part}"
+            try:
+                if stat.S_ISDIR(sftp.stat(current).st_mode):
+                    continue
+            except IOError:
+                pass
+            sftp.mkdir(current)
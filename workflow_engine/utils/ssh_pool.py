@@ -0,0 +1,197 @@
+"""
+SSH连接池
+
+进程内按host共享SSH执行器/文件传输器，避免每个任务各自创建连接，
+并限制同一host的并发连接数(低于sshd默认 MaxStartups=10，避免连接被拒绝)
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+
+class SSHPool:
+    """按key(通常包含host)缓存连接对象的连接池"""
+
+    # 每个key默认的最大并发连接数
+    DEFAULT_SIZE = 4
+
+    def __init__(self, size: int = DEFAULT_SIZE):
+        """
+        初始化连接池
+
+        Args:
+            size: 每个key的最大并发连接数
+        """
+        self.size = size
+        self._lock = threading.Lock()
+        # key -> 空闲连接队列
+        self._idle: Dict[Hashable, 'queue.LifoQueue'] = {}
+        # key -> 并发连接数限制
+        self._slots: Dict[Hashable, threading.BoundedSemaphore] = {}
+
+    def acquire(self, key: Hashable, factory: Callable[[], Any],
+                timeout: Optional[float] = None) -> Any:
+        """
+        获取连接，无空闲连接时调用factory创建
+
+        同一key已有size个连接在使用时阻塞等待
+
+        Args:
+            key: 连接key
+            factory: 创建连接的函数
+            timeout: 等待超时时间(秒)，None表示一直等待
+
+        Returns:
+            连接对象
+
+        Raises:
+            TimeoutError: 等待超时
+        """
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle is None:
+                idle = self._idle[key] = queue.LifoQueue()
+                self._slots[key] = threading.BoundedSemaphore(self.size)
+            slots = self._slots[key]
+
+        if not slots.acquire(timeout=-1 if timeout is None else timeout):
+            raise TimeoutError(f"等待SSH连接超时: {key}")
+
+        try:
+            return idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        try:
+            return factory()
+        except Exception:
+            slots.release()
+            raise
+
+    def release(self, key: Hashable, conn: Any):
+        """
+        归还连接
+
+        Args:
+            key: 连接key
+            conn: acquire返回的连接对象
+        """
+        self._idle[key].put(conn)
+        self._slots[key].release()
+
+    @contextmanager
+    def connection(self, key: Hashable, factory: Callable[[], Any],
+                   timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        以上下文管理器方式获取连接，退出时自动归还
+
+        Args:
+            key: 连接key
+            factory: 创建连接的函数
+            timeout: 等待超时时间(秒)
+
+        Yields:
+            连接对象
+        """
+        conn = self.acquire(key, factory, timeout)
+        try:
+            yield conn
+        finally:
+            self.release(key, conn)
+
+    def close_all(self):
+        """关闭所有空闲连接(连接对象有close方法时)"""
+        with self._lock:
+            idle_queues = list(self._idle.values())
+
+        for idle in idle_queues:
+            while True:
+                try:
+                    conn = idle.get_nowait()
+                except queue.Empty:
+                    break
+                close = getattr(conn, 'close', None)
+                if close is not None:
+                    close()
+
+
+_default_pool: Optional[SSHPool] = None
+_default_pool_lock = threading.Lock()
+
+# host -> 共享的SSHExecutor(执行器本身线程安全，无需独占)
+_executors: Dict[str, Any] = {}
+
+# host -> 跨任务共享的传输并发数限制
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+
+
+def get_pool() -> SSHPool:
+    """
+    获取进程级默认连接池
+
+    Returns:
+        连接池实例
+    """
+    global _default_pool
+    if _default_pool is None:
+        with _default_pool_lock:
+            if _default_pool is None:
+                _default_pool = SSHPool()
+    return _default_pool
+
+
+def get_executor(host: str, logger=None):
+    """
+    获取指定host共享的SSH执行器
+
+    Args:
+        host: SSH配置中的主机名
+        logger: 日志记录器(仅首次创建时使用)
+
+    Returns:
+        SSHExecutor实例
+    """
+    executor = _executors.get(host)
+    if executor is None:
+        with _default_pool_lock:
+            executor = _executors.get(host)
+            if executor is None:
+                from workflow_engine.utils.executor import SSHExecutor
+                executor = _executors[host] = SSHExecutor(host=host, logger=logger)
+    return executor
+
+
+def get_executors() -> List[Any]:
+    """
+    获取已创建的所有SSH执行器
+
+    Returns:
+        SSHExecutor实例列表
+    """
+    with _default_pool_lock:
+        return list(_executors.values())
+
+
+def get_host_slots(host: str) -> threading.BoundedSemaphore:
+    """
+    获取指定host的传输并发数限制(进程内所有任务共享，大小同默认连接池的单host连接数)
+
+    每个同时运行的传输(rsync/scp进程等)占用一个名额，
+    避免多个并行任务各自按连接池上限开启工作线程后总连接数超过上限
+
+    Args:
+        host: SSH配置中的主机名
+
+    Returns:
+        该host的信号量
+    """
+    slots = _host_slots.get(host)
+    if slots is None:
+        size = get_pool().size
+        with _default_pool_lock:
+            slots = _host_slots.get(host)
+            if slots is None:
+                slots = _host_slots[host] = threading.BoundedSemaphore(size)
+    return slots
@@ -6,9 +6,21 @@
 - scp: 简单传输，适合小文件，SSH自带无需安装
 """
 
+import ipaddress
+import os
+import re
+import selectors
+import shlex
+import shutil
+import socket
 import subprocess
-from pathlib import Path
-from typing import Optional, List
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Optional, List, Dict, Iterable, Tuple
+from workflow_engine.utils.ssh_pool import get_executor, get_host_slots, get_pool
 
 try:
     from logger import Logger
@@ -16,9 +28,58 @@ except ImportError:
     Logger = None
 
 
+# 传输命令输出的行分隔(rsync/scp 的进度使用 \r 刷新同一行)
+_LINE_SPLIT_RE = re.compile(rb"[\r\n]")
+# 进度行(包含百分比)
+_PROGRESS_RE = re.compile(rb"\d+%")
+
+
+def _decode(data: bytes) -> str:
+    """将命令输出解码为文本(无法解码的字节替换为占位符)"""
+    return data.decode("utf-8", errors="replace")
+
+
 class FileTransfer:
     """文件传输器（支持 rsync 和 scp）"""
 
+    # 预压缩支持的压缩程序: auto 优先使用多线程的 pigz，不可用时使用 gzip(均为 .tar.gz 格式)；
+    # zstd 压缩/解压更快、压缩率更高(.tar.zst 格式)，需要本地和远程都安装 zstd
+    COMPRESSORS = ("auto", "pigz", "gzip", "zstd")
+    # zstd 默认压缩级别
+    ZSTD_LEVEL = 3
+    # 首次检查远程工具时通过一次SSH调用批量探测的工具
+    REMOTE_TOOLS = ("rsync", "pigz", "zstd")
+    # 进度输出的最小日志间隔(秒)
+    PROGRESS_LOG_INTERVAL = 1.0
+    # 传输失败时报告的错误输出行数
+    STDERR_TAIL_LINES = 50
+    # 传输失败重试的初始等待时间和最大等待时间(秒)
+    RETRY_BACKOFF = 5
+    RETRY_MAX_DELAY = 60
+    # rsync/scp 布尔参数与命令行选项的对应关系
+    _RSYNC_BOOL_FLAGS = (
+        ("recursive", "-r"),
+        ("preserve_times", "-t"),
+        ("compress", "-z"),
+        ("delete", "--delete"),
+        ("dry_run", "--dry-run"),
+    )
+    _SCP_BOOL_FLAGS = (
+        ("recursive", "-r"),
+        ("compress", "-C"),
+        ("show_progress", "-v"),
+    )
+    # 已压缩文件的扩展名(再次压缩只消耗CPU，不减少传输量)
+    COMPRESSED_EXTS = (".gz", ".tgz", ".zst", ".xz", ".bz2", ".zip", ".7z")
+    # 传输已压缩数据的ssh选项(覆盖ssh_config中的 Compression yes；复用连接时由主连接决定)
+    NO_COMPRESSION_SSH_OPTIONS = ("-o", "Compression=no")
+
+    # 本地rsync是否可用及其版本(进程内所有实例共享，首次使用rsync时检查)
+    _rsync_available: Optional[bool] = None
+    _rsync_version: Optional[Tuple[int, int]] = None
+    # 主机是否位于局域网的缓存: 主机名 -> 是否为局域网主机
+    _lan_hosts: Dict[str, bool] = {}
+
     def __init__(
         self,
         host: str,
@@ -32,8 +93,8 @@ class FileTransfer:
         Args:
             host: SSH配置中的主机名(在~/.ssh/config中配置)
             logger: 日志记录器实例
-            remote_temp_dir: 远程临时目录（预压缩时使用），默认/tmp
-            local_temp_dir: 本地临时目录（预压缩时使用），默认/tmp
+            remote_temp_dir: 远程临时目录，默认/tmp
+            local_temp_dir: 本地临时目录（从远程预压缩且不解压时存放压缩包），默认/tmp
 
         注意:
             SSH连接参数(user, port, IdentityFile等)应该在~/.ssh/config中预先配置
@@ -44,12 +105,38 @@ class FileTransfer:
         self.remote_temp_dir = remote_temp_dir
         self.local_temp_dir = local_temp_dir
 
-        # 检查rsync是否可用
-        self._check_rsync_available()
-    
-    def _check_rsync_available(self) -> bool:
+        # 远程路径类型缓存: 路径 -> "dir" / "file" / None(不存在)
+        self._stat_cache: Dict[str, Optional[str]] = {}
+        # 已确认创建的远程目录
+        self._remote_dirs_ready = set()
+        # 本地/远程工具是否可用的缓存: 工具名 -> 是否可用
+        self._local_tools: Dict[str, bool] = {}
+        self._remote_tools: Dict[str, bool] = {}
+        # 保护以上缓存(同一传输器的多个传输项在工作线程中并行执行)
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def _check_rsync_available(cls, logger: Optional['Logger'] = None) -> bool:
+        """
+        检查rsync是否安装(仅在首次使用rsync传输时检查，结果在类级别缓存)
+
+        Args:
+            logger: 日志记录器实例
+        
+        Returns:
+            rsync是否可用
         """
-        检查rsync是否安装
+        if cls._rsync_available is None:
+            cls._rsync_available = cls._run_rsync_version(logger)
+        return cls._rsync_available
+
+    @classmethod
+    def _run_rsync_version(cls, logger: Optional['Logger'] = None) -> bool:
+        """
+        执行 rsync --version 检查rsync是否可用并记录版本
+
+        Args:
+            logger: 日志记录器实例
         
         Returns:
             rsync是否可用
@@ -58,25 +145,311 @@ class FileTransfer:
             result = subprocess.run(
                 ["rsync", "--version"],
                 capture_output=True,
+                text=True,
                 timeout=5
             )
             if result.returncode == 0:
-                if self.logger:
-                    self.logger.debug("rsync工具可用")
+                match = re.search(r"version\s+(\d+)\.(\d+)", result.stdout)
+                if match:
+                    cls._rsync_version = (int(match.group(1)), int(match.group(2)))
+                if logger:
+                    logger.debug("rsync工具可用")
                 return True
             else:
-                if self.logger:
-                    self.logger.warning("rsync工具不可用，某些功能可能无法使用")
+                if logger:
+                    logger.warning("rsync工具不可用，某些功能可能无法使用")
                 return False
         except FileNotFoundError:
-            if self.logger:
-                self.logger.warning("未找到rsync工具，请先安装rsync")
+            if logger:
+                logger.warning("未找到rsync工具，请先安装rsync")
             return False
         except Exception as e:
-            if self.logger:
-                self.logger.warning(f"检查rsync时出错: {str(e)}")
+            if logger:
+                logger.warning(f"检查rsync时出错: {str(e)}")
             return False
     
+    def _ssh_options(self) -> List[str]:
+        """
+        获取复用SSH主连接的选项(与同一主机的SSH执行器共享主连接，避免每次调用重新握手和认证)
+
+        Returns:
+            ssh选项列表，主连接不可用时为空列表
+        """
+        return get_executor(self.host, self.logger).ssh_options()
+
+    def _ssh_argv(self, command: str, options: Tuple[str, ...] = ()) -> List[str]:
+        """
+        构建在远程主机执行命令的ssh参数列表
+
+        Args:
+            command: 远程命令
+            options: 主机名之前的额外ssh选项
+
+        Returns:
+            ssh命令参数列表
+        """
+        return ["ssh", *options, *self._ssh_options(), self.host, command]
+
+    def _rsync_ssh_options(self) -> List[str]:
+        """
+        获取rsync使用复用SSH连接的 -e 选项
+
+        Returns:
+            rsync选项列表，主连接不可用时为空列表
+        """
+        options = self._ssh_options()
+        if not options:
+            return []
+        return ["-e", " ".join(shlex.quote(arg) for arg in ["ssh", *options])]
+
+    def _tool_available(self, tool: str, remote: bool = False) -> bool:
+        """
+        检查本地或远程是否安装了指定工具(结果缓存)
+
+        Args:
+            tool: 工具名
+            remote: 是否检查远程主机
+
+        Returns:
+            工具是否可用
+        """
+        cache = self._remote_tools if remote else self._local_tools
+        available = cache.get(tool)
+        if available is not None:
+            return available
+
+        # 持锁探测，并行的传输项不会重复探测同一工具
+        with self._cache_lock:
+            if remote and not cache:
+                # 首次检查远程工具时一次性探测常用工具
+                self._probe_remote_tools()
+            if tool not in cache:
+                if remote:
+                    try:
+                        result = subprocess.run(
+                            self._ssh_argv(f"command -v {tool}"),
+                            stdin=subprocess.DEVNULL,
+                            capture_output=True,
+                            timeout=10
+                        )
+                        cache[tool] = result.returncode == 0
+                    except (subprocess.TimeoutExpired, OSError):
+                        cache[tool] = False
+                else:
+                    cache[tool] = shutil.which(tool) is not None
+            return cache[tool]
+
+    def _detect_compressor(self, compressor: str = "auto", remote: bool = False) -> Optional[str]:
+        """
+        确定本地或远程实际使用的压缩程序
+
+        pigz 与 gzip 的压缩格式相同，压缩端和解压端可以分别选择；zstd 格式不同，不可用时不回退
+
+        Args:
+            compressor: 压缩程序配置，"auto" / "pigz" / "gzip" / "zstd"
+            remote: 是否为远程主机选择
+
+        Returns:
+            "pigz" / "gzip" / "zstd"，指定zstd但未安装时返回None
+        """
+        if compressor == "zstd":
+            if self._tool_available("zstd", remote):
+                return "zstd"
+            if self.logger:
+                self.logger.error(f"{'远程' if remote else '本地'}未安装zstd，无法使用zstd预压缩")
+            return None
+        if compressor in ("auto", "pigz") and self._tool_available("pigz", remote):
+            return "pigz"
+        if compressor == "pigz" and self.logger:
+            self.logger.warning(f"{'远程' if remote else '本地'}未安装pigz，使用gzip")
+        return "gzip"
+
+    def _probe_remote_tools(self, timeout: int = 10):
+        """
+        通过一次SSH调用探测远程主机上 REMOTE_TOOLS 中的工具是否可用，结果写入缓存(调用方持有 _cache_lock)
+
+        Args:
+            timeout: 超时时间（秒）
+        """
+        script = (
+            f"for t in {' '.join(self.REMOTE_TOOLS)}; do "
+            f"command -v $t >/dev/null 2>&1 && echo $t; done; true"
+        )
+        try:
+            result = subprocess.run(
+                self._ssh_argv(script),
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+        except (subprocess.TimeoutExpired, OSError) as e:
+            if self.logger:
+                self.logger.debug(f"探测远程工具失败: {str(e)}")
+            found = set()
+        else:
+            found = set(result.stdout.split()) if result.returncode == 0 else set()
+
+        for tool in self.REMOTE_TOOLS:
+            self._remote_tools[tool] = tool in found
+
+    @classmethod
+    def _tar_compress_options(
+        cls,
+        program: str,
+        level: Optional[int] = None,
+        rsyncable: bool = False
+    ) -> List[str]:
+        """
+        获取 tar 使用指定压缩程序的选项(同一选项用于压缩和解压，tar解压时会追加 -d)
+
+        Args:
+            program: 压缩程序，"pigz" / "gzip" / "zstd"
+            level: 压缩级别，None时使用压缩程序的默认级别(zstd为 ZSTD_LEVEL)
+            rsyncable: 是否生成rsync友好的压缩流(仅压缩时使用，只对 pigz 生效)
+
+        Returns:
+            tar 选项列表(pigz 和 zstd 使用全部CPU核心)
+        """
+        if program == "zstd":
+            # --long 扩大匹配窗口，大文件压缩率更高(解压时也需要指定)；
+            # zstd 的 --rsyncable 需要较新版本(1.3.8+)，远程版本未知时不使用
+            level = cls.ZSTD_LEVEL if level is None else level
+            return ["--use-compress-program", f"zstd -T0 -{level} --long=27"]
+        args = [program]
+        if level is not None:
+            args.append(f"-{level}")
+        if rsyncable and program == "pigz":
+            # 周期性重置压缩状态，源文件的局部修改只影响压缩包的局部，后续rsync可以增量传输；
+            # gzip 1.7 之前的版本不支持 --rsyncable(会直接报错)，远程版本未知时不使用
+            args.append("--rsyncable")
+        if args == ["gzip"]:
+            return ["-z"]
+        return ["--use-compress-program", " ".join(args)]
+
+    @staticmethod
+    def archive_extension(compressor: str = "auto") -> str:
+        """
+        获取预压缩压缩包的扩展名
+
+        Args:
+            compressor: 压缩程序配置
+
+        Returns:
+            ".tar.zst"(zstd) 或 ".tar.gz"
+        """
+        return ".tar.zst" if compressor == "zstd" else ".tar.gz"
+
+    def prefetch_remote_stats(self, paths: Iterable[str], timeout: int = 30) -> Dict[str, Optional[str]]:
+        """
+        通过一次SSH调用批量查询远程路径类型并刷新缓存
+
+        Args:
+            paths: 远程路径列表(不加引号，允许 ~ 等shell展开)
+            timeout: 超时时间（秒）
+
+        Returns:
+            路径 -> "dir" / "file" / None(不存在)，查询失败时返回空字典(不缓存)；
+            通配符匹配多个路径的路径不在结果中
+        """
+        paths = list(dict.fromkeys(paths))
+        if not paths:
+            return {}
+
+        # 路径先经 set -- 展开: 通配符匹配多个路径时无法确定单一类型，不输出结果(视为无法确认，不判定为不存在)
+        script = "\n".join(
+            f'set -- {path}; '
+            f'if [ $# -ne 1 ]; then :; '
+            f'elif [ -d "$1" ]; then echo "{idx} dir"; '
+            f'elif [ -e "$1" ]; then echo "{idx} file"; '
+            f'else echo "{idx} -"; fi'
+            for idx, path in enumerate(paths)
+        )
+        try:
+            result = subprocess.run(
+                self._ssh_argv(script),
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+        except (subprocess.TimeoutExpired, OSError) as e:
+            if self.logger:
+                self.logger.debug(f"查询远程路径信息失败: {str(e)}")
+            return {}
+
+        if result.returncode != 0:
+            if self.logger:
+                self.logger.debug(f"查询远程路径信息失败: {result.stderr.strip()}")
+            return {}
+
+        stats = {}
+        for line in result.stdout.splitlines():
+            idx, _, kind = line.partition(" ")
+            if idx.isdigit() and int(idx) < len(paths):
+                stats[paths[int(idx)]] = None if kind == "-" else kind
+
+        with self._cache_lock:
+            self._stat_cache.update(stats)
+        return stats
+
+    def prepare_remote_dirs(self, dirs: Iterable[str], timeout: int = 30) -> bool:
+        """
+        通过一次SSH调用创建所有远程目录(已创建过的目录跳过)
+
+        Args:
+            dirs: 远程目录列表
+            timeout: 超时时间（秒）
+
+        Returns:
+            是否全部创建成功
+        """
+        with self._cache_lock:
+            pending = [d for d in dict.fromkeys(dirs) if d and d not in self._remote_dirs_ready]
+        if not pending:
+            return True
+
+        try:
+            result = subprocess.run(
+                self._ssh_argv("mkdir -p -- " + " ".join(pending)),
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+        except (subprocess.TimeoutExpired, OSError) as e:
+            if self.logger:
+                self.logger.warning(f"创建远程目录失败: {str(e)}")
+            return False
+
+        if result.returncode != 0:
+            if self.logger:
+                self.logger.warning(f"创建远程目录失败: {result.stderr.strip()}")
+            return False
+
+        with self._cache_lock:
+            self._remote_dirs_ready.update(pending)
+            for d in pending:
+                self._stat_cache[d] = "dir"
+        return True
+
+    def remote_stat(self, path: str) -> Optional[str]:
+        """
+        获取远程路径类型(优先使用缓存)
+
+        Args:
+            path: 远程路径
+
+        Returns:
+            "dir" / "file"，不存在或查询失败时返回None
+        """
+        with self._cache_lock:
+            cached = path in self._stat_cache
+        if not cached:
+            self.prefetch_remote_stats([path])
+        with self._cache_lock:
+            return self._stat_cache.get(path)
+
     def copy_from_remote(
         self,
         remote_path: str,
@@ -92,7 +465,19 @@ class FileTransfer:
         show_progress: bool = True,
         timeout: int = 600,
         pre_compress: bool = False,
-        decompress: bool = True
+        decompress: bool = True,
+        archive_name: Optional[str] = None,
+        compressor: str = "auto",
+        compress_level: Optional[int] = None,
+        rsync_friendly: bool = True,
+        inplace: bool = False,
+        partial: bool = False,
+        append_verify: bool = False,
+        whole_file: Optional[bool] = None,
+        block_size: Optional[int] = None,
+        checksum: bool = False,
+        verbose: bool = False,
+        attempts: int = 1
     ) -> bool:
         """
         从远程主机复制文件到本地
@@ -100,7 +485,7 @@ class FileTransfer:
         Args:
             remote_path: 远程文件/目录路径
             local_path: 本地目标路径
-            method: 传输方法，"rsync"（默认）或 "scp"
+            method: 传输方法，"rsync"（默认）、"scp" 或 "sftp"（需要安装paramiko，进程内复用SSH连接）
             recursive: 是否递归复制目录
             preserve_times: 是否保留文件时间戳
             compress: 是否压缩传输数据（rsync/scp的流式压缩）
@@ -112,6 +497,18 @@ class FileTransfer:
             timeout: 超时时间（秒）
             pre_compress: 是否预压缩（远程打包→传输→本地解压）
             decompress: 是否解压（仅当pre_compress=True时有效，默认True）
+            archive_name: 预压缩时使用的压缩包文件名（默认按源路径和当前时间生成）
+            compressor: 预压缩使用的压缩程序，"auto"（默认，优先pigz）/ "pigz" / "gzip" / "zstd"
+            compress_level: 预压缩的压缩级别（默认使用压缩程序的默认级别）
+            rsync_friendly: 不解压时生成rsync友好的压缩包（pigz 的 --rsyncable，默认True）
+            inplace: 直接更新目标文件而不是写临时文件后替换（仅rsync支持）
+            partial: 保留中断传输的部分文件，下次从断点继续（仅rsync支持）
+            append_verify: 追加传输目标文件中缺少的尾部并校验整个文件（仅rsync支持）
+            whole_file: True强制整文件传输，False强制增量传输，None时局域网主机整文件传输、其他使用rsync默认行为（仅rsync支持）
+            block_size: rsync增量传输的校验块大小（字节，默认由rsync按文件大小决定，仅rsync支持）
+            checksum: 按校验和而不是修改时间和大小判断文件是否变化（仅rsync支持）
+            verbose: 是否输出逐文件信息（仅rsync支持，默认只输出整体进度）
+            attempts: 最大尝试次数（默认1，失败时按指数退避重试；rsync重试时保留部分文件，从断点继续）
 
         Returns:
             复制是否成功
@@ -121,31 +518,46 @@ class FileTransfer:
 
         # 如果启用预压缩，使用预压缩传输流程
         if pre_compress:
-            return self._copy_from_remote_with_precompress(
+            return self._retry(attempts, lambda: self._copy_from_remote_with_precompress(
                 remote_path=remote_path,
                 local_path=local_path,
                 exclude=exclude,
                 timeout=timeout,
-                decompress=decompress
-            )
+                decompress=decompress,
+                archive_name=archive_name,
+                compressor=compressor,
+                compress_level=compress_level,
+                rsync_friendly=rsync_friendly
+            ))
+
+        compress = self._compress_for(remote_path, compress)
 
         # 确保本地目录存在
-        local_dir = Path(local_path)
-        if not local_dir.exists():
-            local_dir.mkdir(parents=True, exist_ok=True)
+        os.makedirs(local_path, exist_ok=True)
+
+        if method.lower() == "sftp" and self._sftp_available():
+            from workflow_engine.utils.sftp import SFTPTransfer
+            return self._retry(attempts, lambda: SFTPTransfer(self.host, self.logger).download(
+                remote_path=remote_path,
+                local_path=local_path,
+                recursive=recursive,
+                preserve_times=preserve_times,
+                exclude=exclude,
+                timeout=timeout
+            ))
 
         # 根据方法选择实现
         if method.lower() == "scp":
-            return self._copy_from_remote_scp(
+            return self._retry(attempts, lambda: self._copy_from_remote_scp(
                 remote_path=remote_path,
                 local_path=local_path,
                 recursive=recursive,
                 compress=compress,
                 show_progress=show_progress,
                 timeout=timeout
-            )
+            ))
         else:  # 默认使用 rsync
-            return self._copy_from_remote_rsync(
+            return self._retry(attempts, lambda: self._copy_from_remote_rsync(
                 remote_path=remote_path,
                 local_path=local_path,
                 recursive=recursive,
@@ -156,8 +568,15 @@ class FileTransfer:
                 include=include,
                 dry_run=dry_run,
                 show_progress=show_progress,
-                timeout=timeout
-            )
+                timeout=timeout,
+                inplace=inplace,
+                partial=partial or attempts > 1,
+                append_verify=append_verify,
+                whole_file=whole_file,
+                block_size=block_size,
+                checksum=checksum,
+                verbose=verbose
+            ))
 
     def _copy_from_remote_rsync(
         self,
@@ -171,32 +590,37 @@ class FileTransfer:
         include: Optional[List[str]] = None,
         dry_run: bool = False,
         show_progress: bool = True,
-        timeout: int = 600
+        timeout: int = 600,
+        inplace: bool = False,
+        partial: bool = False,
+        append_verify: bool = False,
+        whole_file: Optional[bool] = None,
+        block_size: Optional[int] = None,
+        checksum: bool = False,
+        verbose: bool = False
     ) -> bool:
         """使用 rsync 从远程复制"""
         # 构建rsync命令
-        cmd = ["rsync"]
+        self._check_rsync_available(self.logger)
+        cmd = ["rsync", *self._rsync_ssh_options()]
 
         # 基本选项
-        options = ["-v"]  # verbose
-
-        if recursive:
-            options.append("-r")  # recursive
-
-        if preserve_times:
-            options.append("-t")  # preserve times
-
-        if compress:
-            options.append("-z")  # compress
-
-        if delete:
-            options.append("--delete")  # delete extraneous files
+        options = self._flag_options(
+            self._RSYNC_BOOL_FLAGS,
+            recursive=recursive,
+            preserve_times=preserve_times,
+            compress=compress,
+            delete=delete,
+            dry_run=dry_run
+        )
 
-        if dry_run:
-            options.append("--dry-run")  # perform a trial run
+        # 输出选项(默认不输出逐文件信息)
+        options.extend(self._rsync_output_options(show_progress, verbose))
 
-        if show_progress:
-            options.append("--progress")  # show progress
+        # 增量传输/断点续传选项
+        options.extend(self._rsync_resume_options(
+            inplace, partial, append_verify, self._default_whole_file(whole_file), checksum, block_size
+        ))
 
         # 添加排除规则
         if exclude:
@@ -217,6 +641,210 @@ class FileTransfer:
         # 执行命令
         return self._execute_transfer_command(cmd, timeout)
 
+    def _rsync_output_options(self, show_progress: bool, verbose: bool) -> List[str]:
+        """
+        构建rsync输出相关选项
+
+        显示进度时默认使用整体进度(--info=progress2，只输出一行汇总)，而不是逐文件输出；
+        verbose 或 rsync 低于3.1(不支持 --info)时使用逐文件进度
+
+        Args:
+            show_progress: 是否显示进度
+            verbose: 是否输出逐文件信息
+
+        Returns:
+            rsync选项列表
+        """
+        options = ["-v"] if verbose else []
+        if show_progress:
+            if verbose or (self._rsync_version or (0, 0)) < (3, 1):
+                options.append("--progress")
+            else:
+                # 预先扫描文件列表，使整体进度的总量准确
+                options.extend(["--info=progress2", "--no-inc-recursive"])
+        return options
+
+    @staticmethod
+    def _flag_options(table: Tuple[Tuple[str, str], ...], **enabled: bool) -> List[str]:
+        """
+        按对应关系表构建布尔选项，单字母选项合并为一个参数(如 -rtz)
+
+        Args:
+            table: (参数名, 命令行选项) 对应关系表
+            enabled: 参数名 -> 是否启用
+
+        Returns:
+            命令行选项列表
+        """
+        flags = [flag for name, flag in table if enabled.get(name)]
+        short = "".join(flag[1] for flag in flags if len(flag) == 2)
+        long_flags = [flag for flag in flags if len(flag) > 2]
+        return [f"-{short}", *long_flags] if short else long_flags
+
+    @staticmethod
+    def _rsync_resume_options(
+        inplace: bool = False,
+        partial: bool = False,
+        append_verify: bool = False,
+        whole_file: Optional[bool] = None,
+        checksum: bool = False,
+        block_size: Optional[int] = None
+    ) -> List[str]:
+        """
+        构建rsync增量传输和断点续传相关选项
+
+        Args:
+            inplace: 直接更新目标文件(大文件只写入变化的部分)
+            partial: 保留中断传输的部分文件
+            append_verify: 追加传输缺少的尾部并校验整个文件
+            whole_file: True强制整文件传输，False强制增量传输，None使用rsync默认行为
+            checksum: 按校验和判断文件是否变化
+            block_size: 增量传输的校验块大小(字节)
+
+        Returns:
+            rsync选项列表
+        """
+        options = []
+        if inplace:
+            options.append("--inplace")
+        if partial:
+            options.append("--partial")
+        if append_verify:
+            options.append("--append-verify")
+        if whole_file is not None:
+            options.append("--whole-file" if whole_file else "--no-whole-file")
+        if checksum:
+            options.append("-c")
+        if block_size:
+            options.append(f"--block-size={block_size}")
+        return options
+
+    def _retry(self, attempts: int, transfer: Callable[[], bool]) -> bool:
+        """
+        执行传输，失败时按指数退避重试(该host的SSH执行器被中止时停止重试)
+
+        Args:
+            attempts: 最大尝试次数
+            transfer: 执行一次传输的函数，返回是否成功
+
+        Returns:
+            传输是否成功
+        """
+        for attempt in range(1, attempts + 1):
+            if transfer():
+                return True
+            if attempt < attempts:
+                delay = min(self.RETRY_BACKOFF * 2 ** (attempt - 1), self.RETRY_MAX_DELAY)
+                if self.logger:
+                    self.logger.warning(f"传输失败，{delay}秒后重试 ({attempt}/{attempts - 1})")
+                # 工作流中断时(执行器被中止)不再重试
+                if get_executor(self.host, self.logger).wait_abort(delay):
+                    return False
+        return False
+
+    def _sftp_available(self) -> bool:
+        """
+        检查SFTP传输是否可用(需要安装 paramiko，不可用时回退到rsync)
+
+        Returns:
+            SFTP传输是否可用
+        """
+        # 按需导入，使用rsync/scp时不加载 paramiko
+        from workflow_engine.utils.sftp import sftp_available
+        if sftp_available():
+            return True
+        if self.logger:
+            self.logger.warning("未安装paramiko，sftp传输回退到rsync")
+        return False
+
+    def _compress_for(self, source_path: str, compress: bool) -> bool:
+        """
+        确定是否启用传输压缩(rsync -z / scp -C)
+
+        Args:
+            source_path: 源文件/目录路径
+            compress: 调用方指定的值
+
+        Returns:
+            源文件已压缩时返回False，否则返回 compress
+        """
+        if compress and source_path.rstrip('/').lower().endswith(self.COMPRESSED_EXTS):
+            if self.logger:
+                self.logger.debug(f"源文件已压缩，关闭传输压缩: {source_path}")
+            return False
+        return compress
+
+    def _default_whole_file(self, whole_file: Optional[bool]) -> Optional[bool]:
+        """
+        确定是否使用整文件传输
+
+        局域网带宽充足，增量算法读取两端文件并计算校验和的开销通常大于节省的传输量，未指定时使用整文件传输
+
+        Args:
+            whole_file: 调用方指定的值，None表示未指定
+
+        Returns:
+            rsync的整文件传输设置
+        """
+        if whole_file is None and self._is_lan_host():
+            if self.logger:
+                self.logger.debug(f"{self.host} 位于局域网，使用整文件传输")
+            return True
+        return whole_file
+
+    def _is_lan_host(self) -> bool:
+        """
+        判断远程主机是否位于局域网(私有/链路本地/回环地址，结果在类级别按主机缓存)
+
+        Returns:
+            是否为局域网主机，无法解析地址时返回False
+        """
+        if self.host not in self._lan_hosts:
+            self._lan_hosts[self.host] = self._resolve_lan_host()
+        return self._lan_hosts[self.host]
+
+    def _resolve_lan_host(self) -> bool:
+        """
+        解析远程主机地址并判断是否位于局域网
+
+        通过 ssh -G 获取SSH配置中的实际主机名(只解析配置，不建立连接)
+
+        Returns:
+            是否为局域网主机
+        """
+        hostname = self.host
+        try:
+            result = subprocess.run(
+                ["ssh", "-G", self.host],
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            if result.returncode == 0:
+                for line in result.stdout.splitlines():
+                    key, _, value = line.partition(" ")
+                    if key == "hostname" and value.strip():
+                        hostname = value.strip()
+                        break
+        except (subprocess.TimeoutExpired, OSError):
+            pass
+
+        try:
+            addresses = [ipaddress.ip_address(hostname)]
+        except ValueError:
+            try:
+                addresses = [
+                    ipaddress.ip_address(info[4][0].split('%')[0])
+                    for info in socket.getaddrinfo(hostname, None)
+                ]
+            except (OSError, ValueError):
+                return False
+
+        return bool(addresses) and all(
+            addr.is_private or addr.is_link_local or addr.is_loopback for addr in addresses
+        )
+
     def _copy_from_remote_scp(
         self,
         remote_path: str,
@@ -228,17 +856,15 @@ class FileTransfer:
     ) -> bool:
         """使用 scp 从远程复制"""
         # 构建scp命令
-        cmd = ["scp"]
-
-        # 基本选项
-        if recursive:
-            cmd.append("-r")  # recursive
-
-        if compress:
-            cmd.append("-C")  # compression
+        cmd = ["scp", *self._ssh_options()]
 
-        if show_progress:
-            cmd.append("-v")  # verbose (进度信息)
+        # 基本选项(-v 输出进度信息)
+        cmd.extend(self._flag_options(
+            self._SCP_BOOL_FLAGS,
+            recursive=recursive,
+            compress=compress,
+            show_progress=show_progress
+        ))
 
         # 添加源和目标
         cmd.append(f"{self.host}:{remote_path}")
@@ -251,46 +877,122 @@ class FileTransfer:
         """执行传输命令的通用方法"""
         return self._execute_transfer_command_batch(cmd, timeout)
 
-
     def _execute_transfer_command_batch(self, cmd: List[str], timeout: int) -> bool:
-        """执行传输命令（批量输出模式）"""
-        try:
-            if self.logger:
-                self.logger.debug(f"执行命令: {' '.join(cmd)}")
+        """
+        执行传输命令（流式读取输出）
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+        标准输出和标准错误边读取边记录，内存占用与输出量无关；
+        进度行(rsync 使用 \\r 刷新)按 PROGRESS_LOG_INTERVAL 限流记录，
+        输出按字节处理，只有实际写入日志的行才解码
 
-            # 记录输出（改为 INFO 级别，确保显示）
-            if result.stdout and self.logger:
-                for line in result.stdout.splitlines():
-                    self.logger.info(line)
+        Args:
+            cmd: 命令参数列表
+            timeout: 超时时间（秒）
 
-            if result.returncode == 0:
-                if self.logger:
-                    self.logger.info("文件复制成功")
-                return True
-            else:
-                if self.logger:
-                    self.logger.error(f"文件复制失败，返回码: {result.returncode}")
-                    if result.stderr:
-                        self.logger.error(f"错误信息: {result.stderr}")
-                return False
+        Returns:
+            命令是否执行成功
+        """
+        if self.logger:
+            self.logger.debug(f"执行命令: {' '.join(cmd)}")
 
-        except subprocess.TimeoutExpired:
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except OSError as e:
             if self.logger:
-                self.logger.error(f"文件复制超时（{timeout}秒）")
+                self.logger.error(f"文件复制异常: {str(e)}")
             return False
 
-        except Exception as e:
+        selector = selectors.DefaultSelector()
+        selector.register(proc.stdout, selectors.EVENT_READ, "stdout")
+        selector.register(proc.stderr, selectors.EVENT_READ, "stderr")
+        pending = {"stdout": b"", "stderr": b""}
+        # 标准错误的最后若干行(原始字节，失败时才解码)
+        stderr_tail = deque(maxlen=self.STDERR_TAIL_LINES)
+        # 被限流跳过的最后一条进度(原始字节，结束时补记)
+        last_progress = None
+        last_progress_time = 0.0
+        deadline = time.monotonic() + timeout
+        timed_out = False
+
+        try:
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+
+                for key, _ in selector.select(timeout=remaining):
+                    stream = key.data
+                    chunk = os.read(key.fileobj.fileno(), 65536)
+                    if chunk:
+                        lines = _LINE_SPLIT_RE.split(pending[stream] + chunk)
+                        pending[stream] = lines.pop()
+                    else:
+                        selector.unregister(key.fileobj)
+                        lines = [pending[stream]]
+                        pending[stream] = b""
+
+                    for raw in lines:
+                        line = raw.strip()
+                        if not line:
+                            continue
+                        if stream == "stderr":
+                            stderr_tail.append(line)
+                        elif not self.logger:
+                            continue
+                        elif _PROGRESS_RE.search(line):
+                            now = time.monotonic()
+                            if now - last_progress_time >= self.PROGRESS_LOG_INTERVAL:
+                                self.logger.info(_decode(line))
+                                last_progress_time = now
+                                last_progress = None
+                            else:
+                                last_progress = line
+                        else:
+                            self.logger.info(_decode(line))
+
+            if not timed_out:
+                try:
+                    proc.wait(timeout=max(deadline - time.monotonic(), 0))
+                except subprocess.TimeoutExpired:
+                    timed_out = True
+
+        finally:
+            selector.close()
+            if proc.poll() is None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+            proc.stdout.close()
+            proc.stderr.close()
+
+        if timed_out:
             if self.logger:
-                self.logger.error(f"文件复制异常: {str(e)}")
+                self.logger.error(f"文件复制超时（{timeout}秒）")
             return False
 
+        if self.logger and last_progress:
+            self.logger.info(_decode(last_progress))
+
+        if proc.returncode == 0:
+            if self.logger:
+                self.logger.info("文件复制成功")
+            return True
+
+        if self.logger:
+            self.logger.error(f"文件复制失败，返回码: {proc.returncode}")
+            if stderr_tail:
+                self.logger.error("错误信息: " + _decode(b"\n".join(stderr_tail)))
+        return False
+
     def copy_to_remote(
         self,
         local_path: str,
@@ -305,7 +1007,19 @@ class FileTransfer:
         show_progress: bool = True,
         timeout: int = 600,
         pre_compress: bool = False,
-        decompress: bool = True
+        decompress: bool = True,
+        archive_name: Optional[str] = None,
+        compressor: str = "auto",
+        compress_level: Optional[int] = None,
+        rsync_friendly: bool = True,
+        inplace: bool = False,
+        partial: bool = False,
+        append_verify: bool = False,
+        whole_file: Optional[bool] = None,
+        block_size: Optional[int] = None,
+        checksum: bool = False,
+        verbose: bool = False,
+        attempts: int = 1
     ) -> bool:
         """
         从本地复制文件到远程主机
@@ -313,7 +1027,7 @@ class FileTransfer:
         Args:
             local_path: 本地文件/目录路径
             remote_path: 远程目标路径
-            method: 传输方法，"rsync"（默认）或 "scp"
+            method: 传输方法，"rsync"（默认）、"scp" 或 "sftp"（需要安装paramiko，进程内复用SSH连接）
             recursive: 是否递归复制目录
             preserve_times: 是否保留文件时间戳
             compress: 是否压缩传输数据（rsync/scp的流式压缩）
@@ -324,6 +1038,18 @@ class FileTransfer:
             timeout: 超时时间（秒）
             pre_compress: 是否预压缩（本地打包→传输→远程解压）
             decompress: 是否解压（仅当pre_compress=True时有效，默认True）
+            archive_name: 预压缩时使用的压缩包文件名（默认按源路径和当前时间生成）
+            compressor: 预压缩使用的压缩程序，"auto"（默认，优先pigz）/ "pigz" / "gzip" / "zstd"
+            compress_level: 预压缩的压缩级别（默认使用压缩程序的默认级别）
+            rsync_friendly: 不解压时生成rsync友好的压缩包（pigz 的 --rsyncable，默认True）
+            inplace: 直接更新目标文件而不是写临时文件后替换（仅rsync支持）
+            partial: 保留中断传输的部分文件，下次从断点继续（仅rsync支持）
+            append_verify: 追加传输目标文件中缺少的尾部并校验整个文件（仅rsync支持）
+            whole_file: True强制整文件传输，False强制增量传输，None时局域网主机整文件传输、其他使用rsync默认行为（仅rsync支持）
+            block_size: rsync增量传输的校验块大小（字节，默认由rsync按文件大小决定，仅rsync支持）
+            checksum: 按校验和而不是修改时间和大小判断文件是否变化（仅rsync支持）
+            verbose: 是否输出逐文件信息（仅rsync支持，默认只输出整体进度）
+            attempts: 最大尝试次数（默认1，失败时按指数退避重试；rsync重试时保留部分文件，从断点继续）
 
         Returns:
             复制是否成功
@@ -333,26 +1059,43 @@ class FileTransfer:
 
         # 如果启用预压缩，使用预压缩传输流程
         if pre_compress:
-            return self._copy_to_remote_with_precompress(
+            return self._retry(attempts, lambda: self._copy_to_remote_with_precompress(
                 local_path=local_path,
                 remote_path=remote_path,
                 exclude=exclude,
                 timeout=timeout,
-                decompress=decompress
-            )
+                decompress=decompress,
+                archive_name=archive_name,
+                compressor=compressor,
+                compress_level=compress_level,
+                rsync_friendly=rsync_friendly
+            ))
+
+        compress = self._compress_for(local_path, compress)
+
+        if method.lower() == "sftp" and self._sftp_available():
+            from workflow_engine.utils.sftp import SFTPTransfer
+            return self._retry(attempts, lambda: SFTPTransfer(self.host, self.logger).upload(
+                local_path=local_path,
+                remote_path=remote_path,
+                recursive=recursive,
+                preserve_times=preserve_times,
+                exclude=exclude,
+                timeout=timeout
+            ))
 
         # 根据方法选择实现
         if method.lower() == "scp":
-            return self._copy_to_remote_scp(
+            return self._retry(attempts, lambda: self._copy_to_remote_scp(
                 local_path=local_path,
                 remote_path=remote_path,
                 recursive=recursive,
                 compress=compress,
                 show_progress=show_progress,
                 timeout=timeout
-            )
+            ))
         else:  # 默认使用 rsync
-            return self._copy_to_remote_rsync(
+            return self._retry(attempts, lambda: self._copy_to_remote_rsync(
                 local_path=local_path,
                 remote_path=remote_path,
                 recursive=recursive,
@@ -362,8 +1105,15 @@ class FileTransfer:
                 exclude=exclude,
                 dry_run=dry_run,
                 show_progress=show_progress,
-                timeout=timeout
-            )
+                timeout=timeout,
+                inplace=inplace,
+                partial=partial or attempts > 1,
+                append_verify=append_verify,
+                whole_file=whole_file,
+                block_size=block_size,
+                checksum=checksum,
+                verbose=verbose
+            ))
 
     def _copy_to_remote_rsync(
         self,
@@ -376,32 +1126,37 @@ class FileTransfer:
         exclude: Optional[List[str]] = None,
         dry_run: bool = False,
         show_progress: bool = True,
-        timeout: int = 600
+        timeout: int = 600,
+        inplace: bool = False,
+        partial: bool = False,
+        append_verify: bool = False,
+        whole_file: Optional[bool] = None,
+        block_size: Optional[int] = None,
+        checksum: bool = False,
+        verbose: bool = False
     ) -> bool:
         """使用 rsync 复制到远程"""
         # 构建rsync命令
-        cmd = ["rsync"]
+        self._check_rsync_available(self.logger)
+        cmd = ["rsync", *self._rsync_ssh_options()]
 
         # 基本选项
-        options = ["-v"]
-
-        if recursive:
-            options.append("-r")
-
-        if preserve_times:
-            options.append("-t")
-
-        if compress:
-            options.append("-z")
-
-        if delete:
-            options.append("--delete")
+        options = self._flag_options(
+            self._RSYNC_BOOL_FLAGS,
+            recursive=recursive,
+            preserve_times=preserve_times,
+            compress=compress,
+            delete=delete,
+            dry_run=dry_run
+        )
 
-        if dry_run:
-            options.append("--dry-run")
+        # 输出选项(默认不输出逐文件信息)
+        options.extend(self._rsync_output_options(show_progress, verbose))
 
-        if show_progress:
-            options.append("--progress")
+        # 增量传输/断点续传选项
+        options.extend(self._rsync_resume_options(
+            inplace, partial, append_verify, self._default_whole_file(whole_file), checksum, block_size
+        ))
 
         # 添加排除规则
         if exclude:
@@ -417,6 +1172,83 @@ class FileTransfer:
         # 执行命令
         return self._execute_transfer_command(cmd, timeout)
 
+    def copy_many(
+        self,
+        sources: List[str],
+        destination: str,
+        direction: str = "remote_to_local",
+        recursive: bool = False,
+        preserve_times: bool = True,
+        compress: bool = True,
+        exclude: Optional[List[str]] = None,
+        show_progress: bool = True,
+        timeout: int = 600,
+        verbose: bool = False,
+        delete: bool = False,
+        dry_run: bool = False,
+        inplace: bool = False,
+        partial: bool = False,
+        attempts: int = 1
+    ) -> bool:
+        """
+        使用一次 rsync 调用传输多个源到同一目标目录
+
+        相比逐个传输，只建立一次SSH连接、启动一次rsync，每个源的复制语义与单独传输相同
+
+        Args:
+            sources: 源路径列表(remote_to_local时为远程路径，local_to_remote时为本地路径)
+            destination: 目标路径(remote_to_local时为本地路径，local_to_remote时为远程路径)
+            direction: 传输方向，"remote_to_local" 或 "local_to_remote"
+            recursive: 是否递归复制目录
+            preserve_times: 是否保留文件时间戳
+            compress: 是否压缩传输数据
+            exclude: 排除的文件/目录模式列表
+            show_progress: 是否显示进度
+            timeout: 超时时间（秒）
+            verbose: 是否输出逐文件信息
+            delete: 是否删除目标中多余的文件
+            dry_run: 是否只进行模拟运行
+            inplace: 是否直接更新目标文件
+            partial: 是否保留中断传输的部分文件
+            attempts: 最大尝试次数（默认1，重试时保留部分文件，从断点继续）
+
+        Returns:
+            全部传输是否成功
+        """
+        if self.logger:
+            self.logger.info(f"开始批量传输 [rsync] {len(sources)} 个源 -> {destination}")
+
+        self._check_rsync_available(self.logger)
+        cmd = ["rsync", *self._rsync_ssh_options()]
+        cmd.extend(self._flag_options(
+            self._RSYNC_BOOL_FLAGS,
+            recursive=recursive,
+            preserve_times=preserve_times,
+            compress=compress,
+            delete=delete,
+            dry_run=dry_run
+        ))
+
+        cmd.extend(self._rsync_output_options(show_progress, verbose))
+        cmd.extend(self._rsync_resume_options(inplace, partial or attempts > 1))
+
+        if exclude:
+            for pattern in exclude:
+                cmd.extend(["--exclude", pattern])
+
+        if direction == "remote_to_local":
+            # 确保本地目录存在
+            os.makedirs(destination, exist_ok=True)
+            # 同一主机的后续远程源使用 ":path" 简写
+            cmd.append(f"{self.host}:{sources[0]}")
+            cmd.extend(f":{source}" for source in sources[1:])
+            cmd.append(destination)
+        else:
+            cmd.extend(sources)
+            cmd.append(f"{self.host}:{destination}")
+
+        return self._retry(attempts, lambda: self._execute_transfer_command(cmd, timeout))
+
     def _copy_to_remote_scp(
         self,
         local_path: str,
@@ -428,17 +1260,15 @@ class FileTransfer:
     ) -> bool:
         """使用 scp 复制到远程"""
         # 构建scp命令
-        cmd = ["scp"]
+        cmd = ["scp", *self._ssh_options()]
 
-        # 基本选项
-        if recursive:
-            cmd.append("-r")  # recursive
-
-        if compress:
-            cmd.append("-C")  # compression
-
-        if show_progress:
-            cmd.append("-v")  # verbose (进度信息)
+        # 基本选项(-v 输出进度信息)
+        cmd.extend(self._flag_options(
+            self._SCP_BOOL_FLAGS,
+            recursive=recursive,
+            compress=compress,
+            show_progress=show_progress
+        ))
 
         # 添加源和目标
         cmd.append(local_path)
@@ -455,10 +1285,16 @@ class FileTransfer:
         exclude: Optional[List[str]] = None,
         delete: bool = True,
         dry_run: bool = False,
-        timeout: int = 1200
+        timeout: int = 1200,
+        inplace: bool = True,
+        partial: bool = True,
+        parallel_files: int = 1
     ) -> bool:
         """
         同步目录（双向同步助手）
+
+        重复同步的场景默认启用 inplace 和 partial，只写入变化的部分并支持中断后续传；
+        parallel_files > 1 时按源目录的顶层条目分组，多个rsync并行同步(适合大量小文件)
         
         Args:
             source: 源目录路径
@@ -468,10 +1304,29 @@ class FileTransfer:
             delete: 是否删除目标中多余的文件
             dry_run: 是否只进行模拟运行
             timeout: 超时时间（秒）
+            inplace: 是否直接更新目标文件
+            partial: 是否保留中断传输的部分文件
+            parallel_files: 并行rsync进程数（默认1，不并行）
             
         Returns:
             同步是否成功
         """
+        if parallel_files > 1 and direction in ("pull", "push"):
+            success = self._sync_directory_parallel(
+                source=source,
+                destination=destination,
+                direction=direction,
+                parallel_files=parallel_files,
+                exclude=exclude,
+                delete=delete,
+                dry_run=dry_run,
+                timeout=timeout,
+                inplace=inplace,
+                partial=partial
+            )
+            if success is not None:
+                return success
+
         if direction == "pull":
             return self.copy_from_remote(
                 remote_path=source,
@@ -480,7 +1335,9 @@ class FileTransfer:
                 delete=delete,
                 exclude=exclude,
                 dry_run=dry_run,
-                timeout=timeout
+                timeout=timeout,
+                inplace=inplace,
+                partial=partial
             )
         elif direction == "push":
             return self.copy_to_remote(
@@ -490,7 +1347,9 @@ class FileTransfer:
                 delete=delete,
                 exclude=exclude,
                 dry_run=dry_run,
-                timeout=timeout
+                timeout=timeout,
+                inplace=inplace,
+                partial=partial
             )
         else:
             if self.logger:
@@ -502,7 +1361,8 @@ class FileTransfer:
         remote_path: str,
         local_backup_path: str,
         exclude: Optional[List[str]] = None,
-        timeout: int = 1800
+        timeout: int = 1800,
+        parallel_files: int = 1
     ) -> bool:
         """
         备份远程目录到本地
@@ -512,12 +1372,26 @@ class FileTransfer:
             local_backup_path: 本地备份路径
             exclude: 排除的文件/目录模式列表
             timeout: 超时时间（秒）
+            parallel_files: 并行rsync进程数（默认1，不并行）
             
         Returns:
             备份是否成功
         """
         if self.logger:
             self.logger.info(f"开始备份远程目录: {remote_path}")
+
+        if parallel_files > 1:
+            success = self._sync_directory_parallel(
+                source=remote_path,
+                destination=local_backup_path,
+                direction="pull",
+                parallel_files=parallel_files,
+                exclude=exclude,
+                delete=False,
+                timeout=timeout
+            )
+            if success is not None:
+                return success
         
         return self.copy_from_remote(
             remote_path=remote_path,
@@ -530,372 +1404,492 @@ class FileTransfer:
             timeout=timeout
         )
 
-    def _copy_from_remote_with_precompress(
-        self,
-        remote_path: str,
-        local_path: str,
-        exclude: Optional[List[str]] = None,
-        timeout: int = 600,
-        decompress: bool = True
-    ) -> bool:
+    def _list_directory(self, path: str, remote: bool = False) -> Optional[List[str]]:
         """
-        使用预压缩方式从远程复制
-
-        流程: 远程压缩 → 传输压缩包 → [可选]本地解压 → 清理临时文件
+        列出目录下的顶层条目名称
 
         Args:
-            remote_path: 远程文件/目录路径
-            local_path: 本地目标路径
-            exclude: 排除的文件/目录模式列表
-            timeout: 超时时间（秒）
-            decompress: 是否在本地解压（默认True）
+            path: 目录路径
+            remote: 是否为远程目录
 
         Returns:
-            复制是否成功
+            条目名称列表，列出失败时返回None
         """
-        import time
-        import os
-
-        if self.logger:
-            self.logger.info(f"使用预压缩模式从远程复制: {remote_path} -> {local_path}")
-
-        # 生成临时文件名
-        timestamp = int(time.time())
-        basename = os.path.basename(remote_path.rstrip('/'))
-        if not basename:
-            basename = "transfer"
-        archive_name = f"{basename}_transfer_{timestamp}.tar.gz"
-        remote_archive = f"{self.remote_temp_dir}/{archive_name}"
-        local_archive = f"{self.local_temp_dir}/{archive_name}"
+        if not remote:
+            try:
+                return sorted(os.listdir(path))
+            except OSError as e:
+                if self.logger:
+                    self.logger.debug(f"列出本地目录失败: {str(e)}")
+                return None
 
         try:
-            # 步骤1: 在远程压缩
-            if self.logger:
-                self.logger.info(f"步骤1/3: 在远程压缩文件到 {remote_archive}")
-
-            # 构建tar命令
-            tar_cmd = f"tar -czf {remote_archive}"
-
-            # 添加排除规则
-            if exclude:
-                for pattern in exclude:
-                    tar_cmd += f" --exclude='{pattern}'"
-
-            # 添加源路径 (使用 -C 切换到父目录，只打包目标目录/文件)
-            remote_parent = os.path.dirname(remote_path.rstrip('/'))
-            remote_target = os.path.basename(remote_path.rstrip('/'))
-            if remote_parent:
-                tar_cmd += f" -C {remote_parent} {remote_target}"
-            else:
-                tar_cmd += f" {remote_path}"
-
-            # 执行远程压缩
-            ssh_compress_cmd = ["ssh", self.host, tar_cmd]
             result = subprocess.run(
-                ssh_compress_cmd,
+                self._ssh_argv(f"ls -A1 -- {shlex.quote(path)}"),
+                stdin=subprocess.DEVNULL,
                 capture_output=True,
                 text=True,
-                timeout=timeout
+                timeout=30
             )
-
-            if result.returncode != 0:
-                if self.logger:
-                    self.logger.error(f"远程压缩失败: {result.stderr}")
-                return False
-
+        except (subprocess.TimeoutExpired, OSError) as e:
             if self.logger:
-                self.logger.info("远程压缩完成")
+                self.logger.debug(f"列出远程目录失败: {str(e)}")
+            return None
 
-            # 步骤2: 传输压缩包
+        if result.returncode != 0:
             if self.logger:
-                self.logger.info(f"步骤2/3: 传输压缩包 {archive_name}")
+                self.logger.debug(f"列出远程目录失败: {result.stderr.strip()}")
+            return None
+        return [name for name in result.stdout.splitlines() if name]
 
-            scp_cmd = ["scp", f"{self.host}:{remote_archive}", local_archive]
-            success = self._execute_transfer_command_batch(scp_cmd, timeout)
+    def _sync_directory_parallel(
+        self,
+        source: str,
+        destination: str,
+        direction: str,
+        parallel_files: int,
+        exclude: Optional[List[str]] = None,
+        delete: bool = False,
+        dry_run: bool = False,
+        timeout: int = 1200,
+        inplace: bool = False,
+        partial: bool = False
+    ) -> Optional[bool]:
+        """
+        按源目录的顶层条目分组，多个rsync进程并行同步
 
-            if not success:
-                if self.logger:
-                    self.logger.error("压缩包传输失败")
-                # 清理远程临时文件
-                subprocess.run(["ssh", self.host, f"rm -f {remote_archive}"], timeout=10)
-                return False
+        每组条目使用一次 copy_many 调用(共享SSH复用连接)，复制结果与整个目录一次同步相同；
+        以 / 开头的排除规则相对于各条目而不是源目录匹配。
+        并行数不超过连接池的单host连接数，每个rsync进程占用一个host传输名额
 
-            if self.logger:
-                self.logger.info("压缩包传输完成")
+        Args:
+            source: 源目录路径(以 / 结尾时同步目录内容，否则同步目录本身)
+            destination: 目标目录路径
+            direction: "pull" 或 "push"
+            parallel_files: 并行rsync进程数
+            exclude: 排除的文件/目录模式列表
+            delete: 是否删除目标中多余的文件(各条目同步完成后再删除目标目录顶层多余的条目)
+            dry_run: 是否只进行模拟运行
+            timeout: 每个rsync进程的超时时间（秒）
+            inplace: 是否直接更新目标文件
+            partial: 是否保留中断传输的部分文件
 
-            # 步骤3: 本地解压（可选）
-            if decompress:
-                if self.logger:
-                    self.logger.info(f"步骤3/4: 解压到 {local_path}")
+        Returns:
+            同步是否成功，无法列出源目录或源目录为空时返回None(由调用方使用单个rsync同步)
+        """
+        remote_source = direction == "pull"
+        entries = self._list_directory(source, remote=remote_source)
+        if not entries:
+            return None
+
+        # 源路径不以 / 结尾时 rsync 在目标下创建同名目录
+        base = source.rstrip('/')
+        if source.endswith('/') or not base:
+            target = destination
+        else:
+            target = f"{destination.rstrip('/')}/{os.path.basename(base)}"
+        if not remote_source:
+            self.prepare_remote_dirs([target])
 
-                # 确保本地目录存在
-                local_dir = Path(local_path)
-                if not local_dir.exists():
-                    local_dir.mkdir(parents=True, exist_ok=True)
+        # 轮询分组
+        workers = min(parallel_files, get_pool().size, len(entries))
+        buckets = [[f"{base}/{name}" for name in entries[i::workers]] for i in range(workers)]
 
-                # 解压
-                tar_extract_cmd = ["tar", "-xzf", local_archive, "-C", local_path]
-                result = subprocess.run(
-                    tar_extract_cmd,
-                    capture_output=True,
-                    text=True,
+        if self.logger:
+            self.logger.info(f"并行同步 {len(entries)} 个条目，{workers} 个rsync进程: {source} -> {destination}")
+
+        direction_name = "remote_to_local" if remote_source else "local_to_remote"
+        slots = get_host_slots(self.host)
+
+        def sync_bucket(bucket):
+            with slots:
+                return self.copy_many(
+                    sources=bucket,
+                    destination=target,
+                    direction=direction_name,
+                    recursive=True,
+                    exclude=exclude,
+                    timeout=timeout,
+                    delete=delete,
+                    dry_run=dry_run,
+                    inplace=inplace,
+                    partial=partial
+                )
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(sync_bucket, buckets))
+        if not all(results):
+            return False
+
+        if delete:
+            with slots:
+                return self._delete_top_level_extras(
+                    source=f"{base}/",
+                    target=f"{target.rstrip('/')}/",
+                    remote_source=remote_source,
+                    exclude=exclude,
+                    dry_run=dry_run,
                     timeout=timeout
                 )
+        return True
 
-                if result.returncode != 0:
-                    if self.logger:
-                        self.logger.error(f"本地解压失败: {result.stderr}")
-                        self.logger.warning(f"压缩包保留在: {local_archive}")
-                    return False
+    def _delete_top_level_extras(
+        self,
+        source: str,
+        target: str,
+        remote_source: bool,
+        exclude: Optional[List[str]] = None,
+        dry_run: bool = False,
+        timeout: int = 1200
+    ) -> bool:
+        """
+        删除目标目录顶层中源目录没有的条目(并行同步时各条目的rsync无法删除这些条目)
 
-                if self.logger:
-                    self.logger.info("解压完成")
-            else:
-                if self.logger:
-                    self.logger.info(f"步骤3/4: 跳过解压，压缩文件保留在 {local_archive}")
-                # decompress=False时，压缩文件就是最终产物，不删除
+        使用 rsync -d --delete 只比较顶层条目，--existing --ignore-existing 不传输任何文件；
+        被排除规则匹配的条目不删除，与整个目录一次同步的结果相同
 
-            # 步骤4: 清理临时文件
-            if self.logger:
-                self.logger.info("步骤4/4: 清理临时文件...")
+        Args:
+            source: 源目录路径(以 / 结尾)
+            target: 目标目录路径(以 / 结尾)
+            remote_source: 源目录是否为远程目录
+            exclude: 排除的文件/目录模式列表
+            dry_run: 是否只进行模拟运行
+            timeout: 超时时间（秒）
 
-            # 仅在解压后才删除本地压缩包
-            if decompress:
-                try:
-                    os.remove(local_archive)
-                except Exception as e:
-                    if self.logger:
-                        self.logger.warning(f"删除本地临时文件失败: {str(e)}")
-            else:
-                if self.logger:
-                    self.logger.info(f"压缩文件保留: {local_archive}")
+        Returns:
+            是否成功
+        """
+        cmd = ["rsync", *self._rsync_ssh_options(), "-d", "--delete", "--existing", "--ignore-existing"]
+        if dry_run:
+            cmd.append("--dry-run")
+        if exclude:
+            for pattern in exclude:
+                cmd.extend(["--exclude", pattern])
+        if remote_source:
+            cmd.extend([f"{self.host}:{source}", target])
+        else:
+            cmd.extend([source, f"{self.host}:{target}"])
+        return self._execute_transfer_command(cmd, timeout)
 
-            # 删除远程压缩包
-            try:
-                subprocess.run(
-                    ["ssh", self.host, f"rm -f {remote_archive}"],
-                    timeout=10,
-                    capture_output=True
-                )
-            except Exception as e:
-                if self.logger:
-                    self.logger.warning(f"删除远程临时文件失败: {str(e)}")
+    @staticmethod
+    def _archive_stem(path: str) -> str:
+        """
+        获取默认压缩包文件名的前缀
 
-            if self.logger:
-                self.logger.info("预压缩传输完成")
+        Args:
+            path: 源文件/目录路径
 
-            return True
+        Returns:
+            源路径的最后一级名称，为空时返回 "transfer"
+        """
+        return os.path.basename(path.rstrip('/')) or "transfer"
+
+    def _run_pipeline(
+        self,
+        commands: List[List[str]],
+        timeout: int,
+        stdout: Optional[BinaryIO] = None
+    ) -> bool:
+        """
+        以管道串联执行多个命令(数据不落盘，各阶段同时进行)
+
+        Args:
+            commands: 命令列表，前一个命令的标准输出连接到后一个命令的标准输入
+            timeout: 超时时间（秒）
+            stdout: 最后一个命令的标准输出(二进制文件对象)，None时丢弃
+
+        Returns:
+            所有命令是否都执行成功
+        """
+        procs = []
+        # 标准错误写入临时文件，避免管道写满导致进程阻塞
+        errors = []
+        stdin = subprocess.DEVNULL
+        try:
+            for idx, cmd in enumerate(commands):
+                if self.logger:
+                    self.logger.debug(f"执行命令: {' '.join(cmd)}")
+                is_last = idx == len(commands) - 1
+                err = tempfile.TemporaryFile()
+                errors.append(err)
+                proc = subprocess.Popen(
+                    cmd,
+                    stdin=stdin,
+                    stdout=(stdout or subprocess.DEVNULL) if is_last else subprocess.PIPE,
+                    stderr=err
+                )
+                if procs:
+                    # 父进程关闭管道读端，下游提前退出时上游收到SIGPIPE
+                    procs[-1].stdout.close()
+                procs.append(proc)
+                stdin = proc.stdout
+
+            deadline = time.monotonic() + timeout
+            for proc in reversed(procs):
+                proc.wait(timeout=max(deadline - time.monotonic(), 0))
+
+            success = True
+            for cmd, proc, err in zip(commands, procs, errors):
+                if proc.returncode != 0:
+                    success = False
+                    if self.logger:
+                        err.seek(0)
+                        message = err.read().decode('utf-8', errors='replace').strip()
+                        self.logger.error(f"命令执行失败，返回码 {proc.returncode}: {' '.join(cmd)}")
+                        if message:
+                            self.logger.error(f"错误信息: {message}")
+            return success
 
         except subprocess.TimeoutExpired:
             if self.logger:
                 self.logger.error(f"预压缩传输超时（{timeout}秒）")
-            # 尝试清理
-            try:
-                os.remove(local_archive)
-            except:
-                pass
-            try:
-                subprocess.run(["ssh", self.host, f"rm -f {remote_archive}"], timeout=10)
-            except:
-                pass
             return False
 
-        except Exception as e:
+        except OSError as e:
             if self.logger:
                 self.logger.error(f"预压缩传输异常: {str(e)}")
-            # 尝试清理
-            try:
-                os.remove(local_archive)
-            except:
-                pass
-            try:
-                subprocess.run(["ssh", self.host, f"rm -f {remote_archive}"], timeout=10)
-            except:
-                pass
             return False
 
-    def _copy_to_remote_with_precompress(
+        finally:
+            for proc in procs:
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+                if proc.stdout:
+                    proc.stdout.close()
+            for err in errors:
+                err.close()
+
+    def _copy_from_remote_with_precompress(
         self,
-        local_path: str,
         remote_path: str,
+        local_path: str,
         exclude: Optional[List[str]] = None,
         timeout: int = 600,
-        decompress: bool = True
+        decompress: bool = True,
+        archive_name: Optional[str] = None,
+        compressor: str = "auto",
+        compress_level: Optional[int] = None,
+        rsync_friendly: bool = True
     ) -> bool:
         """
-        使用预压缩方式复制到远程
+        使用预压缩方式从远程复制
 
-        流程: 本地压缩 → 传输压缩包 → [可选]远程解压 → 清理临时文件
+        流程: 远程打包压缩 | SSH传输 | 本地解压，以流式管道同时进行，不产生临时文件；
+        不解压时压缩数据直接写入本地临时目录中的压缩包
 
         Args:
-            local_path: 本地文件/目录路径
-            remote_path: 远程目标路径
+            remote_path: 远程文件/目录路径
+            local_path: 本地目标路径
             exclude: 排除的文件/目录模式列表
             timeout: 超时时间（秒）
-            decompress: 是否在远程解压（默认True）
+            decompress: 是否在本地解压（默认True）
+            archive_name: 压缩包文件名（默认按源路径和当前时间生成）
+            compressor: 压缩程序，"auto" / "pigz" / "gzip" / "zstd"
+            compress_level: 压缩级别
+            rsync_friendly: 不解压时是否生成rsync友好的压缩包
 
         Returns:
             复制是否成功
         """
-        import time
-        import os
-
         if self.logger:
-            self.logger.info(f"使用预压缩模式复制到远程: {local_path} -> {remote_path}")
-
-        # 生成临时文件名
-        timestamp = int(time.time())
-        basename = os.path.basename(local_path.rstrip('/'))
-        if not basename:
-            basename = "transfer"
-        archive_name = f"{basename}_transfer_{timestamp}.tar.gz"
-        local_archive = f"{self.local_temp_dir}/{archive_name}"
-
-        # 根据 decompress 决定远程压缩文件的位置
-        # decompress=True: 使用临时目录（因为会解压到 remote_path，压缩文件会被删除）
-        # decompress=False: 直接放到 remote_path（压缩文件就是最终产物）
-        if decompress:
-            remote_archive = f"{self.remote_temp_dir}/{archive_name}"
-        else:
-            # 不解压时，压缩文件直接保存到目标路径
-            remote_archive = f"{remote_path}/{archive_name}"
-
-        # 使用 try-finally 确保异常时也清理本地临时文件
-        local_archive_created = False
-        try:
-            # 步骤1: 本地压缩
-            if self.logger:
-                self.logger.info(f"步骤1/3: 在本地压缩文件到 {local_archive}")
+            self.logger.info(f"使用预压缩模式从远程复制: {remote_path} -> {local_path}")
 
-            # 构建tar命令
-            tar_cmd = ["tar", "-czf", local_archive]
+        # 确定远程压缩和本地解压使用的压缩程序
+        remote_program = self._detect_compressor(compressor, remote=True)
+        local_program = self._detect_compressor(compressor) if decompress else None
+        if remote_program is None or (decompress and local_program is None):
+            return False
 
-            # 添加排除规则
-            if exclude:
-                for pattern in exclude:
-                    tar_cmd.extend(["--exclude", pattern])
+        # 远程打包命令，压缩数据输出到标准输出
+        # 压缩包保留下来时可能被再次rsync，生成rsync友好的压缩流
+        remote_compress = self._tar_compress_options(
+            remote_program, compress_level, rsyncable=rsync_friendly and not decompress
+        )
+        tar_cmd = f"tar {' '.join(shlex.quote(opt) for opt in remote_compress)} -cf -"
 
-            # 添加源路径 (使用 -C 切换到父目录)
-            local_parent = os.path.dirname(local_path.rstrip('/'))
-            local_target = os.path.basename(local_path.rstrip('/'))
-            if local_parent:
-                tar_cmd.extend(["-C", local_parent, local_target])
-            else:
-                tar_cmd.append(local_path)
+        # 添加排除规则
+        if exclude:
+            for pattern in exclude:
+                tar_cmd += f" --exclude={shlex.quote(pattern)}"
 
-            # 执行本地压缩
-            result = subprocess.run(
-                tar_cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+        # 添加源路径 (使用 -C 切换到父目录，只打包目标目录/文件)
+        remote_parent = os.path.dirname(remote_path.rstrip('/'))
+        remote_target = os.path.basename(remote_path.rstrip('/'))
+        if remote_parent:
+            tar_cmd += f" -C {remote_parent} {remote_target}"
+        else:
+            tar_cmd += f" {remote_path}"
 
-            if result.returncode != 0:
-                if self.logger:
-                    self.logger.error(f"本地压缩失败: {result.stderr}")
-                return False
+        ssh_cmd = self._ssh_argv(tar_cmd, options=self.NO_COMPRESSION_SSH_OPTIONS)
 
-            local_archive_created = True
+        if decompress:
             if self.logger:
-                self.logger.info("本地压缩完成")
+                self.logger.info(f"流式传输并解压到 {local_path}")
 
-            # 步骤2: 传输压缩包
-            if self.logger:
-                self.logger.info(f"步骤2/3: 传输压缩包 {archive_name}")
+            # 确保本地目录存在
+            os.makedirs(local_path, exist_ok=True)
 
-            scp_cmd = ["scp", local_archive, f"{self.host}:{remote_archive}"]
-            success = self._execute_transfer_command_batch(scp_cmd, timeout)
+            local_compress = self._tar_compress_options(local_program)
+            success = self._run_pipeline(
+                [ssh_cmd, ["tar", *local_compress, "-xf", "-", "-C", local_path]],
+                timeout
+            )
+        else:
+            # decompress=False时，压缩文件就是最终产物，保留在本地临时目录；
+            # 指定文件名时先写入唯一的临时文件，完成后原子地重命名，并发传输不会互相覆盖
+            staging = None
+            try:
+                os.makedirs(self.local_temp_dir, exist_ok=True)
+                if archive_name:
+                    local_archive = os.path.join(self.local_temp_dir, archive_name)
+                    fd, staging = tempfile.mkstemp(
+                        dir=self.local_temp_dir, prefix=f".{archive_name}.", suffix=".part"
+                    )
+                else:
+                    fd, local_archive = tempfile.mkstemp(
+                        dir=self.local_temp_dir,
+                        prefix=f"{self._archive_stem(remote_path)}_transfer_",
+                        suffix=self.archive_extension(compressor)
+                    )
+                    staging = local_archive
+
+                if self.logger:
+                    self.logger.info(f"流式传输压缩包到 {local_archive}")
 
-            if not success:
+                with os.fdopen(fd, 'wb') as f:
+                    success = self._run_pipeline([ssh_cmd], timeout, stdout=f)
+                if success and staging != local_archive:
+                    os.replace(staging, local_archive)
+            except OSError as e:
                 if self.logger:
-                    self.logger.error("压缩包传输失败")
-                # 清理本地临时文件
+                    self.logger.error(f"创建本地压缩包失败: {str(e)}")
+                success = False
+
+            if not success and staging:
+                # 删除不完整的压缩包
                 try:
-                    os.remove(local_archive)
-                except:
+                    os.remove(staging)
+                except OSError:
                     pass
-                return False
 
-            if self.logger:
-                self.logger.info("压缩包传输完成")
+        if self.logger:
+            if success:
+                self.logger.info("预压缩传输完成")
+            else:
+                self.logger.error("预压缩传输失败")
 
-            # 步骤3: 远程解压（可选）
-            if decompress:
-                if self.logger:
-                    self.logger.info(f"步骤3/4: 在远程解压到 {remote_path}")
+        return success
 
-                # 创建远程目录并解压
-                ssh_extract_cmd = [
-                    "ssh", self.host,
-                    f"mkdir -p {remote_path} && tar -xzf {remote_archive} -C {remote_path}"
-                ]
+    def _copy_to_remote_with_precompress(
+        self,
+        local_path: str,
+        remote_path: str,
+        exclude: Optional[List[str]] = None,
+        timeout: int = 600,
+        decompress: bool = True,
+        archive_name: Optional[str] = None,
+        compressor: str = "auto",
+        compress_level: Optional[int] = None,
+        rsync_friendly: bool = True
+    ) -> bool:
+        """
+        使用预压缩方式复制到远程
 
-                result = subprocess.run(
-                    ssh_extract_cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=timeout
-                )
+        流程: 本地打包压缩 | SSH传输 | 远程解压，以流式管道同时进行，不产生临时文件；
+        不解压时压缩数据直接写入远程目标路径下的压缩包
 
-                if result.returncode != 0:
-                    if self.logger:
-                        self.logger.error(f"远程解压失败: {result.stderr}")
-                        self.logger.warning(f"远程压缩包保留在: {remote_archive}")
-                    return False
+        Args:
+            local_path: 本地文件/目录路径
+            remote_path: 远程目标路径
+            exclude: 排除的文件/目录模式列表
+            timeout: 超时时间（秒）
+            decompress: 是否在远程解压（默认True）
+            archive_name: 压缩包文件名（默认按源路径和当前时间生成）
+            compressor: 压缩程序，"auto" / "pigz" / "gzip" / "zstd"
+            compress_level: 压缩级别
+            rsync_friendly: 不解压时是否生成rsync友好的压缩包
 
-                if self.logger:
-                    self.logger.info("解压完成")
-            else:
-                if self.logger:
-                    self.logger.info(f"步骤3/4: 跳过解压，压缩文件保留在 {remote_archive}")
-                # decompress=False时，压缩文件就是最终产物，不删除
+        Returns:
+            复制是否成功
+        """
+        if self.logger:
+            self.logger.info(f"使用预压缩模式复制到远程: {local_path} -> {remote_path}")
 
-            # 步骤4: 清理远程临时文件（如果需要）
-            if self.logger:
-                self.logger.info("步骤4/4: 清理远程临时文件...")
+        # 确定本地压缩和远程解压使用的压缩程序
+        local_program = self._detect_compressor(compressor)
+        remote_program = self._detect_compressor(compressor, remote=True) if decompress else None
+        if local_program is None or (decompress and remote_program is None):
+            return False
 
-            # 仅在解压后才删除远程压缩包
-            if decompress:
-                try:
-                    subprocess.run(
-                        ["ssh", self.host, f"rm -f {remote_archive}"],
-                        timeout=10,
-                        capture_output=True
-                    )
-                except Exception as e:
-                    if self.logger:
-                        self.logger.warning(f"删除远程临时文件失败: {str(e)}")
-            else:
-                if self.logger:
-                    self.logger.info(f"远程压缩文件保留: {remote_archive}")
+        # 本地打包命令，压缩数据输出到标准输出
+        # 压缩包保留下来时可能被再次rsync，生成rsync友好的压缩流
+        local_compress = self._tar_compress_options(
+            local_program, compress_level, rsyncable=rsync_friendly and not decompress
+        )
+        tar_cmd = ["tar", *local_compress, "-cf", "-"]
 
-            if self.logger:
-                self.logger.info("预压缩传输完成")
+        # 添加排除规则
+        if exclude:
+            for pattern in exclude:
+                tar_cmd.extend(["--exclude", pattern])
 
-            return True
+        # 添加源路径 (使用 -C 切换到父目录)
+        local_parent = os.path.dirname(local_path.rstrip('/'))
+        local_target = os.path.basename(local_path.rstrip('/'))
+        if local_parent:
+            tar_cmd.extend(["-C", local_parent, local_target])
+        else:
+            tar_cmd.append(local_path)
 
-        except subprocess.TimeoutExpired:
-            if self.logger:
-                self.logger.error(f"预压缩传输超时（{timeout}秒）")
-            return False
+        # 确保远程目录存在(已由调用方批量创建时不产生SSH调用)
+        self.prepare_remote_dirs([remote_path])
 
-        except Exception as e:
+        remote_archive = None
+        if decompress:
             if self.logger:
-                self.logger.error(f"预压缩传输异常: {str(e)}")
-            return False
+                self.logger.info(f"流式传输并在远程解压到 {remote_path}")
+            remote_compress = self._tar_compress_options(remote_program)
+            remote_cmd = f"tar {' '.join(shlex.quote(opt) for opt in remote_compress)} -xf - -C {remote_path}"
+        else:
+            # decompress=False时，压缩文件直接保存到目标路径（压缩文件就是最终产物）
+            if not archive_name:
+                # 时间戳加随机后缀，同一秒内的并发传输不会使用相同的文件名
+                archive_name = (
+                    f"{self._archive_stem(local_path)}_transfer_{int(time.time())}_"
+                    f"{os.urandom(3).hex()}{self.archive_extension(compressor)}"
+                )
+            remote_archive = f"{remote_path}/{archive_name}"
+            if self.logger:
+                self.logger.info(f"流式传输压缩包到 {remote_archive}")
+            # 先写入远程唯一的临时文件，完整接收后再重命名(同一SSH调用内完成)
+            remote_cmd = (
+                f'tmp=$(mktemp {remote_path}/.{archive_name}.XXXXXX) || exit 1; '
+                f'if cat > "$tmp"; then mv -f "$tmp" {remote_archive}; '
+                f'else rm -f "$tmp"; exit 1; fi'
+            )
 
-        finally:
-            # 确保清理本地临时压缩文件（仅当创建成功时）
-            if local_archive_created:
-                try:
-                    if os.path.exists(local_archive):
-                        os.remove(local_archive)
-                        if self.logger:
-                            self.logger.debug(f"清理本地临时压缩文件: {local_archive}")
-                except Exception as e:
-                    if self.logger:
-                        self.logger.warning(f"清理本地临时文件失败 {local_archive}: {str(e)}")
+        success = self._run_pipeline([tar_cmd, self._ssh_argv(remote_cmd, options=self.NO_COMPRESSION_SSH_OPTIONS)], timeout)
+
+        if not success and remote_archive:
+            # 删除不完整的远程压缩包
+            try:
+                subprocess.run(
+                    self._ssh_argv(f"rm -f {remote_archive}"),
+                    stdin=subprocess.DEVNULL,
+                    capture_output=True,
+                    timeout=10
+                )
+            except (subprocess.TimeoutExpired, OSError):
+                pass
+
+        if self.logger:
+            if success:
+                self.logger.info("预压缩传输完成")
+            else:
+                self.logger.error("预压缩传输失败")
+
+        return success
 
 
 # 使用示例